@@ -0,0 +1,90 @@
+# benchmarks/bench_camera_decode.py
+#
+# Per-snapshot preprocessing cost of analyze_camera_input before and after the
+# in-memory path, excluding the models themselves:
+#
+#   legacy:    PIL decode -> np.array, re-encode to a NamedTemporaryFile JPEG (never
+#              deleted), then DeepFace reads the file back and decodes it again
+#   in-memory: decode_snapshot(): one decode to a BGR array handed to both models
+#
+#   python benchmarks/bench_camera_decode.py --snapshots 50 --size 1280x720
+#
+# DeepFace reads paths with cv2.imread; where OpenCV is not installed the read-back
+# is emulated with PIL, which decodes JPEG at a similar speed.
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.camera_processor import decode_snapshot  # noqa: E402
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+def make_snapshot(width: int, height: int) -> bytes:
+    # Smooth gradients plus sensor-like noise: compresses like a webcam frame
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    noise = np.random.randint(-12, 12, base.shape)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def read_back(path: str) -> np.ndarray:
+    if cv2 is not None:
+        return cv2.imread(path)
+    return np.ascontiguousarray(np.asarray(Image.open(path).convert("RGB"))[:, :, ::-1])
+
+
+def legacy(data: bytes, tmp_dir: str):
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    image_np = np.array(image)
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False, dir=tmp_dir) as tmp:
+        tmp_path = tmp.name
+        image.save(tmp_path)
+    face_input = read_back(tmp_path)
+    return face_input, image_np
+
+
+def in_memory(data: bytes, tmp_dir: str):
+    image = decode_snapshot(io.BytesIO(data))
+    return image, image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snapshots", type=int, default=50)
+    parser.add_argument("--size", default="1280x720")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    data = make_snapshot(width, height)
+    print(f"{args.snapshots} snapshots, {width}x{height} JPEG ({len(data) / 1e3:.0f} KB), "
+          f"read-back via {'OpenCV' if cv2 is not None else 'PIL'}")
+    print(f"{'path':<11}{'ms/snapshot':>13}{'temp files left':>17}")
+    for name, fn in (("legacy", legacy), ("in-memory", in_memory)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fn(data, tmp_dir)  # warm up
+            start = time.perf_counter()
+            for _ in range(args.snapshots):
+                fn(data, tmp_dir)
+            elapsed = (time.perf_counter() - start) / args.snapshots
+            left = len(os.listdir(tmp_dir))
+        print(f"{name:<11}{elapsed * 1000:>13.1f}{left:>17}")
+
+
+if __name__ == "__main__":
+    main()
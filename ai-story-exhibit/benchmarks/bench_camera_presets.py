@@ -0,0 +1,95 @@
+# benchmarks/bench_camera_presets.py
+#
+# Latency and accuracy drift of the onboarding presets against the previous path,
+# on a directory of fixture snapshots (JPEG/PNG, e.g. consenting staff photos):
+#
+#   previous: DeepFace.analyze on the full frame (detector inside analyze) and YOLO
+#             on the full frame at its default size
+#   presets:  fast / balanced / quality from services/camera_preprocess.py: one
+#             detection on a downscaled frame, attribute models on the reused crop,
+#             YOLO on a letterboxed input
+#
+#   python benchmarks/bench_camera_presets.py --images fixtures/snapshots --repeat 3
+#
+# Drift is measured against the previous path's own outputs: age MAE in years,
+# gender and emotion agreement, and the Jaccard overlap of detected object sets.
+# Needs deepface and ultralytics (the models load before timing starts).
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.camera_preprocess import PRESETS  # noqa: E402
+from services.camera_processor import FACE_ACTIONS, analyze_face, decode_snapshot  # noqa: E402
+from services.model_registry import get_model, warmup  # noqa: E402
+from services.object_sentiment import detect_objects  # noqa: E402
+
+
+def previous_path(image_bgr):
+    result = get_model("deepface").analyze(img_path=image_bgr, actions=FACE_ACTIONS, enforce_detection=False)[0]
+    face = {"age": int(result.get("age", 0)), "gender": result.get("dominant_gender"),
+            "emotion": result.get("dominant_emotion")}
+    results = get_model("yolo")(image_bgr, verbose=False)
+    names = results[0].names
+    return face, {names[int(c)] for c in results[0].boxes.cls}
+
+
+def preset_path(image_bgr, preset):
+    face = analyze_face(image_bgr, preset)
+    if isinstance(face.get("gender"), dict):
+        face["gender"] = max(face["gender"], key=face["gender"].get)
+    objects = set(detect_objects(image_bgr, size=PRESETS[preset]["yolo_size"], conf=PRESETS[preset]["yolo_conf"]))
+    return face, objects
+
+
+def timed(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", required=True, help="directory of fixture snapshots")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = sorted(p for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(args.images, f"*.{ext}")))
+    if not paths:
+        sys.exit(f"No images in {args.images}")
+    warmup(["deepface", "yolo"])
+    images = [decode_snapshot(path) for path in paths]
+
+    reference, rows = [], {}
+    for image in images:
+        reference.append(timed(lambda: previous_path(image), args.repeat))
+    rows["previous"] = [t for t, _ in reference]
+
+    print(f"{len(images)} images, best of {args.repeat}")
+    print(f"{'path':<10}{'ms/image':>10}{'age MAE':>9}{'gender':>8}{'emotion':>9}{'objects':>9}")
+    print(f"{'previous':<10}{1000 * sum(rows['previous']) / len(images):>10.0f}{0:>9.1f}"
+          f"{'100%':>8}{'100%':>9}{1.0:>9.2f}")
+    for preset in PRESETS:
+        seconds, age_err, gender_ok, emotion_ok, jaccard = 0.0, 0.0, 0, 0, 0.0
+        for image, (_, (ref_face, ref_objects)) in zip(images, reference):
+            elapsed, (face, objects) = timed(lambda: preset_path(image, preset), args.repeat)
+            seconds += elapsed
+            age_err += abs((face["age"] or 0) - ref_face["age"])
+            gender_ok += face["gender"] == ref_face["gender"]
+            emotion_ok += face["emotion"] == ref_face["emotion"]
+            union = ref_objects | objects
+            jaccard += len(ref_objects & objects) / len(union) if union else 1.0
+        n = len(images)
+        print(f"{preset:<10}{1000 * seconds / n:>10.0f}{age_err / n:>9.1f}"
+              f"{gender_ok / n:>8.0%}{emotion_ok / n:>9.0%}{jaccard / n:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_image_decode.py
+#
+# Peak RSS for handling a batch of 1024x1024 backend outputs (base64 PNG, like
+# WebisAPI returns) the old way versus the encoded-bytes path:
+#
+#   legacy:  b64decode -> Image.open -> decode to pixels (Streamlit re-encodes the
+#            PIL image for the browser) and keep the PIL images in session state
+#   encoded: b64decode -> ImageStore.put(bytes) -> keep ImageRefs; the browser is
+#            served the stored file
+#
+#   python benchmarks/bench_image_decode.py --images 5 --size 1024
+#
+# Each mode runs in a fresh interpreter so ru_maxrss is that mode's own peak.
+
+import argparse
+import base64
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_b64_png(size: int) -> str:
+    from PIL import Image
+
+    # Noise compresses poorly, so the PNG is about as large as a real render
+    img = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def current_rss_kb() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def run_mode(mode: str, b64_path: str, images: int, store_dir: str):
+    from PIL import Image
+    from services.image_store import ImageStore
+
+    store = ImageStore(store_dir)
+    with open(b64_path) as f:
+        b64 = f.read()
+    baseline = current_rss_kb()
+
+    session = []
+    for _ in range(images):
+        data = base64.b64decode(b64)
+        if mode == "legacy":
+            img = Image.open(io.BytesIO(data))
+            img.load()
+            out = io.BytesIO()
+            img.save(out, format="PNG")   # what st.image does with a PIL image
+            session.append(img)
+        else:
+            ref = store.put(data)
+            with open(store.path(ref), "rb") as f:
+                f.read()                  # what st.image does with a path
+            session.append(ref)
+        del data
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:<8} peak RSS above baseline: {(peak - baseline) / 1024:8.1f} MB "
+          f"(session holds {len(session)} items)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--mode", choices=["legacy", "encoded"])
+    parser.add_argument("--b64-path")
+    parser.add_argument("--store-dir")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.b64_path, args.images, args.store_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        b64_path = os.path.join(tmp, "image.b64")
+        with open(b64_path, "w") as f:
+            f.write(make_b64_png(args.size))
+        print(f"{args.images} x {args.size}x{args.size} PNG, "
+              f"{os.path.getsize(b64_path) / 1e6:.1f} MB base64 each")
+        for mode in ("legacy", "encoded"):
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__),
+                "--mode", mode, "--images", str(args.images),
+                "--b64-path", b64_path, "--store-dir", os.path.join(tmp, mode),
+            ], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_llm_pool.py
+#
+# Compares LLMClient.send latency with the pooled keep-alive session against
+# one-connection-per-request ("Connection: close"), using a local stand-in LLM server.
+#
+#   python benchmarks/bench_llm_pool.py --requests 50 --concurrency 8 --handshake-ms 20
+#
+# --handshake-ms adds a delay on every *new* connection to emulate the TCP+TLS
+# round trips a real remote endpoint costs (loopback handshakes are nearly free).
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clients.llm_client import LLMClient  # noqa: E402
+
+
+def make_handler(handshake_s: float, body_delay_s: float):
+    class StandInLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # allow keep-alive
+        disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+        def setup(self):
+            super().setup()
+            # Runs once per accepted connection, not per request
+            time.sleep(handshake_s)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(body_delay_s)
+            body = json.dumps({
+                "model": payload.get("model"),
+                "message": {"role": "assistant", "content": "Once upon a time..."},
+                "done": True,
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if self.close_connection:
+                # Echo the close like real servers do, so the client drops the socket
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInLLMHandler
+
+
+def write_config(url: str, keep_alive: bool, pool_maxsize: int) -> str:
+    cfg = (
+        "llm_api:\n"
+        f"  url: {url}\n"
+        "  model: bench\n"
+        "  timeout: 30\n"
+        "  stream: false\n"
+        "http_pool:\n"
+        f"  pool_maxsize: {pool_maxsize}\n"
+        f"  keep_alive: {str(keep_alive).lower()}\n"
+    )
+    fd, path = tempfile.mkstemp(suffix=".yml")
+    with os.fdopen(fd, "w") as f:
+        f.write(cfg)
+    return path
+
+
+def run(client: LLMClient, n: int, concurrency: int) -> list:
+    messages = [{"role": "user", "content": "Tell me a story."}]
+
+    def one(_):
+        start = time.perf_counter()
+        # coalesce=False: measure the transport, not request sharing
+        client.send(messages, stream=False, agent_name="bench", coalesce=False)
+        return time.perf_counter() - start
+
+    if concurrency <= 1:
+        return [one(i) for i in range(n)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(n)))
+
+
+def summarize(label: str, latencies: list, wall: float):
+    lat_ms = sorted(x * 1000 for x in latencies)
+    p95 = lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * 0.95))]
+    print(
+        f"{label:<32} wall={wall:7.3f}s  mean={statistics.mean(lat_ms):7.2f}ms  "
+        f"p50={statistics.median(lat_ms):7.2f}ms  p95={p95:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    parser.add_argument("--server-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(args.handshake_ms / 1000, args.server_ms / 1000)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/chat"
+
+    try:
+        for keep_alive in (False, True):
+            cfg_path = write_config(url, keep_alive, pool_maxsize=max(args.concurrency, 1))
+            try:
+                client = LLMClient(config_path=cfg_path)
+                mode = "pooled keep-alive" if keep_alive else "new connection/request"
+                for concurrency in (1, args.concurrency):
+                    start = time.perf_counter()
+                    latencies = run(client, args.requests, concurrency)
+                    summarize(f"{mode} (c={concurrency})", latencies, time.perf_counter() - start)
+            finally:
+                os.remove(cfg_path)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
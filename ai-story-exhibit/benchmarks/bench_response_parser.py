@@ -0,0 +1,155 @@
+# benchmarks/bench_response_parser.py
+#
+# Compares the incremental ResponseParser with the parsing LLMClient did before it,
+# on large synthetic NDJSON (Ollama), SSE (OpenAI-compatible) and JSON bodies served
+# through real requests.Response objects:
+#
+#   send:   len(response.content) + response.json(), falling back to iter_lines()
+#           and json.loads per line (SSE was not understood on this path)
+#   stream: iter_lines(decode_unicode=True) + json.loads per line
+#
+#   python benchmarks/bench_response_parser.py --deltas 200000
+#
+# Times are best of --repeat runs. Peak memory is measured with tracemalloc in a
+# separate run, so it covers Python allocations only and does not skew the timings.
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clients.response_parser import (  # noqa: E402
+    CHUNK_SIZE,
+    chunk_content,
+    chunk_done,
+    collect,
+    iter_deltas,
+)
+
+
+def make_body(kind: str, deltas: int) -> bytes:
+    if kind == "json":
+        text = "".join(f"word{i} " for i in range(deltas))
+        return json.dumps({"message": {"role": "assistant", "content": text}, "done": True}, indent=2).encode()
+    lines = []
+    for i in range(deltas):
+        if kind == "ndjson":
+            lines.append(json.dumps({"model": "llama3", "message": {"content": f"word{i} "}, "done": False}))
+        else:
+            lines.append("data: " + json.dumps({"choices": [{"delta": {"content": f"word{i} "}}]}))
+            lines.append("")
+    lines.append("data: [DONE]" if kind == "sse" else json.dumps({"message": {"content": ""}, "done": True}))
+    return "\n".join(lines).encode()
+
+
+def make_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    response.encoding = "utf-8"
+    return response
+
+
+def _legacy_line(line: str):
+    if not line:
+        return None, False
+    if line.startswith("data:"):
+        line = line[len("data:"):].strip()
+        if line == "[DONE]":
+            return None, True
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError:
+        return None, False
+    return chunk_content(chunk), chunk_done(chunk)
+
+
+def legacy_send(response: requests.Response) -> str:
+    _ = len(response.content or b"")
+    try:
+        return (chunk_content(response.json()) or "").strip()
+    except requests.exceptions.JSONDecodeError:
+        parts = []
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            try:
+                chunk = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            content = chunk_content(chunk)
+            if content:
+                parts.append(content)
+        return "".join(parts).strip()
+
+
+def legacy_stream(response: requests.Response) -> str:
+    parts = []
+    for line in response.iter_lines(decode_unicode=True):
+        content, done = _legacy_line(line)
+        if content:
+            parts.append(content)
+        if done:
+            break
+    return "".join(parts).strip()
+
+
+def incremental_send(response: requests.Response) -> str:
+    return collect(response.iter_content(chunk_size=CHUNK_SIZE)).strip()
+
+
+def incremental_stream(response: requests.Response) -> str:
+    parts = []
+    for content in iter_deltas(response.iter_content(chunk_size=CHUNK_SIZE)):
+        parts.append(content)
+    return "".join(parts).strip()
+
+
+def measure(fn, body: bytes, repeat: int):
+    # Best of `repeat`, timed without tracemalloc, which would inflate the per-allocation cost
+    elapsed = float("inf")
+    for _ in range(repeat):
+        response = make_response(body)
+        start = time.perf_counter()
+        result = fn(response)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    response = make_response(body)
+    tracemalloc.start()
+    fn(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--deltas", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = (
+        ("send", legacy_send, incremental_send),
+        ("stream", legacy_stream, incremental_stream),
+    )
+    print(f"{'body':<8}{'MB':>6}  {'path':<8}{'parser':<13}{'seconds':>9}{'peak MB':>9}  output")
+    for kind in ("ndjson", "sse", "json"):
+        body = make_body(kind, args.deltas)
+        for path, legacy, incremental in cases:
+            expected = None
+            for name, fn in (("incremental", incremental), ("legacy", legacy)):
+                text, elapsed, peak = measure(fn, body, args.repeat)
+                expected = text if expected is None else expected
+                status = "ok" if text == expected else "WRONG"
+                print(f"{kind:<8}{len(body) / 1e6:>6.1f}  {path:<8}{name:<13}{elapsed:>9.3f}{peak / 1e6:>9.1f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_tts_synthesis.py
+#
+# Compares CoquiTTSClient's sentence handling before and after batching, against a
+# stand-in model with a fixed per-call cost (XTTS re-computes speaker conditioning on
+# every call) plus a per-character cost, which returns a Python list of float32 like
+# Coqui's Synthesizer does:
+#
+#   legacy:  one model call per sentence, np.array per result, np.concatenate,
+#            soundfile into a BytesIO, read back out
+#   batched: length-bucketed model calls written into one preallocated WAV buffer
+#
+#   python benchmarks/bench_tts_synthesis.py --paragraphs 5 --call-ms 40
+#
+# Sentences/s include the simulated model time; assembly time and peak memory
+# (tracemalloc, separate run) cover only the work done around the model.
+
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tts_client import DEFAULT_BATCH_CHARS, assemble_wav, bucket_sentences  # noqa: E402
+
+SAMPLERATE = 24000
+SENTENCES = [
+    "The lighthouse keeper counted the waves.",
+    "Nobody came.",
+    "At midnight the lamp flickered twice and went dark.",
+    "She climbed the stairs anyway.",
+    "Below, the sea held its breath.",
+    "Then, far out, a second light answered.",
+]
+
+
+class StandInModel:
+    sampling_rate = SAMPLERATE
+
+    def __init__(self, call_ms: float, char_ms: float, simulate: bool = True):
+        self.call_ms = call_ms
+        self.char_ms = char_ms
+        self.simulate = simulate
+        self.calls = 0
+
+    def tts(self, text, **kwargs):
+        self.calls += 1
+        if self.simulate:
+            time.sleep((self.call_ms + self.char_ms * len(text)) / 1000)
+        # ~15 characters per second of speech
+        return list(np.random.uniform(-0.5, 0.5, int(SAMPLERATE * len(text) / 15)).astype(np.float32))
+
+
+def legacy(model, sentences):
+    segments = []
+    for sentence in sentences:
+        segments.append(np.array(model.tts(text=sentence)))
+    audio = np.concatenate(segments)
+    buf = io.BytesIO()
+    sf.write(buf, audio, samplerate=SAMPLERATE, format="WAV")
+    buf.seek(0)
+    return buf.read()
+
+
+def batched(model, sentences):
+    segments = [model.tts(text=batch) for batch in bucket_sentences(sentences, DEFAULT_BATCH_CHARS)]
+    return assemble_wav(segments, SAMPLERATE)
+
+
+def measure(fn, sentences, args):
+    model = StandInModel(args.call_ms, args.char_ms)
+    start = time.perf_counter()
+    for _ in range(args.paragraphs):
+        fn(model, sentences)
+    elapsed = time.perf_counter() - start
+
+    # Assembly only: model output precomputed, so the timings exclude model time
+    quiet = StandInModel(0, 0, simulate=False)
+    outputs = {}
+    def cached_tts(text, **kwargs):
+        if text not in outputs:
+            outputs[text] = StandInModel.tts(quiet, text)
+        return outputs[text]
+    quiet.tts = cached_tts
+    fn(quiet, sentences)
+    assembly = float("inf")
+    for _ in range(3):
+        t = time.perf_counter()
+        fn(quiet, sentences)
+        assembly = min(assembly, time.perf_counter() - t)
+
+    tracemalloc.start()
+    fn(quiet, sentences)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return model.calls, len(sentences) * args.paragraphs / elapsed, assembly, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--sentences", type=int, default=12, help="sentences per paragraph")
+    parser.add_argument("--call-ms", type=float, default=40.0, help="simulated fixed cost per model call")
+    parser.add_argument("--char-ms", type=float, default=1.0, help="simulated cost per character")
+    args = parser.parse_args()
+
+    sentences = [SENTENCES[i % len(SENTENCES)] for i in range(args.sentences)]
+    print(f"{args.paragraphs} paragraphs x {args.sentences} sentences, "
+          f"{args.call_ms:.0f} ms/call + {args.char_ms:.1f} ms/char")
+    print(f"{'mode':<9}{'calls':>7}{'sent/s':>9}{'assembly ms':>13}{'peak MB':>9}")
+    for name, fn in (("legacy", legacy), ("batched", batched)):
+        calls, rate, assembly, peak = measure(fn, sentences, args)
+        print(f"{name:<9}{calls:>7}{rate:>9.1f}{assembly * 1000:>13.1f}{peak / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
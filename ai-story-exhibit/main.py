@@ -5,10 +5,27 @@ from state.session import init_story_state
 from models.user import UserProfile # Import the Pydantic model
 from pydantic import ValidationError
 from services.camera_processor import analyze_camera_input
+from services.tts_client import preload_coqui_models
+from services.model_registry import warmup as warmup_models
+
+@st.cache_resource
+def start_tts_preload():
+    # Once per server process: load and warm up the models in TTS_PRELOAD_MODELS
+    # (voice: TTS_PRELOAD_SPEAKER) in the background so the first narration
+    # does not pay the model load
+    return preload_coqui_models()
+
+@st.cache_resource
+def start_model_warmup():
+    # Camera models (PRELOAD_MODELS, e.g. "deepface,yolo") load in the background;
+    # unset, they load on the first snapshot and the landing page renders immediately
+    return warmup_models(background=True)
 
 st.set_page_config(page_title="ILLUMULUS 2025", layout="centered")
 st.title(" A Mutlimodel Co-Writer UNLIKE ANY OTHER")
 
+start_tts_preload()
+start_model_warmup()
 init_story_state()  # Initialize session state for story and user profile
 st.markdown("Welcome to the **ILLUMULUS 2025** exhibit! This interactive experience allows you to co-create a multimodal story with AI. Let's start by getting to know you better through your camera and voice.")
 st.markdown("###  Camera Onboarding")
@@ -24,7 +41,12 @@ if img_file_buffer is not None:
         try:
             # The analyze_camera_input function handles internal errors
             # and returns a dictionary with available data or defaults.
-            raw_profile_data = analyze_camera_input(img_file_buffer)
+            settings = st.session_state.get("settings", {})
+            raw_profile_data = analyze_camera_input(
+                img_file_buffer,
+                preset=settings.get("camera_preset", "balanced"),
+                backend=settings.get("camera_backend", "default")
+            )
             validated_profile = UserProfile.model_validate(raw_profile_data)
         except ValidationError as ve:
             st.error(f"There was an issue with the analyzed data format: {ve}")
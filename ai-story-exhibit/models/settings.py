@@ -9,3 +9,7 @@ class AppSettings(BaseModel):
     llm_max_tokens: int = Field(default=150, ge=10)
     image_style: Literal["Default", "Watercolor", "Pixel Art", "Noir"] = "Default"
     tts_lang: Literal["en", "de", "es", "fr"] = "en"
+    tts_codec: Literal["ogg_opus", "ogg_vorbis", "mp3", "flac", "wav"] = "ogg_opus"
+    tts_compression_level: float = Field(default=0.9, ge=0.0, le=1.0) # 0 = highest bitrate, 1 = smallest
+    camera_preset: Literal["fast", "balanced", "quality"] = "balanced" # see services/camera_preprocess.py
+    camera_backend: Literal["default", "onnx"] = "default" # onnx: services/onnx_backend.py, falls back to default
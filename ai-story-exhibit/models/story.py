@@ -1,10 +1,46 @@
-from typing import List, Optional, Any
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+class ImageRef(BaseModel):
+    """Reference to an encoded image in services/image_store.py (a few hundred bytes, not pixels)."""
+    digest: str          # sha256 of the encoded bytes
+    format: str          # "png" | "webp" | "jpeg"
+    width: int = 0
+    height: int = 0
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{self.format}"
+
+# Leading bytes of the audio formats the TTS backends and codec stage produce
+_AUDIO_SIGNATURES = ((b"RIFF", "audio/wav"), (b"OggS", "audio/ogg"), (b"fLaC", "audio/flac"),
+                     (b"ID3", "audio/mpeg"), (b"\xff", "audio/mpeg"))
+
+class NarrationAudio(BaseModel):
+    """Encoded narration for one scene, with the MIME type it was encoded as."""
+    data: bytes
+    mime_type: str = "audio/wav"
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "NarrationAudio":
+        """Wrap raw bytes stored before the format was recorded, sniffing the container."""
+        for signature, mime_type in _AUDIO_SIGNATURES:
+            if data.startswith(signature):
+                return cls(data=data, mime_type=mime_type)
+        return cls(data=data)
 
 class Story(BaseModel):
     prompt: str = ""
     genre: str = ""
     elements: List[str] = Field(default_factory=list)
     paragraphs: List[str] = Field(default_factory=list)
-    images: List[Any] = Field(default_factory=list) # Consider specific types or Base64 strings
-    audio: List[Any] = Field(default_factory=list)  # Consider specific types or Base64 strings
+    images: List[Optional[ImageRef]] = Field(default_factory=list) # Index-aligned with paragraphs; None = not generated yet
+    audio: List[NarrationAudio] = Field(default_factory=list)
+
+    @field_validator("audio", mode="before")
+    @classmethod
+    def _wrap_raw_audio(cls, value):
+        # Sessions from before the codec stage hold bare bytes
+        if isinstance(value, list):
+            return [NarrationAudio.from_bytes(bytes(a)) if isinstance(a, (bytes, bytearray)) else a for a in value]
+        return value
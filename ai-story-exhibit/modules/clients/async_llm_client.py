@@ -0,0 +1,238 @@
+# modules/clients/async_llm_client.py
+
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from modules.clients.llm_client import BaseLLMClient, single_flight
+from modules.clients.resilience import Deadline, awithin_deadline
+from modules.clients.response_parser import ResponseParser, acollect, aiter_deltas
+from modules.utils.log_config import get_logger
+
+logger = get_logger(__name__)
+
+class AsyncLLMClient(BaseLLMClient):
+    """
+    asyncio counterpart of LLMClient: same api_config.yml defaults, ENV override and
+    per-call generation overrides, but requests run on an httpx.AsyncClient so many
+    generations can be in flight from a single thread.
+    """
+    def __init__(self, config_path: str = None):
+        super().__init__(config_path=config_path)
+        self._client = None
+        self._client_loop = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # An AsyncClient's connections belong to the loop that opened them. Streamlit
+        # callers use asyncio.run() per action, so rebuild the pool when the loop changes.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            if self._client is not None:
+                await self._close_stale_client()
+            max_conns = int(self.pool_cfg["pool_maxsize"])
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=max_conns,
+                    max_keepalive_connections=max_conns if self.keep_alive else 0,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _attempt_timeout(self, deadline) -> httpx.Timeout:
+        connect, read = self.resilience.attempt_timeout(deadline)
+        return httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+
+    async def _close_stale_client(self):
+        # Its sockets belong to a finished loop; close what can still be closed
+        try:
+            await self._client.aclose()
+        except Exception as e:
+            logger.warning({"event": "LLM_CLIENT_CLOSE_FAILED", "error": str(e)})
+        self._client = None
+        self._client_loop = None
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def send(
+        self,
+        messages: list,
+        stream: bool = None,
+        max_tokens: int = None,
+        temperature: float = None,
+        top_p: float = None,
+        frequency_penalty: float = None,
+        presence_penalty: float = None,
+        agent_name: str = "default_agent",
+        force_cache: bool = False,
+        coalesce: bool = True,
+        **extra_kwargs
+    ) -> str:
+        """
+        Send a chat payload and return the full assistant response.
+        Mirrors LLMClient.send: stream=None uses the api_config.yml default,
+        per-call overrides for generation params are accepted, and identical
+        requests in flight on the same event loop share one upstream call.
+        """
+        use_stream = self.default_stream if stream is None else stream
+        overrides = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "frequency_penalty": frequency_penalty,
+            "presence_penalty": presence_penalty,
+        }
+        if use_stream:
+            deltas = [
+                delta async for delta in
+                self.iter_send(
+                    messages, agent_name=agent_name, force_cache=force_cache, coalesce=coalesce,
+                    **overrides, **extra_kwargs
+                )
+            ]
+            return "".join(deltas).strip()
+
+        payload = self._build_payload(messages, overrides, extra_kwargs)
+        cache_key = self._cache_key(payload, force_cache)
+        cached = self._cache_lookup(cache_key, agent_name)
+        if cached is not None:
+            return cached
+
+        async def upstream():
+            return await self._send_upstream(payload, agent_name, cache_key)
+
+        if not (coalesce and self.coalesce_requests):
+            return await upstream()
+        return await single_flight.ado(self._flight_key(payload, stream=False), upstream)
+
+    async def _send_upstream(self, payload: dict, agent_name: str, cache_key: Optional[str]) -> str:
+        body = self._encode_payload(payload)
+        with self._call_log(payload, body, agent_name) as call:
+            # One deadline for connecting, retries and reading the whole body
+            deadline = self.resilience.new_deadline()
+            response = await self.resilience.acall(
+                lambda deadline: self._open_response(body, deadline), deadline, agent_name=agent_name
+            )
+            # One pass over the body: JSON, NDJSON or SSE, without materialising response.content
+            parser = ResponseParser()
+            try:
+                chunks = awithin_deadline(response.aiter_bytes(), deadline)
+                content = (await acollect(chunks, parser)).strip()
+            except Exception as e:
+                self.resilience.record_failure(e)
+                raise
+            finally:
+                await response.aclose()
+            call.done(parser.bytes_received)
+        self._cache_store(cache_key, content)
+        return content
+
+    async def _open_response(self, body: bytes, deadline: Deadline) -> httpx.Response:
+        """One attempt: POST the body and return the streaming response, raising on HTTP errors."""
+        client = await self._get_client()
+        request = client.build_request(
+            "POST",
+            self.api_url,
+            content=body,
+            headers=self._headers(),
+            timeout=self._attempt_timeout(deadline),
+        )
+        response = await client.send(request, stream=True)
+        try:
+            response.raise_for_status()
+        except Exception:
+            await response.aclose()
+            raise
+        return response
+
+    async def iter_send(
+        self,
+        messages: list,
+        max_tokens: int = None,
+        temperature: float = None,
+        top_p: float = None,
+        frequency_penalty: float = None,
+        presence_penalty: float = None,
+        agent_name: str = "default_agent",
+        force_cache: bool = False,
+        coalesce: bool = True,
+        **extra_kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat payload, yielding content deltas as NDJSON/SSE lines arrive.
+        `coalesce` is accepted for parity with send(); async streams are not shared.
+        """
+        overrides = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "frequency_penalty": frequency_penalty,
+            "presence_penalty": presence_penalty,
+        }
+        payload = self._build_payload(messages, overrides, extra_kwargs)
+        payload["stream"] = True
+
+        cache_key = self._cache_key(payload, force_cache)
+        cached = self._cache_lookup(cache_key, agent_name)
+        if cached is not None:
+            yield cached
+            return
+
+        body = self._encode_payload(payload)
+        parser = ResponseParser()
+        full_content = []
+        with self._call_log(payload, body, agent_name) as call:
+            deadline = self.resilience.new_deadline()
+            # Retries only cover getting the stream started
+            response = await self.resilience.acall(
+                lambda deadline: self._open_response(body, deadline), deadline, agent_name=agent_name
+            )
+            try:
+                async for content in aiter_deltas(response.aiter_bytes(), parser):
+                    deadline.check()
+                    call.first_chunk()
+                    full_content.append(content)
+                    yield content
+            except Exception as e:
+                self.resilience.record_failure(e)
+                raise
+            finally:
+                await response.aclose()
+            call.done(parser.bytes_received)
+        self._cache_store(cache_key, "".join(full_content))
+
+
+
+async def gather_send(
+    client: AsyncLLMClient,
+    messages_list: List[list],
+    max_concurrency: int = 4,
+    return_exceptions: bool = False,
+    **send_kwargs
+) -> list:
+    """
+    Fan out one send() per messages list, with at most `max_concurrency` requests in
+    flight. Results come back in input order, like asyncio.gather.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _one(messages):
+        async with semaphore:
+            return await client.send(messages, **send_kwargs)
+
+    return await asyncio.gather(
+        *(_one(messages) for messages in messages_list),
+        return_exceptions=return_exceptions,
+    )
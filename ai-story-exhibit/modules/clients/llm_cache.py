@@ -0,0 +1,63 @@
+# modules/clients/llm_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+from modules.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+# Defaults for the `response_cache` section of api_config.yml
+DEFAULT_CACHE_CONFIG = {
+    "enabled": False,
+    "memory_entries": 256,
+    "path": os.path.join(".cache", "llm_responses.sqlite"),
+    "max_bytes": 50 * 1024 * 1024,
+    "ttl_seconds": 7 * 24 * 3600,
+}
+
+# Payload keys that change the transport, not the generated text
+_NON_SEMANTIC_KEYS = ("stream",)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def request_fingerprint(payload: dict) -> str:
+    """Stable hash of model, messages and generation params."""
+    canonical = {k: v for k, v in payload.items() if k not in _NON_SEMANTIC_KEYS}
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(payload: dict) -> bool:
+    """Only temperature 0 requests are safe to replay; a missing temperature means the server default."""
+    temperature = payload.get("temperature")
+    return temperature is not None and float(temperature) == 0.0
+
+
+def get_response_cache(cache_cfg: dict = None) -> Optional[TieredCache]:
+    """
+    Return the process-wide response cache described by `cache_cfg`, or None when disabled.
+    Caches are shared per disk path so every LLMClient instance sees the same entries.
+    """
+    cfg = {**DEFAULT_CACHE_CONFIG, **(cache_cfg or {})}
+    if not cfg["enabled"]:
+        return None
+    key = cfg["path"] or ":memory-only:"
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            disk = None
+            if cfg["path"]:
+                disk = SQLiteCache(
+                    cfg["path"],
+                    max_bytes=int(cfg["max_bytes"]),
+                    ttl_seconds=cfg["ttl_seconds"],
+                )
+            cache = TieredCache(
+                LRUCache(max_entries=int(cfg["memory_entries"])), disk, ttl_seconds=cfg["ttl_seconds"]
+            )
+            _caches[key] = cache
+        return cache
@@ -5,21 +5,69 @@ import json
 import requests
 import yaml
 import time
-import psutil
+import threading
+from typing import Iterator, Optional
 
 from dotenv import load_dotenv
-from requests.exceptions import JSONDecodeError
+from requests.adapters import HTTPAdapter
+from modules.clients.llm_cache import get_response_cache, is_deterministic, request_fingerprint
+from modules.clients.resilience import Deadline, ResiliencePolicy, within_deadline
+from modules.clients.response_parser import CHUNK_SIZE, ResponseParser, collect, iter_deltas
+from modules.clients.single_flight import SingleFlight
 from modules.utils.log_config import get_logger
+from modules.utils.metrics import metrics, start_metrics
 
 # Load .env into os.environ (so env vars override YAML)
 load_dotenv()
 logger = get_logger(__name__)
 
-class LLMClient:
+# Connection pool defaults, overridable via the `http_pool` section of api_config.yml
+DEFAULT_POOL_CONFIG = {
+    "pool_connections": 4,   # number of distinct hosts to keep a pool for
+    "pool_maxsize": 16,      # max open connections kept per host
+    "pool_block": True,      # wait for a free connection instead of opening extra ones
+    "keep_alive": True,
+}
+
+# Process-wide sessions, keyed by pool settings. Streamlit re-creates clients on
+# every rerun, so the pool has to outlive any single LLMClient instance.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Concurrent identical requests (double clicks, kiosks replaying the same demo seed)
+# share one upstream call; single_flight.stats() reports how many were coalesced.
+single_flight = SingleFlight()
+
+
+def get_http_session(
+    pool_connections: int = DEFAULT_POOL_CONFIG["pool_connections"],
+    pool_maxsize: int = DEFAULT_POOL_CONFIG["pool_maxsize"],
+    pool_block: bool = DEFAULT_POOL_CONFIG["pool_block"],
+) -> requests.Session:
     """
-    A thin wrapper over the LLM API endpoint, supporting both blocking and streaming modes.
+    Return the shared pooled session for the given pool settings, creating it on first use.
+    The underlying urllib3 pools are thread-safe, so one session serves all script threads.
+    """
+    key = (pool_connections, pool_maxsize, pool_block)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
+
+
+class BaseLLMClient:
+    """
+    Config, payload and response handling shared by the blocking and asyncio clients.
     Reads defaults from agentic_story/configs/api_config.yml, with ENV override.
-    Supports per-call overrides for generation parameters.
     """
     def __init__(self, config_path: str = None):
         # Determine config file
@@ -37,7 +85,7 @@ class LLMClient:
             cfg_path = os.path.join(project_root, "configs", "api_config.yml")
 
         with open(cfg_path, "r") as f:
-            cfg = yaml.safe_load(f)
+            cfg = yaml.safe_load(f) or {}
 
         # LLM API settings
         api_cfg = cfg.get("llm_api", {})
@@ -45,6 +93,7 @@ class LLMClient:
         self.model = os.getenv("LLM_MODEL", api_cfg.get("model", "default"))
         self.timeout = api_cfg.get("timeout", 60)
         self.default_stream = api_cfg.get("stream", False)
+        self.coalesce_requests = api_cfg.get("coalesce_requests", True)
 
         # Generation defaults
         gen_cfg = cfg.get("generation", {})
@@ -60,9 +109,174 @@ class LLMClient:
             if key in gen_cfg
         }
 
+        # HTTP connection pool settings
+        self.pool_cfg = {**DEFAULT_POOL_CONFIG, **(cfg.get("http_pool") or {})}
+        self.keep_alive = bool(self.pool_cfg["keep_alive"])
+
+        # Opt-in response cache (None when disabled)
+        self.response_cache = get_response_cache(cfg.get("response_cache"))
+
         if not self.api_url:
             raise ValueError("LLM_API_URL must be set via env or api_config.yml")
 
+        # Retries, per-call deadline and a circuit breaker shared by all clients of this endpoint
+        self.resilience = ResiliencePolicy(
+            self.api_url, cfg.get("resilience"), default_timeout=self.timeout
+        )
+
+        # Background resource sampling; request paths only record histograms
+        start_metrics(cfg.get("metrics"))
+
+        # Token budget for story continuation prompts (see services/story_context.py)
+        self.context_cfg = cfg.get("story_context") or {}
+
+    def _build_payload(self, messages: list, overrides: dict, extra_kwargs: dict) -> dict:
+        """Merge config defaults, non-None per-call overrides and extra kwargs into a payload."""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            **self.gen_defaults,
+        }
+        for param, val in overrides.items():
+            if val is not None:
+                payload[param] = val
+        # Include any additional kwargs (e.g., stop sequences)
+        payload.update(extra_kwargs)
+        return payload
+
+    def _encode_payload(self, payload: dict) -> bytes:
+        """Serialize the payload once; the same bytes are sent and measured."""
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def _record_request(self, agent_name: str, body: bytes):
+        metrics.inc("llm_requests_total", agent=agent_name, model=self.model)
+        metrics.observe("llm_request_bytes", len(body), agent=agent_name, model=self.model)
+
+    def _record_response(self, agent_name: str, duration: float, response_bytes: int,
+                         first_chunk_seconds: Optional[float] = None):
+        labels = {"agent": agent_name, "model": self.model}
+        metrics.observe("llm_latency_seconds", duration, **labels)
+        metrics.observe("llm_response_bytes", response_bytes, **labels)
+        if first_chunk_seconds is not None:
+            metrics.observe("llm_first_chunk_seconds", first_chunk_seconds, **labels)
+
+    def _record_error(self, agent_name: str):
+        metrics.inc("llm_errors_total", agent=agent_name, model=self.model)
+
+    def _cache_key(self, payload: dict, force_cache: bool = False) -> Optional[str]:
+        """
+        Fingerprint for a cacheable request, or None when caching is off or the
+        request samples (temperature > 0) and the caller did not force caching.
+        """
+        if self.response_cache is None:
+            return None
+        if not (force_cache or is_deterministic(payload)):
+            return None
+        return request_fingerprint(payload)
+
+    def _cache_lookup(self, cache_key: Optional[str], agent_name: str) -> Optional[str]:
+        if cache_key is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            return None
+        logger.info({"event": "LLM_CACHE_HIT", "agent": agent_name, "model": self.model})
+        metrics.inc("llm_cache_hits_total", agent=agent_name, model=self.model)
+        return cached.decode("utf-8")
+
+    def _cache_store(self, cache_key: Optional[str], content: Optional[str]):
+        # Streamed and blocking calls share a key, so both store the text as send() returns it
+        content = content.strip() if content else content
+        if cache_key is not None and content:
+            self.response_cache.put(cache_key, content.encode("utf-8"))
+
+    def _flight_key(self, payload: dict, stream: bool) -> str:
+        """Single-flight key: endpoint, transport mode and request fingerprint."""
+        mode = "stream" if stream else "full"
+        return f"{self.api_url}|{mode}|{request_fingerprint(payload)}"
+
+    def _headers(self) -> dict:
+        return {
+            "Content-Type": "application/json",
+            "Connection": "keep-alive" if self.keep_alive else "close",
+        }
+
+    def _call_log(self, payload: dict, body: bytes, agent_name: str) -> "_CallLog":
+        return _CallLog(self, payload, body, agent_name)
+
+
+class _CallLog:
+    """
+    LLM_REQUEST / LLM_RESPONSE / LLM_ERROR logging and metrics around one upstream
+    call, shared by the blocking and asyncio clients. Used as a context manager;
+    the body calls done() once the response has been read.
+    """
+    def __init__(self, client: BaseLLMClient, payload: dict, body: bytes, agent_name: str):
+        self.client = client
+        self.payload = payload
+        self.body = body
+        self.agent_name = agent_name
+        self.start_time = None
+        self.first_chunk_seconds = None
+
+    def __enter__(self) -> "_CallLog":
+        self.start_time = time.time()
+        logger.info({
+            "event": "LLM_REQUEST",
+            "agent": self.agent_name,
+            "model": self.client.model,
+            "payload_size_bytes": len(self.body),
+            "prompt_preview": self.payload["messages"][-1]["content"][:200]
+        })
+        self.client._record_request(self.agent_name, self.body)
+        return self
+
+    def first_chunk(self):
+        if self.first_chunk_seconds is None:
+            self.first_chunk_seconds = time.time() - self.start_time
+
+    def done(self, response_bytes: int):
+        duration = time.time() - self.start_time
+        self.client._record_response(self.agent_name, duration, response_bytes, self.first_chunk_seconds)
+        event = {
+            "event": "LLM_RESPONSE",
+            "agent": self.agent_name,
+            "model": self.client.model,
+            "duration_seconds": duration,
+            "response_size_bytes": response_bytes,
+        }
+        if self.first_chunk_seconds is not None:
+            event["first_chunk_seconds"] = self.first_chunk_seconds
+        logger.info(event)
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Abandoned streams (GeneratorExit) are not errors
+        if exc is not None and isinstance(exc, Exception):
+            self.client._record_error(self.agent_name)
+            logger.error({
+                "event": "LLM_ERROR",
+                "agent": self.agent_name,
+                "error": str(exc),
+                "duration_seconds": time.time() - self.start_time
+            })
+        return False
+
+
+class LLMClient(BaseLLMClient):
+    """
+    A thin wrapper over the LLM API endpoint, supporting both blocking and streaming modes.
+    Reads defaults from agentic_story/configs/api_config.yml, with ENV override.
+    Supports per-call overrides for generation parameters.
+    """
+    def __init__(self, config_path: str = None):
+        super().__init__(config_path=config_path)
+        # HTTP connection pool (shared across clients with the same settings)
+        self.session = get_http_session(
+            pool_connections=int(self.pool_cfg["pool_connections"]),
+            pool_maxsize=int(self.pool_cfg["pool_maxsize"]),
+            pool_block=bool(self.pool_cfg["pool_block"]),
+        )
+
     def send(
         self,
         messages: list,
@@ -73,25 +287,22 @@ class LLMClient:
         frequency_penalty: float = None,
         presence_penalty: float = None,
         agent_name: str = "default_agent",
+        force_cache: bool = False,
+        coalesce: bool = True,
         **extra_kwargs
     ) -> str:
         """
         Send a chat payload.
-        - If stream=False, returns the full assistant response (handles JSON or NDJSON).
-        - If stream=True, prints and returns streamed content.
+        - If stream=False, returns the full assistant response (handles JSON, NDJSON or SSE).
+        - If stream=True, consumes iter_send() and returns the assembled content.
         - If stream is None, uses the default from api_config.yml.
         - Per-call overrides for generation params are accepted.
+        - With the response cache enabled, temperature-0 requests (or any request
+          with force_cache=True) are answered from cache after the first call.
+        - Identical requests already in flight share that call's result
+          (disable with llm_api.coalesce_requests: false).
         """
         use_stream = self.default_stream if stream is None else stream
-
-        # Build payload with defaults
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            **self.gen_defaults,
-        }
-
-        # Override defaults if args provided
         overrides = {
             "max_tokens": max_tokens,
             "temperature": temperature,
@@ -99,120 +310,133 @@ class LLMClient:
             "frequency_penalty": frequency_penalty,
             "presence_penalty": presence_penalty,
         }
-        for param, val in overrides.items():
-            if val is not None:
-                payload[param] = val
+        if use_stream:
+            deltas = self.iter_send(
+                messages, agent_name=agent_name, force_cache=force_cache, coalesce=coalesce,
+                **overrides, **extra_kwargs
+            )
+            return "".join(deltas).strip()
 
-        # Include any additional kwargs (e.g., stop sequences)
-        payload.update(extra_kwargs)
+        payload = self._build_payload(messages, overrides, extra_kwargs)
+        cache_key = self._cache_key(payload, force_cache)
+        cached = self._cache_lookup(cache_key, agent_name)
+        if cached is not None:
+            return cached
 
-        start_time = time.time()
-        headers = {"Content-Type": "application/json"}
-        payload_size = len(json.dumps(payload))
-        response_size = 0
+        def upstream():
+            return self._send_upstream(payload, agent_name, cache_key)
 
-        try:
-            logger.info({
-                "event": "LLM_REQUEST",
-                "agent": agent_name,
-                "model": self.model,
-                "payload_size_bytes": payload_size,
-                "prompt_preview": messages[-1]["content"][:200]
-            })
+        if not (coalesce and self.coalesce_requests):
+            return upstream()
+        return single_flight.do(self._flight_key(payload, stream=False), upstream)
 
-            response = requests.post(
-                self.api_url,
-                json=payload,
-                headers=headers,
-                stream=use_stream,
-                timeout=self.timeout,
+    def _send_upstream(self, payload: dict, agent_name: str, cache_key: Optional[str]) -> str:
+        """Blocking POST + parse for one non-streaming request."""
+        body = self._encode_payload(payload)
+        with self._call_log(payload, body, agent_name) as call:
+            # One deadline for connecting, retries and reading the whole body
+            deadline = self.resilience.new_deadline()
+            response = self.resilience.call(
+                lambda deadline: self._open_response(body, deadline), deadline, agent_name=agent_name
             )
-            response.raise_for_status()
-            duration = time.time() - start_time
-
-            response_size = len(response.content or b"")
-
-            logger.info({
-                "event": "LLM_RESPONSE",
-                "agent": agent_name,
-                "model": self.model,
-                "duration_seconds": duration,
-                "response_size_bytes": response_size,
-                "cpu_percent": psutil.cpu_percent(),
-                "memory_percent": psutil.virtual_memory().percent
-            })
-            if use_stream:
-                return self._stream_response(response)
-
-            # Non-streaming: try single JSON parse
-            try:
-                data = response.json()
-                return self._extract_content(data)
-            except JSONDecodeError:
-                # Fallback: handle NDJSON lines
-                full_content = []
-                for line in response.iter_lines(decode_unicode=True):
-                    if not line:
-                        continue
-                    try:
-                        chunk = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    # Extract content
-                    content = None
-                    if "message" in chunk and isinstance(chunk["message"], dict):
-                        content = chunk["message"].get("content")
-                    elif "choices" in chunk:
-                        try:
-                            content = chunk["choices"][0]["message"]["content"]
-                        except (KeyError, IndexError):
-                            content = None
-
-                    if content:
-                        full_content.append(content)
-                return "".join(full_content).strip()    
+            # One pass over the body: JSON, NDJSON or SSE, without materialising response.content
+            parser = ResponseParser()
+            with response:
+                try:
+                    chunks = within_deadline(response.iter_content(chunk_size=CHUNK_SIZE), deadline)
+                    content = collect(chunks, parser).strip()
+                except Exception as e:
+                    self.resilience.record_failure(e)
+                    raise
+            call.done(parser.bytes_received)
+        self._cache_store(cache_key, content)
+        return content
 
-        except Exception as e:
-            logger.error({
-                "event": "LLM_ERROR",
-                "agent": agent_name,
-                "error": str(e),
-                "duration_seconds": time.time() - start_time
-            })
-            raise
+    def iter_send(
+        self,
+        messages: list,
+        max_tokens: int = None,
+        temperature: float = None,
+        top_p: float = None,
+        frequency_penalty: float = None,
+        presence_penalty: float = None,
+        agent_name: str = "default_agent",
+        force_cache: bool = False,
+        coalesce: bool = True,
+        **extra_kwargs
+    ) -> Iterator[str]:
+        """
+        Stream a chat payload, yielding content deltas as the server emits them.
+        Understands NDJSON (Ollama) and `data:` SSE framing (OpenAI-compatible servers).
+        Same config defaults and per-call overrides as send(). Identical streams
+        already in flight are shared: late callers replay the buffered deltas first.
+        """
+        overrides = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "frequency_penalty": frequency_penalty,
+            "presence_penalty": presence_penalty,
+        }
+        payload = self._build_payload(messages, overrides, extra_kwargs)
+        payload["stream"] = True
+
+        cache_key = self._cache_key(payload, force_cache)
+        cached = self._cache_lookup(cache_key, agent_name)
+        if cached is not None:
+            yield cached
+            return
 
-    def _stream_response(self, response) -> str:
+        def upstream():
+            return self._stream_upstream(payload, agent_name, cache_key)
 
+        if not (coalesce and self.coalesce_requests):
+            yield from upstream()
+        else:
+            yield from single_flight.do_stream(self._flight_key(payload, stream=True), upstream)
+
+    def _stream_upstream(self, payload: dict, agent_name: str, cache_key: Optional[str]) -> Iterator[str]:
+        """Streaming POST for one request, yielding deltas and caching the completed text."""
+        body = self._encode_payload(payload)
+        parser = ResponseParser()
         full_content = []
-        for line in response.iter_lines(decode_unicode=True):
-            if not line:
-                continue
-            try:
-                chunk = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            msg = chunk.get("message", {})
-            content = msg.get("content")
-            if content:
-                print(content, end="", flush=True)
-                full_content.append(content)
-            if chunk.get("done", False) or chunk.get("done_reason"):
-                break
-        print()
-        return "".join(full_content).strip()
-
-    def _extract_content(self, data: dict) -> str:
-
-        if "message" in data and isinstance(data["message"], dict):
-            content = data["message"].get("content")
-            if content is not None:
-                return content.strip()
-            
-        if "choices" in data:
-            try:
-                return data["choices"][0]["message"]["content"].strip()
-            except (KeyError, IndexError, TypeError):
-                pass
+        with self._call_log(payload, body, agent_name) as call:
+            deadline = self.resilience.new_deadline()
+            # Retries only cover getting the stream started; once deltas have been
+            # yielded a failure is surfaced to the caller.
+            response = self.resilience.call(
+                lambda deadline: self._open_response(body, deadline), deadline, agent_name=agent_name
+            )
+            with response:
+                try:
+                    for content in self._iter_stream_content(response, parser):
+                        deadline.check()
+                        call.first_chunk()
+                        full_content.append(content)
+                        yield content
+                except Exception as e:
+                    self.resilience.record_failure(e)
+                    raise
+            call.done(parser.bytes_received)
+        # Only a fully consumed stream is worth replaying
+        self._cache_store(cache_key, "".join(full_content))
 
+    def _open_response(self, body: bytes, deadline: Deadline):
+        """One attempt: POST the body and return the streaming response, raising on HTTP errors."""
+        response = self.session.post(
+            self.api_url,
+            data=body,
+            headers=self._headers(),
+            stream=True,
+            timeout=self.resilience.attempt_timeout(deadline),
+        )
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
 
+    def _iter_stream_content(self, response, parser: ResponseParser = None) -> Iterator[str]:
+        """Yield non-empty content deltas from an NDJSON or SSE streaming response."""
+        return iter_deltas(response.iter_content(chunk_size=CHUNK_SIZE), parser)
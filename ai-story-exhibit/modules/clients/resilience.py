@@ -0,0 +1,258 @@
+# modules/clients/resilience.py
+
+import threading
+import time
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+import httpx
+import requests
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+
+from modules.utils.log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Defaults for the `resilience` section of api_config.yml
+DEFAULT_RESILIENCE_CONFIG = {
+    "max_attempts": 3,
+    "backoff_initial": 0.5,         # seconds; doubled per attempt with full jitter
+    "backoff_max": 4.0,
+    "retry_statuses": [408, 429, 500, 502, 503, 504],
+    "connect_timeout": 3.05,
+    "first_byte_timeout": None,     # None -> llm_api.timeout
+    "total_deadline": None,         # None -> llm_api.timeout; covers every attempt and backoff
+    "breaker_failure_threshold": 5,
+    "breaker_cooldown_seconds": 30,
+    "fallback_to_mock": False,
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without contacting the backend while its circuit breaker is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The per-call deadline ran out (across retries, or mid-stream)."""
+
+
+class Deadline:
+    """Wall-clock budget for one logical call."""
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"LLM call exceeded its {self.seconds:g}s deadline")
+
+
+def within_deadline(chunks: Iterable[bytes], deadline: Deadline) -> Iterator[bytes]:
+    """
+    Pass body chunks through, raising DeadlineExceeded once the deadline has run out.
+    Read timeouts only bound each read, so a server dripping bytes needs this check.
+    """
+    for chunk in chunks:
+        deadline.check()
+        yield chunk
+
+
+async def awithin_deadline(chunks: AsyncIterable[bytes], deadline: Deadline) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        deadline.check()
+        yield chunk
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures. While open, calls
+    fail fast with CircuitOpenError. After `cooldown_seconds` one probe call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown_seconds: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError while open; returns True if this call is the half-open probe."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            retry_in = max(0.0, self.cooldown_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(
+            f"Circuit for {self.name} is open after repeated failures; retry in {retry_in:.0f}s"
+        )
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """End a probe whose outcome said nothing about backend health; the next call probes again."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, failure_threshold: int = 5, cooldown_seconds: float = 30) -> CircuitBreaker:
+    """Process-wide breaker per backend, so every client instance sees the same health."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, failure_threshold, cooldown_seconds)
+            _breakers[name] = breaker
+        return breaker
+
+
+class ResiliencePolicy:
+    """
+    Retry, deadline and circuit-breaker settings for one LLM endpoint.
+    Retries use exponential backoff with full jitter on connection errors, timeouts
+    and retryable HTTP statuses, and never start an attempt past the deadline.
+    """
+    def __init__(self, name: str, resilience_cfg: dict = None, default_timeout: float = 60):
+        cfg = {**DEFAULT_RESILIENCE_CONFIG, **(resilience_cfg or {})}
+        self.max_attempts = int(cfg["max_attempts"])
+        self.backoff_initial = float(cfg["backoff_initial"])
+        self.backoff_max = float(cfg["backoff_max"])
+        self.retry_statuses = frozenset(int(code) for code in cfg["retry_statuses"])
+        self.connect_timeout = float(cfg["connect_timeout"])
+        self.first_byte_timeout = float(cfg["first_byte_timeout"] or default_timeout)
+        self.total_deadline = float(cfg["total_deadline"] or default_timeout)
+        self.fallback_to_mock = bool(cfg["fallback_to_mock"])
+        self.breaker = get_circuit_breaker(
+            name,
+            failure_threshold=int(cfg["breaker_failure_threshold"]),
+            cooldown_seconds=float(cfg["breaker_cooldown_seconds"]),
+        )
+
+    def new_deadline(self) -> Deadline:
+        return Deadline(self.total_deadline)
+
+    def attempt_timeout(self, deadline: Deadline):
+        """(connect, read) timeout for the next attempt, capped by what is left of the deadline."""
+        deadline.check()
+        remaining = deadline.remaining()
+        return (min(self.connect_timeout, remaining), min(self.first_byte_timeout, remaining))
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        if isinstance(exc, (CircuitOpenError, DeadlineExceeded)):
+            return False
+        if isinstance(exc, requests.exceptions.HTTPError):
+            return exc.response is not None and exc.response.status_code in self.retry_statuses
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in self.retry_statuses
+        return isinstance(exc, (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            httpx.TransportError,
+        ))
+
+    def record_failure(self, exc: BaseException):
+        if self.is_retryable(exc) or isinstance(exc, DeadlineExceeded):
+            self.breaker.record_failure()
+        elif isinstance(exc, (requests.exceptions.HTTPError, httpx.HTTPStatusError)):
+            # Client errors (400, 401, ...) still mean the backend answered
+            self.breaker.record_success()
+
+    def _retry_kwargs(self, deadline: Deadline, agent_name: str) -> dict:
+        def log_retry(retry_state):
+            logger.warning({
+                "event": "LLM_RETRY",
+                "agent": agent_name,
+                "attempt": retry_state.attempt_number,
+                "error": str(retry_state.outcome.exception()),
+                "sleep_seconds": retry_state.next_action.sleep if retry_state.next_action else None,
+            })
+
+        return {
+            "stop": stop_after_attempt(self.max_attempts) | stop_before_delay(deadline.seconds),
+            "wait": wait_random_exponential(multiplier=self.backoff_initial, max=self.backoff_max),
+            "retry": retry_if_exception(self.is_retryable),
+            "before_sleep": log_retry,
+            "reraise": True,
+        }
+
+    def call(self, fn: Callable[[Deadline], object], deadline: Optional[Deadline] = None,
+             agent_name: str = "default_agent"):
+        """
+        Run fn(deadline) under the breaker and retry policy. fn must raise on
+        failure (e.g. via response.raise_for_status()).
+        """
+        deadline = deadline or self.new_deadline()
+        probe = self.breaker.before_call()
+        try:
+            for attempt in Retrying(**self._retry_kwargs(deadline, agent_name)):
+                with attempt:
+                    result = fn(deadline)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        finally:
+            # Any other outcome (ValueError, cancellation, ...) must not leave the probe
+            # in flight, or every later call would fail fast until restart
+            if probe:
+                self.breaker.release_probe()
+        self.breaker.record_success()
+        return result
+
+    async def acall(self, fn, deadline: Optional[Deadline] = None, agent_name: str = "default_agent"):
+        """asyncio variant of call(); fn is an async callable taking the deadline."""
+        deadline = deadline or self.new_deadline()
+        probe = self.breaker.before_call()
+        try:
+            async for attempt in AsyncRetrying(**self._retry_kwargs(deadline, agent_name)):
+                with attempt:
+                    result = await fn(deadline)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        finally:
+            # Any other outcome (ValueError, cancellation, ...) must not leave the probe
+            # in flight, or every later call would fail fast until restart
+            if probe:
+                self.breaker.release_probe()
+        self.breaker.record_success()
+        return result
@@ -0,0 +1,162 @@
+# modules/clients/response_parser.py
+
+import codecs
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+# Read size for response bodies; large enough to amortise per-chunk overhead,
+# small enough that a delta is surfaced as soon as its line is complete
+CHUNK_SIZE = 8 * 1024
+
+_SSE_SKIP = (":", "event:", "id:", "retry:")
+
+
+def chunk_content(chunk) -> Optional[str]:
+    """
+    Content carried by one decoded response object: an Ollama message, an
+    OpenAI-compatible streaming delta, or a complete OpenAI-compatible message.
+    """
+    if not isinstance(chunk, dict):
+        return None
+    message = chunk.get("message")
+    if isinstance(message, dict):
+        return message.get("content")
+    choices = chunk.get("choices")
+    if choices and isinstance(choices, list) and isinstance(choices[0], dict):
+        choice = choices[0]
+        delta = choice.get("delta") or choice.get("message") or {}
+        return delta.get("content")
+    return None
+
+
+def chunk_done(chunk) -> bool:
+    return isinstance(chunk, dict) and bool(chunk.get("done", False) or chunk.get("done_reason"))
+
+
+class ResponseParser:
+    """
+    Incremental parser for LLM response bodies. Feed it raw bytes as they arrive and
+    it returns the content deltas completed by that read, in a single pass:
+
+    - NDJSON (Ollama) and `data:` SSE framing (OpenAI-compatible) are parsed line by
+      line; only the current partial line is buffered.
+    - A plain JSON body is recognised when its first line is not a complete document
+      (pretty-printed JSON) and is decoded once on close(); compact single-line JSON
+      is simply a one-line NDJSON stream.
+
+    `bytes_received` counts the raw body bytes seen so far, so callers can log the
+    response size without materialising `response.content`.
+    """
+    def __init__(self):
+        self.bytes_received = 0
+        self.done = False
+        self.whole_document = False
+        # One incremental decode per read (json.loads on bytes would re-detect the
+        # encoding per line); multi-byte characters split across reads are carried over
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._tail = ""           # incomplete last line of the previous read
+        self._document = []       # text of a multi-line JSON body
+        self._first_line = True
+
+    def feed(self, data: bytes) -> List[str]:
+        self.bytes_received += len(data)
+        if self.done:
+            return []
+        text = self._decoder.decode(data)
+        if self.whole_document:
+            self._document.append(text)
+            return []
+
+        # str.split runs in C; only the trailing partial line is carried over
+        lines = (self._tail + text).split("\n") if self._tail else text.split("\n")
+        self._tail = lines.pop()
+        deltas = []
+        for index, line in enumerate(lines):
+            if not self._handle_line(line, deltas):
+                # Multi-line JSON document: keep everything from here and decode on close()
+                self.whole_document = True
+                self._document = ["\n".join(lines[index:]), "\n", self._tail]
+                self._tail = ""
+                break
+            if self.done:
+                break
+        return deltas
+
+    def close(self) -> List[str]:
+        """Flush the final (unterminated) line or the buffered JSON document."""
+        deltas = []
+        if not self.done:
+            self._tail += self._decoder.decode(b"", final=True)
+            if self.whole_document:
+                try:
+                    document = json.loads("".join(self._document) + self._tail)
+                except ValueError:
+                    document = None
+                content = chunk_content(document)
+                if content:
+                    deltas.append(content)
+            elif self._tail:
+                self._handle_line(self._tail, deltas)
+        self._tail = ""
+        self._document = []
+        self.done = True
+        return deltas
+
+    def _handle_line(self, line: str, deltas: List[str]) -> bool:
+        """Parse one line into `deltas`; False means it starts a multi-line JSON document."""
+        line = line.strip()
+        if not line:
+            return True
+        first_line, self._first_line = self._first_line, False
+
+        if line.startswith("data:"):
+            line = line[5:].lstrip()
+            if line == "[DONE]":
+                self.done = True
+                return True
+        elif line.startswith(_SSE_SKIP):
+            return True  # SSE comment / keep-alive / non-data field
+
+        try:
+            chunk = json.loads(line)
+        except ValueError:
+            # The opening line of a pretty-printed body is not a document on its own
+            return not (first_line and line[:1] in ("{", "["))
+
+        content = chunk_content(chunk)
+        if content:
+            deltas.append(content)
+        if chunk_done(chunk):
+            self.done = True
+        return True
+
+
+def iter_deltas(chunks: Iterable[bytes], parser: ResponseParser = None) -> Iterator[str]:
+    """Yield content deltas from an iterable of raw body chunks ("yield deltas" mode)."""
+    parser = parser or ResponseParser()
+    for data in chunks:
+        yield from parser.feed(data)
+        if parser.done:
+            return
+    yield from parser.close()
+
+
+def collect(chunks: Iterable[bytes], parser: ResponseParser = None) -> str:
+    """Assemble the full response text from raw body chunks ("collect" mode)."""
+    return "".join(iter_deltas(chunks, parser))
+
+
+async def aiter_deltas(chunks: AsyncIterable[bytes], parser: ResponseParser = None) -> AsyncIterator[str]:
+    """asyncio variant of iter_deltas() for httpx's aiter_bytes()."""
+    parser = parser or ResponseParser()
+    async for data in chunks:
+        for delta in parser.feed(data):
+            yield delta
+        if parser.done:
+            return
+    for delta in parser.close():
+        yield delta
+
+
+async def acollect(chunks: AsyncIterable[bytes], parser: ResponseParser = None) -> str:
+    return "".join([delta async for delta in aiter_deltas(chunks, parser)])
@@ -0,0 +1,167 @@
+# modules/clients/single_flight.py
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+
+
+class _Call:
+    """One in-flight blocking call shared by every thread asking for the same key."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _StreamCall:
+    """
+    One in-flight stream. A pump thread drains the upstream iterator into `chunks`;
+    every caller, including the one that started it, replays the buffer and then
+    follows new chunks, so abandoning one reader never cuts the others off. Once the
+    last reader has gone the pump closes the upstream instead of reading it to the end.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self.cond = threading.Condition()
+        self.followers = 0          # guarded by SingleFlight._lock
+        self.abandoned = False
+
+    def pump(self, upstream: Iterable, on_finish: Callable[[], None]):
+        try:
+            for chunk in upstream:
+                if self.abandoned:
+                    # Closing the generator closes its response and frees the connection
+                    close = getattr(upstream, "close", None)
+                    if close is not None:
+                        close()
+                    break
+                with self.cond:
+                    self.chunks.append(chunk)
+                    self.cond.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            on_finish()
+            with self.cond:
+                self.finished = True
+                self.cond.notify_all()
+
+    def follow(self, on_leave: Callable[[], None]) -> Iterator[Any]:
+        try:
+            index = 0
+            while True:
+                with self.cond:
+                    while index >= len(self.chunks) and not self.finished:
+                        self.cond.wait()
+                    pending = self.chunks[index:]
+                    finished = self.finished
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+                if finished and index >= len(self.chunks):
+                    break
+            if self.error is not None:
+                raise self.error
+        finally:
+            # Also runs on GeneratorExit, when a reader stops early
+            on_leave()
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one upstream call.
+    Callers pass a key (e.g. a request fingerprint) and a zero-argument function;
+    while a call for that key is in flight, later callers wait for and share its
+    outcome instead of issuing their own. Works for threads (do, do_stream) and
+    for asyncio tasks on the same event loop (ado).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self._async_calls = {}
+        self._counts = {"calls": 0, "upstream_calls": 0, "coalesced": 0}
+
+    def _join_or_lead(self, table: dict, key, factory: Callable[[], Any], on_join: Callable[[Any], None] = None):
+        """
+        Return (entry, is_leader) for `key`, creating the entry if nobody holds it.
+        `on_join` runs on the entry under the lock, for leader and followers alike.
+        """
+        with self._lock:
+            self._counts["calls"] += 1
+            entry = table.get(key)
+            leader = entry is None
+            if leader:
+                entry = factory()
+                table[key] = entry
+                self._counts["upstream_calls"] += 1
+            else:
+                self._counts["coalesced"] += 1
+            if on_join is not None:
+                on_join(entry)
+            return entry, leader
+
+    def _release(self, table: dict, key, entry: Any = None):
+        """Drop `key`, unless `entry` is given and a newer entry has replaced it."""
+        with self._lock:
+            if entry is None or table.get(key) is entry:
+                table.pop(key, None)
+
+    def _join_stream(self, call: _StreamCall):
+        call.followers += 1
+
+    def _leave_stream(self, key, call: _StreamCall):
+        with self._lock:
+            call.followers -= 1
+            if call.followers == 0 and not call.finished:
+                # Nobody reads it any more: stop the upstream, and let the next
+                # caller with this key start a fresh one
+                call.abandoned = True
+                if self._streams.get(key) is call:
+                    del self._streams[key]
+
+    def do(self, key, fn: Callable[[], Any]) -> Any:
+        call, leader = self._join_or_lead(self._calls, key, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._release(self._calls, key)
+            call.done.set()
+
+    def do_stream(self, key, fn: Callable[[], Iterable]) -> Iterator[Any]:
+        call, leader = self._join_or_lead(self._streams, key, _StreamCall, on_join=self._join_stream)
+        if leader:
+            threading.Thread(
+                target=call.pump,
+                args=(fn(), lambda: self._release(self._streams, key, call)),
+                daemon=True,
+            ).start()
+        return call.follow(lambda: self._leave_stream(key, call))
+
+    async def ado(self, key, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # asyncio futures belong to one loop, so tasks only coalesce within their loop
+        loop = asyncio.get_running_loop()
+        task, leader = self._join_or_lead(
+            self._async_calls, (id(loop), key), lambda: loop.create_task(fn())
+        )
+        if leader:
+            task.add_done_callback(lambda _: self._release(self._async_calls, (id(loop), key)))
+        # shield: one cancelled waiter must not cancel the shared request
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            counts["in_flight"] = len(self._calls) + len(self._streams) + len(self._async_calls)
+        return counts
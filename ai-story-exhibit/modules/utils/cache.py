@@ -0,0 +1,209 @@
+# modules/utils/cache.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU for bytes values, bounded by entry count and
+    (optionally) by total value size. Entries put with `expires_at` (a time.time()
+    timestamp) are treated as missing from then on.
+    """
+    def __init__(self, max_entries: int = 256, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._data[key]
+                self._bytes -= len(value)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes, expires_at: float = None):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._data[key] = (value, expires_at)
+            self._bytes += len(value)
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (evicted, _) = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class SQLiteCache:
+    """
+    On-disk bytes cache in a single SQLite file. Entries older than `ttl_seconds`
+    are treated as missing and purged; when the stored total exceeds `max_bytes`
+    the least recently accessed entries are evicted.
+    """
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+            conn.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """The value and the time.time() at which it expires (None: never), or None."""
+        now = time.time()
+        with self._lock, sqlite3.connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT value, created FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self._expired(created, now):
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+            expires_at = created + self.ttl_seconds if self.ttl_seconds is not None else None
+            return bytes(value), expires_at
+
+    def put(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), len(value), now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now: float):
+        if self.ttl_seconds is not None:
+            conn.execute("DELETE FROM cache WHERE created < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed ASC").fetchall():
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, sqlite3.connect(self.path) as conn:
+            conn.execute("DELETE FROM cache")
+            conn.commit()
+
+    @property
+    def size_bytes(self) -> int:
+        with sqlite3.connect(self.path) as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional SQLite tier, with hit/miss counters.
+    Disk hits are promoted into memory. `ttl_seconds` (default: the disk tier's)
+    applies to the memory tier too; promoted entries keep their disk expiry.
+    """
+    def __init__(self, memory: LRUCache, disk: SQLiteCache = None, ttl_seconds: float = None):
+        self.memory = memory
+        self.disk = disk
+        if ttl_seconds is None and disk is not None:
+            ttl_seconds = disk.ttl_seconds
+        self.ttl_seconds = ttl_seconds
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                value, expires_at = entry
+                self.memory.put(key, value, expires_at)
+                self._count("disk_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def put(self, key: str, value: bytes):
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self.memory.put(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.put(key, value)
+        self._count("writes")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        counts["hits"] = counts["memory_hits"] + counts["disk_hits"]
+        counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        counts["memory_entries"] = len(self.memory)
+        counts["memory_bytes"] = self.memory.size_bytes
+        counts["disk_bytes"] = self.disk.size_bytes if self.disk is not None else 0
+        return counts
@@ -0,0 +1,270 @@
+# modules/utils/metrics.py
+
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import psutil
+
+from modules.utils.log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Defaults for the `metrics` section of api_config.yml
+DEFAULT_METRICS_CONFIG = {
+    "sample_interval_seconds": 5.0,   # background resource sampling period
+    "sample_history": 120,            # samples kept for the admin page (10 minutes at 5s)
+    "scrape_port": None,              # serve snapshot() as JSON on 127.0.0.1:<port> when set
+}
+
+# Geometric bucket bounds shared by every histogram: 1e-4 .. ~1e10 with 15% steps,
+# so one layout covers seconds and bytes and quantiles are within ~15%.
+_BUCKET_FACTOR = 1.15
+BUCKET_BOUNDS = tuple(1e-4 * _BUCKET_FACTOR ** i for i in range(int(math.log(1e14, _BUCKET_FACTOR)) + 1))
+
+
+class _HistogramShard:
+    """Counts for one (metric, labels) pair, written by a single thread only."""
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "_HistogramShard"):
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                # Clamp the bucket bound to what was actually observed
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+
+class _Shard:
+    """Everything one thread has recorded: histograms and counters keyed by (name, labels)."""
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.histograms = {}
+        self.counters = {}
+
+
+class MetricsRegistry:
+    """
+    Histograms (count/sum/min/max/p50/p95/p99) and counters keyed by name and labels.
+    Each thread records into its own shard, so observe() and inc() take no lock;
+    snapshot() merges the shards. Shards of threads that have exited are folded into
+    one retired shard whenever a new thread starts recording, and on snapshot().
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard(None)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(threading.current_thread())
+            self._local.shard = shard
+            # Only taken once per thread. Streamlit reruns and stream pumps start new
+            # threads all the time, so fold the finished ones in here too.
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead_shards(self):
+        # Caller holds self._lock; an exited thread no longer writes to its shard
+        live = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                live.append(shard)
+            else:
+                self._merge_into(self._retired, shard)
+        self._shards = live
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histograms = self._shard().histograms
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _HistogramShard()
+        histogram.record(value)
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0) + amount
+
+    def _merge_into(self, target: _Shard, shard: _Shard):
+        for key, histogram in list(shard.histograms.items()):
+            merged = target.histograms.get(key)
+            if merged is None:
+                merged = target.histograms[key] = _HistogramShard()
+            merged.merge(histogram)
+        for key, value in list(shard.counters.items()):
+            target.counters[key] = target.counters.get(key, 0) + value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._retire_dead_shards()
+            total = _Shard(None)
+            self._merge_into(total, self._retired)
+            for shard in self._shards:
+                self._merge_into(total, shard)
+
+        histograms = {}
+        for (name, labels), histogram in sorted(total.histograms.items()):
+            histograms.setdefault(name, []).append({
+                "labels": dict(labels),
+                "count": histogram.count,
+                "sum": histogram.total,
+                "min": histogram.min,
+                "max": histogram.max,
+                "p50": histogram.quantile(0.50),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            })
+        counters = {}
+        for (name, labels), value in sorted(total.counters.items()):
+            counters.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return {"histograms": histograms, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.histograms.clear()
+                shard.counters.clear()
+            self._retired = _Shard(None)
+
+
+class ResourceSampler:
+    """
+    Daemon thread that samples process and host resource usage every `interval`
+    seconds, so request paths never call psutil themselves.
+    """
+    def __init__(self, interval: float = 5.0, history: int = 120):
+        self.interval = interval
+        self.history = deque(maxlen=history)
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self) -> dict:
+        with self._process.oneshot():
+            memory = self._process.memory_info()
+            sample = {
+                "timestamp": time.time(),
+                "process_cpu_percent": self._process.cpu_percent(),
+                "process_rss_bytes": memory.rss,
+                "process_threads": self._process.num_threads(),
+            }
+        sample["host_cpu_percent"] = psutil.cpu_percent()
+        sample["host_memory_percent"] = psutil.virtual_memory().percent
+        self.history.append(sample)
+        return sample
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning({"event": "RESOURCE_SAMPLE_FAILED", "error": str(e)})
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def latest(self) -> Optional[dict]:
+        return self.history[-1] if self.history else None
+
+
+# Process-wide instances; Streamlit reruns must not restart the sampler
+metrics = MetricsRegistry()
+_sampler = None
+_scrape_server = None
+_setup_lock = threading.Lock()
+
+
+def _scrape_handler():
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(snapshot(), default=str).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics(metrics_cfg: dict = None) -> ResourceSampler:
+    """Start the resource sampler (and optional scrape endpoint) once per process."""
+    global _sampler, _scrape_server
+    cfg = {**DEFAULT_METRICS_CONFIG, **(metrics_cfg or {})}
+    with _setup_lock:
+        if _sampler is None:
+            _sampler = ResourceSampler(
+                interval=float(cfg["sample_interval_seconds"]),
+                history=int(cfg["sample_history"]),
+            )
+            _sampler.start()
+        if cfg["scrape_port"] and _scrape_server is None:
+            try:
+                _scrape_server = ThreadingHTTPServer(("127.0.0.1", int(cfg["scrape_port"])), _scrape_handler())
+            except OSError as e:
+                # Another process (e.g. a second Streamlit server) already serves it
+                logger.warning({"event": "METRICS_SCRAPE_UNAVAILABLE", "error": str(e)})
+            else:
+                threading.Thread(target=_scrape_server.serve_forever, name="metrics-scrape", daemon=True).start()
+        return _sampler
+
+
+def snapshot() -> dict:
+    """Histograms, counters and resource samples, ready for json.dumps or an admin page."""
+    data = metrics.snapshot()
+    data["resources"] = _sampler.latest() if _sampler else None
+    data["resource_history"] = list(_sampler.history) if _sampler else []
+    return data
@@ -2,13 +2,13 @@
 
 import streamlit as st
 from state.session import init_story_state
-from services.llm_client import create_llm_client
+from services.llm_client import create_llm_client, generate_alternatives
 from models.settings import AppSettings # Import AppSettings
 from models.story import Story # Import Story model
 from pydantic import ValidationError
 
 st.title("Story Generator") # Added emoji for consistency
-settings = st.session_state.get["settings"]
+settings = st.session_state.get("settings", {})
 
 # Load settings and story data with Pydantic validation
 try:
@@ -56,18 +56,19 @@ except Exception as e: # Catch any other unexpected errors during client creatio
 # Generate initial paragraph if not already generated
 if not story_model.paragraphs:
     if story_model.prompt: # Only generate if there's a prompt
-        with st.spinner("Generating your story's first paragraph..."):
-            try:
-                first_para = llm.generate(
-                    prompt=story_model.prompt,
-                    genre=story_model.genre,
-                    elements=story_model.elements
-                )
-                story_model.paragraphs.append(first_para)
-                st.session_state.story = story_model.model_dump() # Save update
-                st.experimental_rerun() # Rerun to display the new paragraph
-            except Exception as e:
-                st.error(f"Failed to generate story: {e}")
+        st.caption("Generating your story's first paragraph...")
+        try:
+            # Render deltas as they arrive instead of waiting behind a spinner
+            first_para = st.write_stream(llm.generate_stream(
+                prompt=story_model.prompt,
+                genre=story_model.genre,
+                elements=story_model.elements
+            ))
+            story_model.paragraphs.append(first_para.strip())
+            st.session_state.story = story_model.model_dump() # Save update
+            st.experimental_rerun() # Rerun to display the new paragraph
+        except Exception as e:
+            st.error(f"Failed to generate story: {e}")
     else:
         st.info("Please provide a story idea in the Story Builder to begin.")
         if st.button("← Go to Story Builder"):
@@ -89,19 +90,18 @@ if story_model.paragraphs: # Only show actions if there's content
     with col1:
         if st.button(" Regenerate Last"):
             if story_model.paragraphs:
-                with st.spinner("Regenerating last paragraph..."):
-                    try:
-                        regenerated_para = llm.generate(
-                            prompt=story_model.prompt, # Or a modified prompt for regeneration
-                            genre=story_model.genre,
-                            elements=story_model.elements
-                            # context_to_change=story_model.paragraphs[-1] # Example kwarg for future LLMs
-                        )
-                        story_model.paragraphs[-1] = regenerated_para
-                        st.session_state.story = story_model.model_dump()
-                        st.experimental_rerun()
-                    except Exception as e:
-                        st.error(f"Failed to regenerate: {e}")
+                try:
+                    regenerated_para = st.write_stream(llm.generate_stream(
+                        prompt=story_model.prompt, # Or a modified prompt for regeneration
+                        genre=story_model.genre,
+                        elements=story_model.elements,
+                        story_history=story_model.paragraphs[:-1]  # context up to the paragraph being replaced
+                    ))
+                    story_model.paragraphs[-1] = regenerated_para.strip()
+                    st.session_state.story = story_model.model_dump()
+                    st.experimental_rerun()
+                except Exception as e:
+                    st.error(f"Failed to regenerate: {e}")
 
     with col2:
         with st.form("add_line_form", clear_on_submit=True):
@@ -114,19 +114,41 @@ if story_model.paragraphs: # Only show actions if there's content
 
     with col3:
         if st.button(" Continue Story (AI)"): # Changed button text for clarity
-            with st.spinner("AI is continuing the story..."):
-                try:
-                    next_para = llm.generate(
-                        prompt=story_model.prompt, # Or a prompt indicating continuation
-                        genre=story_model.genre,
-                        elements=story_model.elements,
-                        story_history=story_model.paragraphs # Example kwarg for context for future LLMs
-                    )
-                    story_model.paragraphs.append(next_para)
-                    st.session_state.story = story_model.model_dump()
-                    st.experimental_rerun()
-                except Exception as e:
-                    st.error(f"Failed to continue story: {e}")
+            try:
+                next_para = st.write_stream(llm.generate_stream(
+                    prompt=story_model.prompt, # Or a prompt indicating continuation
+                    genre=story_model.genre,
+                    elements=story_model.elements,
+                    story_history=story_model.paragraphs  # trimmed to the token budget by the client
+                ))
+                story_model.paragraphs.append(next_para.strip())
+                st.session_state.story = story_model.model_dump()
+                st.experimental_rerun()
+            except Exception as e:
+                st.error(f"Failed to continue story: {e}")
+
+    # Alternative continuations are requested concurrently, so three cost about one round trip
+    if st.button(" Suggest 3 Continuations"):
+        with st.spinner("Drafting alternative continuations..."):
+            try:
+                st.session_state["continuation_options"] = generate_alternatives(
+                    llm,
+                    prompt=story_model.prompt,
+                    n=3,
+                    genre=story_model.genre,
+                    elements=story_model.elements,
+                    story_history=story_model.paragraphs
+                )
+            except Exception as e:
+                st.error(f"Failed to suggest continuations: {e}")
+
+    for opt_idx, option in enumerate(st.session_state.get("continuation_options", [])):
+        st.markdown(f"**Option {opt_idx+1}:** {option}")
+        if st.button(f"Use Option {opt_idx+1}", key=f"use_continuation_{opt_idx}"):
+            story_model.paragraphs.append(option.strip())
+            st.session_state.story = story_model.model_dump()
+            st.session_state["continuation_options"] = []
+            st.experimental_rerun()
 
 # --- Navigation ---
 # Only allow proceeding if there's at least one paragraph
@@ -8,13 +8,22 @@
 # Display all generated images alongside their paragraphs.
 
 # Provide navigation to the Narration page.
+import time
+
 import streamlit as st
 from state.session import init_story_state
 from models.story import Story # Import the Story Pydantic model
 from services.image_gen_client import create_image_client
+from services.image_batch import CANCELLED, FAILED, QUEUED, RUNNING, ImageBatchJob
+from services.image_store import get_image_store
 from models.settings import AppSettings # Import AppSettings
 from pydantic import ValidationError
 
+@st.cache_resource
+def get_image_client(backend: str):
+    # One cached client per backend for the whole server, instead of one per click
+    return create_image_client(backend, cache=True)
+
 st.title(" Visualize Scene") # Added emoji, removed leading space
 st.markdown("Generate or review visuals for each part of your story.")
 init_story_state()
@@ -38,7 +47,6 @@ except ValidationError as e:
     st.stop()
 
 paragraphs = story_model.paragraphs
-images = story_model.images # This will be a list, images are likely PIL.Image objects
 
 if not paragraphs:
     st.warning("No story paragraphs found. Go back to the Story Generator first.")
@@ -46,31 +54,90 @@ if not paragraphs:
         st.switch_page("pages/2_Story_Generator.py")
     st.stop()
 
-# For any paragraph missing an image, generate one
+# Images live on disk; the story only holds ImageRefs. Scenes can finish out of
+# order, so images is kept index-aligned with paragraphs (None = missing)
+image_store = get_image_store()
+images = [
+    ref if ref is not None and image_store.exists(ref) else None
+    for ref in story_model.images
+] + [None] * (len(paragraphs) - len(story_model.images))
+story_model.images = images
+
+def save_story():
+    st.session_state.story = story_model.model_dump()
+
+def collect_finished(job, slots=None):
+    for idx, ref in job.take_completed():
+        if idx < len(images):
+            images[idx] = ref
+            if slots:
+                slots[idx].image(image_store.path(ref), caption=f"Visual for Scene {idx+1}", use_column_width=True)
+    save_story()
+
+# A batch started on an earlier run keeps going in the background; pick up what it finished
+job = st.session_state.get("image_job")
+if job is not None:
+    collect_finished(job)
+
+def start_job(scene_indices):
+    st.session_state.image_job = ImageBatchJob(
+        get_image_client(app_settings.image_backend),
+        {idx: paragraphs[idx] for idx in scene_indices},
+        store=image_store,
+        style=app_settings.image_style,
+    )
+    st.experimental_rerun()
+
+missing = [idx for idx, img in enumerate(images) if img is None]
+job_running = job is not None and not job.finished
+if job_running:
+    if st.button("✖ Cancel Image Generation"):
+        job.cancel()
+        st.experimental_rerun()
+elif len(missing) > 1:
+    if st.button(f"Generate All Missing Images ({len(missing)})"):
+        start_job(missing)
+
+def show_progress(idx, state):
+    # Backends with progressive previews replace the status note within a second or so
+    preview = job.preview(idx)
+    if preview is not None:
+        slots[idx].image(preview.data, caption=f"Scene {idx+1}: preview {preview.step}/{preview.total_steps}",
+                         use_column_width=True)
+    else:
+        slots[idx].info(f"Scene {idx+1}: {state}…")
+
+status = job.status() if job is not None else {}
+errors = job.errors() if job is not None else {}
+slots = {}
 for idx, para in enumerate(paragraphs):
     st.markdown(f"**Scene {idx+1}:** {para}")
-    if idx < len(images):
-        # Assuming images[idx] is a PIL.Image object or compatible with st.image
-        st.image(images[idx], caption=f"Visual for Scene {idx+1}", use_column_width=True)
+    slots[idx] = st.empty()
+    if images[idx] is not None:
+        slots[idx].image(image_store.path(images[idx]), caption=f"Visual for Scene {idx+1}", use_column_width=True)
+    elif status.get(idx) in (QUEUED, RUNNING):
+        show_progress(idx, status[idx])
     else:
-        if st.button(f"Generate Image for Scene {idx+1}"):
-            with st.spinner("Generating image..."):
-                try:
-                    image_client = create_image_client(app_settings.image_backend)
-                    # NOTE: Ensure that the concrete image generation client selected via
-                    # app_settings.image_backend is designed to accept and utilize the 'style' keyword argument.
-                    img = image_client.generate(prompt=para, style=app_settings.image_style)
-                    story_model.images.append(img) # Append to the Pydantic model's list
-                    st.session_state.story = story_model.model_dump() # Save updated model back
-                except Exception as e:
-                    st.error(f"Image generation failed: {e}")
-                    # Potentially log e for debugging
-            st.experimental_rerun()
-        # Stop rendering further scenes until this one has an image
-        break
+        if status.get(idx) == FAILED:
+            st.error(f"Image generation failed: {errors.get(idx)}")
+        elif status.get(idx) == CANCELLED:
+            st.caption("Cancelled.")
+        if not job_running and st.button(f"Generate Image for Scene {idx+1}"):
+            start_job([idx])
+
+# Render images as they complete; a button click interrupts this loop with a rerun
+if job_running:
+    while not job.finished:
+        collect_finished(job, slots)
+        for idx, state in job.status().items():
+            if images[idx] is None and state in (QUEUED, RUNNING):
+                show_progress(idx, state)
+        time.sleep(0.3)
+    collect_finished(job, slots)
+    st.experimental_rerun()
 
 # If all scenes have images, let user move on
-if paragraphs and len(images) == len(paragraphs): # Ensure paragraphs is not empty
+if all(img is not None for img in images):
     st.success("All scenes visualized!")
     if st.button("Next: Narrate Story "):
         st.switch_page("pages/4_Narrate_Story.py")
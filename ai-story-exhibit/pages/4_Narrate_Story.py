@@ -1,11 +1,12 @@
 from db.story_logger import save_story
 # pages/4_Narrate_Story.py
 
+import time
 import streamlit as st
 from state.session import init_story_state
-from services.tts_client import create_tts_client
+from services.tts_client import AudioChunk, create_tts_client, encode_audio, join_audio_chunks, prefetch
 from models.settings import AppSettings # Import AppSettings
-from models.story import Story # Import Story model
+from models.story import NarrationAudio, Story # Import Story model
 from pydantic import ValidationError
 
 st.title(" Narrate Story") # Added emoji, removed leading space
@@ -31,7 +32,7 @@ except ValidationError as e:
     st.stop()
 
 paragraphs = story_model.paragraphs
-audios = story_model.audio # This will be a list of bytes objects
+audios = story_model.audio # Encoded narration per scene, with its MIME type
 
 if not paragraphs:
     st.warning("No story generated yet. Go back to Story Generator.")
@@ -47,8 +48,10 @@ try:
         tts_kwargs["speaker"] = "Craig Gutsy" # Or app_settings.coqui_speaker_name if defined
         # tts_kwargs["model_name"] = app_settings.coqui_model_name # If you add this to AppSettings
 
+    # Sentence-level cache: replayed or partially edited scenes reuse earlier audio
     tts = create_tts_client(
         backend=app_settings.tts_backend,
+        cache=True,
         **tts_kwargs
     )
 except ValueError as e: # From create_tts_client for unknown backend
@@ -65,21 +68,35 @@ except Exception as e: # Catch any other unexpected errors during client creatio
 for idx, para in enumerate(paragraphs):
     st.markdown(f"**Scene {idx+1}:** {para}")
     if idx < len(audios):
-        # Coqui generates WAV, gTTS generates MP3.
-        # st.audio can often infer, but explicit format can be safer if known.
-        audio_format = "audio/wav" if app_settings.tts_backend == "coqui" else "audio/mpeg"
-        st.audio(audios[idx], format=audio_format)
+        st.audio(audios[idx].data, format=audios[idx].mime_type)
     else:
         if st.button(f" Generate Narration for Scene {idx+1}"):
-            with st.spinner("Generating narration..."):
-                try:
-                    # Pass the language from settings to the generate method
-                    audio_bytes = tts.generate(prompt=para, language=app_settings.tts_lang)
-                    story_model.audio.append(audio_bytes) # Append raw bytes
-                    st.session_state.story = story_model.model_dump() # Save updated model back
-                except Exception as e:
-                    st.error(f"Narration generation failed: {e}")
-                    # Potentially log e for debugging
+            player = st.empty()
+            chunks = []
+            try:
+                # Play each chunk as soon as it is ready; the next ones are synthesized
+                # on a background thread while the current one plays
+                with st.spinner("Generating narration..."):
+                    stream = prefetch(tts.generate_stream(prompt=para, language=app_settings.tts_lang))
+                    play_until = time.time()
+                    for chunk in stream:
+                        # Let the previous chunk finish before replacing the player
+                        time.sleep(max(0.0, play_until - time.time()))
+                        played = encode_audio(chunk, app_settings.tts_codec, app_settings.tts_compression_level)
+                        player.audio(played.data, format=played.mime_type, autoplay=True)
+                        chunks.append(chunk)
+                        play_until = time.time() + (chunk.duration or 0.0)
+                time.sleep(max(0.0, play_until - time.time()))
+                # Join the uncompressed chunks and encode once, so lossy codecs are applied a single time
+                narration = encode_audio(
+                    AudioChunk(join_audio_chunks(chunks), chunks[0].mime_type, None),
+                    app_settings.tts_codec, app_settings.tts_compression_level
+                )
+                story_model.audio.append(NarrationAudio(data=narration.data, mime_type=narration.mime_type))
+                st.session_state.story = story_model.model_dump() # Save updated model back
+            except Exception as e:
+                st.error(f"Narration generation failed: {e}")
+                # Potentially log e for debugging
             st.experimental_rerun()
         # Wait until this scene has audio before showing the next
         break
@@ -3,6 +3,8 @@
 import streamlit as st
 from state.session import init_story_state
 from db.feedback_db import save_feedback
+from models.story import ImageRef
+from services.image_store import get_image_store
 
 st.title("📝 Feedback")
 st.markdown("We’d love to hear about your experience!")
@@ -20,8 +22,17 @@ if not story.get("paragraphs"):
 
 # Show the full story recap
 st.markdown("### Your Story Recap")
+image_store = get_image_store()
+images = story.get("images", [])
 for idx, p in enumerate(story["paragraphs"]):
-    st.markdown(f"**Scene {idx+1}:** {p}")
+    ref = ImageRef.model_validate(images[idx]) if idx < len(images) and images[idx] else None
+    if ref is not None and image_store.exists(ref):
+        # Small previews for the recap; full-size images stay on disk
+        col_img, col_text = st.columns([1, 3])
+        col_img.image(image_store.thumbnail(ref, max_side=192))
+        col_text.markdown(f"**Scene {idx+1}:** {p}")
+    else:
+        st.markdown(f"**Scene {idx+1}:** {p}")
 
 st.markdown("### Your Feedback")
 
@@ -3,6 +3,8 @@
 import streamlit as st
 from datetime import datetime
 
+from modules.utils.metrics import snapshot as metrics_snapshot
+
 st.set_page_config(page_title="About & Settings", layout="centered")
 st.title("⚙️ About & Settings")
 
@@ -15,7 +17,11 @@ if "settings" not in st.session_state:
         "llm_temperature": 0.7,
         "llm_max_tokens": 150,
         "image_style": "Default",
-        "tts_lang": "en"
+        "tts_lang": "en",
+        "tts_codec": "ogg_opus",
+        "tts_compression_level": 0.9,
+        "camera_preset": "balanced",
+        "camera_backend": "default"
     }
 
 # --- About Section ---
@@ -83,11 +89,65 @@ with col3:
     settings["tts_lang"] = st.selectbox(
         "TTS Language", ["en", "de", "es", "fr"], index=["en","de","es","fr"].index(settings["tts_lang"]), key="tts_lang_select"
     )
+    codecs = ["ogg_opus", "ogg_vorbis", "mp3", "flac", "wav"]
+    settings["tts_codec"] = st.selectbox(
+        "Narration Format", codecs, index=codecs.index(settings.get("tts_codec", "ogg_opus")), key="tts_codec_select",
+        help="Codec for stored narration. gTTS audio is already MP3 and is kept as-is."
+    )
+    settings["tts_compression_level"] = st.slider(
+        "Narration Compression", 0.0, 1.0, settings.get("tts_compression_level", 0.9), 0.05,
+        key="tts_compression_slider", help="Higher values give smaller files at lower quality."
+    )
+
+with col4:
+    st.subheader("📷 Camera Analysis")
+    presets = ["fast", "balanced", "quality"]
+    settings["camera_preset"] = st.selectbox(
+        "Analysis Preset", presets, index=presets.index(settings.get("camera_preset", "balanced")),
+        key="camera_preset_select", help="Smaller inputs analyze faster at some cost in accuracy."
+    )
+    backends = ["default", "onnx"]
+    settings["camera_backend"] = st.selectbox(
+        "Inference Backend", backends, index=backends.index(settings.get("camera_backend", "default")),
+        key="camera_backend_select",
+        help="onnx runs exported (optionally int8) models on ONNX Runtime; "
+             "export them with `python -m services.onnx_backend export --quantize`. "
+             "Falls back to default when they are missing."
+    )
 
 # Save button
 if st.button("💾 Save Settings"):
     st.session_state.settings = settings
     st.success("Settings saved! They will apply across the app.")
 
+# --- Runtime Metrics ---
+with st.expander("📈 Runtime Metrics"):
+    snap = metrics_snapshot()
+    resources = snap["resources"]
+    if resources:
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Process CPU", f"{resources['process_cpu_percent']:.0f}%")
+        m2.metric("Process RSS", f"{resources['process_rss_bytes'] / 1e6:.0f} MB")
+        m3.metric("Host CPU", f"{resources['host_cpu_percent']:.0f}%")
+        m4.metric("Host Memory", f"{resources['host_memory_percent']:.0f}%")
+    else:
+        st.caption("No resource samples yet (the sampler starts with the first LLM client).")
+
+    rows = [
+        {"metric": name, **h["labels"], "count": h["count"],
+         "p50": h["p50"], "p95": h["p95"], "p99": h["p99"], "max": h["max"]}
+        for name, series in snap["histograms"].items()
+        for h in series
+    ]
+    if rows:
+        st.dataframe(rows, use_container_width=True)
+    counters = [
+        {"counter": name, **c["labels"], "value": c["value"]}
+        for name, series in snap["counters"].items()
+        for c in series
+    ]
+    if counters:
+        st.dataframe(counters, use_container_width=True)
+
 st.markdown("---")
 st.markdown("Navigate back to any page to see these settings in action.")
@@ -1,7 +1,8 @@
 # services/base_client.py
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import Any, Iterator, List
 
 class BaseClient(ABC):
     """Abstract base for all AI service clients."""
@@ -17,3 +18,29 @@ class BaseClient(ABC):
         Returns a backend‐specific result (e.g. bytes for audio, PIL.Image for image, str for text).
         """
         pass
+
+    def generate_stream(
+        self,
+        prompt: str,
+        **kwargs: Any
+    ) -> Iterator[Any]:
+        """
+        Generate output incrementally, yielding pieces as they become available.
+        Backends without native streaming yield the full generate() result once.
+        """
+        yield self.generate(prompt, **kwargs)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        **kwargs: Any
+    ) -> Any:
+        """
+        asyncio variant of generate(). Backends without a native async path run
+        generate() in a worker thread so the event loop stays free.
+        """
+        return await asyncio.to_thread(self.generate, prompt, **kwargs)
+
+    async def aclose(self) -> None:
+        """Release connections held open by agenerate(); nothing to do by default."""
+        pass
@@ -0,0 +1,75 @@
+# services/camera_preprocess.py
+
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Quality/speed presets for onboarding inference:
+#   max_side:      longest side of the frame used for face detection (None = full frame)
+#   face_detector: DeepFace detector_backend for the single detection pass
+#   face_margin:   context kept around the detected face, as a fraction of its size
+#   yolo_size:     YOLO input size; the frame is letterboxed to yolo_size x yolo_size
+#   yolo_conf:     minimum detection confidence
+PRESETS = {
+    "fast": {"max_side": 480, "face_detector": "opencv", "face_margin": 0.2, "yolo_size": 320, "yolo_conf": 0.35},
+    "balanced": {"max_side": 640, "face_detector": "opencv", "face_margin": 0.2, "yolo_size": 480, "yolo_conf": 0.3},
+    "quality": {"max_side": None, "face_detector": "opencv", "face_margin": 0.2, "yolo_size": 640, "yolo_conf": 0.25},
+}
+DEFAULT_PRESET = "balanced"
+
+# Ultralytics pads with this grey, so letterboxed inputs match its training
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def get_preset(preset) -> dict:
+    if isinstance(preset, dict):
+        return {**PRESETS[DEFAULT_PRESET], **preset}
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown preset: {preset}")
+    return PRESETS[preset]
+
+
+def _resize(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    # PIL resizes channel-agnostically, so BGR arrays stay BGR
+    return np.asarray(Image.fromarray(image).resize((width, height), Image.BILINEAR))
+
+
+def downscale(image: np.ndarray, max_side: Optional[int]) -> Tuple[np.ndarray, float]:
+    """Shrink so the longest side is at most `max_side`; returns the image and the scale applied."""
+    height, width = image.shape[:2]
+    if not max_side or max(height, width) <= max_side:
+        return image, 1.0
+    scale = max_side / max(height, width)
+    return _resize(image, max(1, round(width * scale)), max(1, round(height * scale))), scale
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Fit the image into a size x size canvas keeping its aspect ratio, padding the rest.
+    Returns the canvas, the scale applied and the (x, y) padding offset.
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = max(1, round(width * scale)), max(1, round(height * scale))
+    resized = image if (new_w, new_h) == (width, height) else _resize(image, new_w, new_h)
+    canvas = np.empty((size, size, image.shape[2]), dtype=image.dtype)
+    canvas[:] = LETTERBOX_COLOR
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return canvas, scale, (pad_x, pad_y)
+
+
+def crop_face(image: np.ndarray, area: dict, scale: float = 1.0, margin: float = 0.2) -> np.ndarray:
+    """
+    Crop a face from the full-resolution `image`, given a DeepFace facial_area
+    ({"x", "y", "w", "h"}) found on a copy downscaled by `scale`, plus a margin.
+    """
+    x, y, w, h = (area[k] / scale for k in ("x", "y", "w", "h"))
+    pad_w, pad_h = w * margin, h * margin
+    height, width = image.shape[:2]
+    left, top = max(0, int(x - pad_w)), max(0, int(y - pad_h))
+    right, bottom = min(width, int(x + w + pad_w)), min(height, int(y + h + pad_h))
+    if right <= left or bottom <= top:
+        return image
+    return np.ascontiguousarray(image[top:bottom, left:right])
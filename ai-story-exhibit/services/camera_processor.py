@@ -1,50 +1,152 @@
 # services/camera_processor.py
 
-import tempfile
 from PIL import Image
 import numpy as np
-from deepface import DeepFace
+from modules.utils.log_config import get_logger
+from modules.utils.metrics import metrics
+from services.camera_preprocess import DEFAULT_PRESET, crop_face, downscale, get_preset
+from services.inference import run_concurrently
+from services.model_registry import get_model, registry, warmup
 from services.object_sentiment import detect_objects
 
-def analyze_camera_input(image_file_buffer) -> dict:
+FACE_ACTIONS = ["age", "gender", "emotion"]
+EMPTY_FACE = {"age": None, "gender": None, "emotion": None}
+# Seconds each model may take before onboarding continues without its result
+DEFAULT_TIMEOUTS = {"face": 10.0, "objects": 6.0}
+
+def _load_deepface():
+    # Importing DeepFace pulls in TensorFlow; build the attribute models up front
+    # so the first analyze() does not load them mid-request
+    from deepface import DeepFace
+    for model_name in ("Age", "Gender", "Emotion"):
+        DeepFace.build_model(model_name=model_name, task="facial_attribute")
+    return DeepFace
+
+registry.register("deepface", _load_deepface)
+
+logger = get_logger(__name__)
+
+def _onnx(model: str, fn_name: str, *args):
     """
-    Given a Streamlit camera_input buffer, returns a dict with:
-      - age, gender, emotion (from DeepFace)
-      - objects (from YOLO via detect_objects)
+    Run the ONNX Runtime implementation of a model, or return None so the caller
+    falls back to the TensorFlow / torch path (onnxruntime missing, models not
+    exported, or a runtime error).
     """
-    # 1. Load and convert to RGB numpy array
-    image = Image.open(image_file_buffer).convert("RGB")
-    image_np = np.array(image)
+    try:
+        from services import onnx_backend
+        if not onnx_backend.is_available():
+            raise FileNotFoundError("onnxruntime or exported models not available")
+        return getattr(onnx_backend, fn_name)(*args)
+    except Exception as e:
+        metrics.inc("onnx_fallbacks", model=model)
+        logger.warning({"event": "ONNX_FALLBACK", "model": model, "error": str(e)})
+        return None
 
-    # 2. Save to a temp file for DeepFace
-    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-        tmp_path = tmp.name
-        image.save(tmp_path)
+def decode_snapshot(image_file_buffer) -> np.ndarray:
+    """
+    Decode a camera snapshot once into a contiguous BGR uint8 array, the layout both
+    DeepFace (OpenCV conventions) and YOLO expect for in-memory numpy inputs.
+    """
+    rgb = np.asarray(Image.open(image_file_buffer).convert("RGB"))
+    return np.ascontiguousarray(rgb[:, :, ::-1])
 
-    # 3. Face analysis
-    face_info = {}
+def find_face(deepface, image_bgr: np.ndarray, preset: dict) -> np.ndarray:
+    """
+    Detect the face once, on a copy downscaled to the preset's detection size, and
+    return the largest face cropped from the full-resolution frame (or the whole
+    frame when no face is found, as DeepFace does with enforce_detection=False).
+    """
+    small, scale = downscale(image_bgr, preset["max_side"])
+    faces = deepface.extract_faces(
+        img_path=small,
+        detector_backend=preset["face_detector"],
+        enforce_detection=False,
+        align=False
+    )
+    faces = [f for f in faces if f.get("confidence", 0) > 0]
+    if not faces:
+        return small
+    area = max(faces, key=lambda f: f["facial_area"]["w"] * f["facial_area"]["h"])["facial_area"]
+    return crop_face(image_bgr, area, scale, preset["face_margin"])
+
+def analyze_face(image_bgr: np.ndarray, preset=DEFAULT_PRESET, backend: str = "default") -> dict:
+    """Age, gender and emotion from DeepFace, or None values on failure."""
+    if backend == "onnx":
+        result = _onnx("face", "analyze_face", image_bgr, get_preset(preset))
+        if result is not None:
+            return result
     try:
-        result = DeepFace.analyze(
-            img_path=tmp_path,
-            actions=["age", "gender", "emotion"],
+        deepface = get_model("deepface")
+        face = find_face(deepface, image_bgr, get_preset(preset))
+        # The attribute models all read the one crop; "skip" stops analyze()
+        # from running detection again
+        result = deepface.analyze(
+            img_path=face,
+            actions=FACE_ACTIONS,
+            detector_backend="skip",
             enforce_detection=False
         )[0]
-        face_info = {
+        return {
             "age": int(result.get("age", 0)),
             "gender": result.get("gender", ""),
             "emotion": result.get("dominant_emotion", "")
         }
     except Exception:
         # on failure, return empty defaults
-        face_info = {"age": None, "gender": None, "emotion": None}
+        return dict(EMPTY_FACE)
 
-    # 4. Object detection
+def analyze_objects(image_bgr: np.ndarray, preset=DEFAULT_PRESET, backend: str = "default") -> list:
+    preset = get_preset(preset)
+    if backend == "onnx":
+        labels = _onnx("objects", "detect_objects", image_bgr, preset["yolo_size"], preset["yolo_conf"])
+        if labels is not None:
+            return labels
     try:
-        labels = detect_objects(image_np)
+        return detect_objects(image_bgr, size=preset["yolo_size"], conf=preset["yolo_conf"])
     except Exception:
-        labels = []
+        return []
+
+def load_models(backend: str = "default"):
+    """
+    Load the models a snapshot needs, before any timed task starts. A first load
+    (TensorFlow, torch, weights) can take longer than DEFAULT_TIMEOUTS; inside the
+    tasks it would leave the first visitors with an empty profile and keep the
+    inference workers busy for those queued behind them. Failures are logged by the
+    registry and show up again in the tasks as empty results.
+    """
+    names = ["deepface", "yolo"]
+    if backend == "onnx":
+        from services import onnx_backend
+        if onnx_backend.is_available():
+            names = [f"onnx_{name}" for name in onnx_backend.ONNX_MODELS] + ["haar_face"]
+    warmup(names)
 
+def analyze_camera_input(
+    image_file_buffer,
+    timeouts: dict = None,
+    preset=DEFAULT_PRESET,
+    backend: str = "default"
+) -> dict:
+    """
+    Given a Streamlit camera_input buffer, returns a dict with:
+      - age, gender, emotion (from DeepFace)
+      - objects (from YOLO via detect_objects)
+    The snapshot is decoded once; face and object analysis then run concurrently on
+    the shared inference executor, and a model that exceeds its timeout contributes
+    empty values instead of holding up onboarding. `preset` ("fast", "balanced",
+    "quality" or a dict) sets the input sizes, see services/camera_preprocess.py.
+    backend="onnx" runs exported models on ONNX Runtime (services/onnx_backend.py),
+    falling back to DeepFace / ultralytics per model when that is not possible.
+    Models not loaded yet are loaded first; the timeouts only cover inference.
+    """
+    image_bgr = decode_snapshot(image_file_buffer)
+    load_models(backend)
+    results = run_concurrently(
+        {"face": (analyze_face, (image_bgr, preset, backend)), "objects": (analyze_objects, (image_bgr, preset, backend))},
+        timeouts={**DEFAULT_TIMEOUTS, **(timeouts or {})},
+        defaults={"face": EMPTY_FACE, "objects": []},
+    )
     return {
-        **face_info,
-        "objects": labels
+        **results["face"],
+        "objects": results["objects"]
     }
@@ -0,0 +1,139 @@
+# services/image_batch.py
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.base_client import BaseClient
+from services.image_store import ImageStore
+
+# Scene states reported by ImageBatchJob.status
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+# Image requests in flight at once across every session. The default lets a typical
+# 5-scene story run in a single round with room for a second kiosk. Remote backends
+# only hold a socket per worker; for a local Stable Diffusion pipeline every worker
+# contends for the same GPU, so lower IMAGE_WORKERS there.
+DEFAULT_MAX_WORKERS = int(os.getenv("IMAGE_WORKERS", "8"))
+
+# One bounded pool for the whole process: every kiosk session shares it, so N
+# visitors pressing "Generate all" cannot start N x scenes requests at once.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_image_executor(max_workers: int = DEFAULT_MAX_WORKERS) -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-gen")
+        return _executor
+
+
+class ImageBatchJob:
+    """
+    Generates images for several scenes concurrently on a bounded worker pool.
+    The job object is kept in st.session_state; the page polls it on each run,
+    collecting finished images with take_completed() and rendering status().
+    With a `store`, workers save each image and hand out ImageRefs instead of PIL images;
+    backends with progressive previews expose the latest one via preview().
+    Cancelling drops scenes that have not started; running ones finish but are discarded.
+    """
+    def __init__(
+        self,
+        client: BaseClient,
+        scenes: Dict[int, str],
+        executor: Optional[ThreadPoolExecutor] = None,
+        store: Optional[ImageStore] = None,
+        **generate_kwargs: Any
+    ):
+        self.client = client
+        self.store = store
+        self.generate_kwargs = generate_kwargs
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._status = {idx: QUEUED for idx in scenes}
+        self._errors = {}
+        self._completed = []
+        self._previews = {}
+        self._futures: Dict[int, Future] = {}
+        executor = executor or get_image_executor()
+        for idx, prompt in scenes.items():
+            self._futures[idx] = executor.submit(self._run, idx, prompt)
+
+    def _set(self, idx: int, status: str):
+        with self._lock:
+            self._status[idx] = status
+
+    def _run(self, idx: int, prompt: str):
+        if self._cancelled.is_set():
+            self._set(idx, CANCELLED)
+            return
+        self._set(idx, RUNNING)
+        try:
+            if self.store is not None and hasattr(self.client, "generate_progressive"):
+                image = None
+                for progress in self.client.generate_progressive(prompt=prompt, **self.generate_kwargs):
+                    if self._cancelled.is_set():
+                        break
+                    if progress.final:
+                        image = self.store.put(progress.data)
+                    else:
+                        with self._lock:
+                            self._previews[idx] = progress
+                if image is None and not self._cancelled.is_set():
+                    raise RuntimeError("Image backend finished without a final image")
+            elif self.store is not None and hasattr(self.client, "generate_encoded"):
+                # Encoded bytes go straight to disk, never decoded to pixels
+                image = self.store.put(self.client.generate_encoded(prompt=prompt, **self.generate_kwargs))
+            else:
+                image = self.client.generate(prompt=prompt, **self.generate_kwargs)
+                if self.store is not None:
+                    # Encode and persist on the worker; the session only keeps the ImageRef
+                    image = self.store.put(image)
+        except Exception as e:
+            with self._lock:
+                self._status[idx] = FAILED
+                self._errors[idx] = str(e)
+                self._previews.pop(idx, None)
+            return
+        with self._lock:
+            if self._cancelled.is_set():
+                self._status[idx] = CANCELLED
+            else:
+                self._status[idx] = DONE
+                self._completed.append((idx, image))
+            self._previews.pop(idx, None)
+
+    def cancel(self):
+        self._cancelled.set()
+        for idx, future in self._futures.items():
+            if future.cancel():
+                self._set(idx, CANCELLED)
+
+    def take_completed(self) -> List[Tuple[int, Any]]:
+        """Images finished since the last call, as (scene index, image) pairs."""
+        with self._lock:
+            completed, self._completed = self._completed, []
+        return completed
+
+    def preview(self, idx: int):
+        """Latest ImageProgress preview of a running scene, if its backend sends previews."""
+        with self._lock:
+            return self._previews.get(idx)
+
+    def status(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._status)
+
+    def errors(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._errors)
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            return all(s in (DONE, FAILED, CANCELLED) for s in self._status.values())
@@ -1,14 +1,55 @@
 # services/image_gen_client.py
 
 import base64
+import hashlib
 import io
+import os
+import threading
+import time
 from abc import ABC
+from typing import Iterator, NamedTuple, Optional
 from PIL import Image, ImageDraw
+from models.story import ImageRef
+from modules.utils.cache import LRUCache, SQLiteCache, TieredCache
 from services.base_client import BaseClient
+from services.image_store import ImageStore, get_image_store
 from stable_diffusion import WebisAPI  # <-- your working API
 
+# Defaults for CachedImageClient; pass cache_cfg to create_image_client to override.
+# The cache maps requests to ImageRefs (~150 bytes); the image bytes live once, in the ImageStore.
+DEFAULT_IMAGE_CACHE_CONFIG = {
+    "memory_entries": 1024,
+    "memory_max_bytes": 1024 * 1024,
+    "path": os.path.join(".cache", "image_cache.sqlite"),
+    "max_bytes": 16 * 1024 * 1024,            # least recently used evicted first
+    "ttl_seconds": None,
+}
+
+class ImageProgress(NamedTuple):
+    """One step of generate_progressive(): a preview, or the final image when `final`."""
+    data: bytes          # encoded image (JPEG preview or the final file bytes)
+    step: int
+    total_steps: int
+    final: bool
+
+def encode_png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+def encode_jpeg(image: Image.Image, quality: int = 70) -> bytes:
+    buf = io.BytesIO()
+    image.convert("RGB").save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
 # --- Existing mock client ---
+# Image clients return a PIL image from generate(); generate_encoded() returns the
+# encoded file bytes instead, for callers that store or serve the image as-is.
 class MockImageClient(BaseClient, ABC):
+    def __init__(self, step_delay: float = 0.0):
+        # Pause between emulated preview steps, to exercise progressive UIs offline
+        self.step_delay = step_delay
+
     def generate(self, prompt: str, **kwargs) -> Image.Image:
         img = Image.new("RGB", (512, 512), color=(255, 255, 255))
         draw = ImageDraw.Draw(img)
@@ -16,27 +57,159 @@ class MockImageClient(BaseClient, ABC):
         draw.multiline_text((10, 10), text, fill=(0, 0, 0))
         return img
 
+    def generate_encoded(self, prompt: str, **kwargs) -> bytes:
+        return encode_png(self.generate(prompt, **kwargs))
+
+    def generate_progressive(self, prompt: str, preview_steps: int = 2, **kwargs) -> Iterator[ImageProgress]:
+        """Emulates a diffusion backend: coarse low-resolution previews, then the final image."""
+        img = self.generate(prompt, **kwargs)
+        total = preview_steps + 1
+        for step in range(1, total):
+            # 1/16, 1/8, ... of the final resolution
+            factor = 2 ** (preview_steps - step + 3)
+            yield ImageProgress(encode_jpeg(img.reduce(factor)), step, total, False)
+            time.sleep(self.step_delay)
+        yield ImageProgress(encode_png(img), total, total, True)
+
 # --- New Webis-backed client ---
 class WebisImageClient(BaseClient):
     def __init__(self):
         self.api = WebisAPI()
 
     def generate(self, prompt: str, **kwargs) -> Image.Image:
+        # Lazily opened: pixels are only decoded if the caller touches them
+        return Image.open(io.BytesIO(self.generate_encoded(prompt, **kwargs)))
+
+    def generate_encoded(self, prompt: str, **kwargs) -> bytes:
         # 1) Call your API to get base64 string
         b64 = self.api.generate(prompt)
-        # 2) Decode & load into PIL
-        img_data = base64.b64decode(b64)
-        return Image.open(io.BytesIO(img_data))
+        # 2) Decode to the encoded file bytes; no PIL round trip
+        return base64.b64decode(b64)
+
+def generate_encoded(client: BaseClient, prompt: str, **kwargs) -> bytes:
+    """Encoded bytes from any image client, encoding to PNG only if the backend returns pixels."""
+    if hasattr(client, "generate_encoded"):
+        return client.generate_encoded(prompt, **kwargs)
+    return encode_png(client.generate(prompt, **kwargs))
+
+def generate_progressive(client: BaseClient, prompt: str, **kwargs) -> Iterator[ImageProgress]:
+    """
+    Previews followed by the final image. Backends without preview support
+    (e.g. the Webis API, which returns only the finished render) yield the final image once.
+    """
+    if hasattr(client, "generate_progressive"):
+        yield from client.generate_progressive(prompt, **kwargs)
+    else:
+        yield ImageProgress(generate_encoded(client, prompt, **kwargs), 1, 1, True)
+
+# --- Caching decorator ---
+_image_caches = {}
+_image_caches_lock = threading.Lock()
+
+
+def get_image_cache(cache_cfg: dict = None) -> TieredCache:
+    """Process-wide image cache per disk path, shared by every CachedImageClient."""
+    cfg = {**DEFAULT_IMAGE_CACHE_CONFIG, **(cache_cfg or {})}
+    key = cfg["path"] or ":memory-only:"
+    with _image_caches_lock:
+        cache = _image_caches.get(key)
+        if cache is None:
+            disk = None
+            if cfg["path"]:
+                disk = SQLiteCache(cfg["path"], max_bytes=int(cfg["max_bytes"]), ttl_seconds=cfg["ttl_seconds"])
+            memory = LRUCache(max_entries=int(cfg["memory_entries"]), max_bytes=int(cfg["memory_max_bytes"]))
+            cache = TieredCache(memory, disk)
+            _image_caches[key] = cache
+        return cache
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case and whitespace differences do not change the picture."""
+    return " ".join(prompt.split()).lower()
+
+
+class CachedImageClient(BaseClient):
+    """
+    Wraps any image backend and replays encoded results for repeated
+    (prompt, style, backend, size) requests: retried scenes, replayed demo
+    stories, several visitors picking the same seed. The cache holds the
+    ImageRef of each result and the bytes stay in `store` (default: the
+    process-wide ImageStore), so every image is on disk once. An entry whose
+    image the store has since pruned counts as a miss.
+    """
+    def __init__(self, client: BaseClient, backend: str, cache_cfg: dict = None, store: ImageStore = None):
+        self.client = client
+        self.backend = backend
+        self.cache = get_image_cache(cache_cfg)
+        self._store = store
+
+    @property
+    def store(self) -> ImageStore:
+        # Resolved on first use, so building the client creates no directories
+        if self._store is None:
+            self._store = get_image_store()
+        return self._store
+
+    def cache_key(self, prompt: str, **kwargs) -> str:
+        size = kwargs.get("size") or (kwargs.get("width"), kwargs.get("height"))
+        parts = [self.backend, str(kwargs.get("style") or "Default"), str(size), normalize_prompt(prompt)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def generate(self, prompt: str, **kwargs) -> Image.Image:
+        return Image.open(io.BytesIO(self.generate_encoded(prompt, **kwargs)))
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        try:
+            ref = ImageRef.model_validate_json(entry)
+            return self.store.get_bytes(ref)
+        except (ValueError, FileNotFoundError):
+            return None  # pruned from the store, or an entry from before refs were cached
+
+    def _remember(self, key: str, data: bytes):
+        ref = self.store.put(data)
+        self.cache.put(key, ref.model_dump_json().encode("utf-8"))
+
+    def generate_encoded(self, prompt: str, **kwargs) -> bytes:
+        key = self.cache_key(prompt, **kwargs)
+        data = self._lookup(key)
+        if data is None:
+            data = generate_encoded(self.client, prompt, **kwargs)
+            self._remember(key, data)
+        return data
+
+    def generate_progressive(self, prompt: str, **kwargs) -> Iterator[ImageProgress]:
+        # Cache hits skip the previews; misses pass them through and keep the final image
+        key = self.cache_key(prompt, **kwargs)
+        data = self._lookup(key)
+        if data is not None:
+            yield ImageProgress(data, 1, 1, True)
+            return
+        for progress in generate_progressive(self.client, prompt, **kwargs):
+            if progress.final:
+                self._remember(key, progress.data)
+            yield progress
+
+    def cache_stats(self) -> dict:
+        return {"backend": self.backend, **self.cache.stats()}
+
 
 # --- Factory update ---
-def create_image_client(backend: str, **kwargs) -> BaseClient:
+def create_image_client(backend: str, cache: bool = False, **kwargs) -> BaseClient:
     """
     Factory for image clients.
     backend: "mock" | "webis"
+    cache: wrap the backend in CachedImageClient (optional cache_cfg overrides the defaults,
+           optional store replaces the process-wide ImageStore)
     """
     if backend == "mock":
-        return MockImageClient()
+        client = MockImageClient()
     elif backend == "webis":
-        return WebisImageClient()
+        client = WebisImageClient()
     else:
         raise ValueError(f"Unknown image backend: {backend}")
+    if cache:
+        return CachedImageClient(client, backend, cache_cfg=kwargs.get("cache_cfg"), store=kwargs.get("store"))
+    return client
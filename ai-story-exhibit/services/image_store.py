@@ -0,0 +1,192 @@
+# services/image_store.py
+
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from typing import Optional, Union
+
+from PIL import Image
+
+from models.story import ImageRef
+
+DEFAULT_IMAGE_STORE_DIR = os.path.join(".cache", "images")
+# Disk budget for stored images and thumbnails (IMAGE_STORE_MAX_BYTES env var overrides);
+# beyond it the least recently used files are deleted
+DEFAULT_IMAGE_STORE_MAX_BYTES = int(os.getenv("IMAGE_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Pruning goes this far below the budget, so it does not run on every put()
+_PRUNE_TO = 0.9
+
+# Leading bytes of the encodings we store, so backend bytes can be kept as-is
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+)
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    for signature, fmt in _SIGNATURES:
+        if data.startswith(signature):
+            return fmt
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class ImageStore:
+    """
+    Content-addressed store for encoded images on disk. put() returns a small
+    ImageRef; the same bytes are only written once, whoever generates them.
+    Layout: <root>/<digest[:2]>/<digest>.<format>
+    Files are kept within `max_bytes`: put(), get_bytes(), open() and thumbnail()
+    refresh a file's mtime, and the oldest files are deleted once the budget is
+    exceeded. Callers check exists() before using a ref from an earlier run.
+    """
+    def __init__(self, root: str = DEFAULT_IMAGE_STORE_DIR, image_format: str = "png", quality: int = 90,
+                 max_bytes: int = DEFAULT_IMAGE_STORE_MAX_BYTES):
+        self.root = root
+        self.image_format = image_format.lower()
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._files())
+
+    def _files(self):
+        """(path, size, mtime) of every stored file, thumbnails included."""
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _touch(self, path: str):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _added(self, size: int):
+        with self._lock:
+            self._bytes += size
+            if self._bytes <= self.max_bytes:
+                return
+            # Least recently used first; recount from disk, other processes may share the root
+            files = sorted(self._files(), key=lambda f: f[2])
+            self._bytes = sum(size for _, size, _ in files)
+            for path, size, _ in files:
+                if self._bytes <= self.max_bytes * _PRUNE_TO:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._bytes -= size
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def encode(self, image: Image.Image) -> bytes:
+        buf = io.BytesIO()
+        if self.image_format == "webp":
+            image.save(buf, format="WEBP", quality=self.quality, method=4)
+        elif self.image_format == "jpeg":
+            image.convert("RGB").save(buf, format="JPEG", quality=self.quality)
+        else:
+            image.save(buf, format="PNG", optimize=False)
+        return buf.getvalue()
+
+    def put(self, image: Union[Image.Image, bytes]) -> ImageRef:
+        """Store a PIL image (encoded once) or already-encoded PNG/JPEG/WebP bytes."""
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            data = bytes(image)
+            fmt = sniff_format(data)
+            if fmt is None:
+                raise ValueError("Unrecognised image encoding; expected PNG, JPEG or WebP bytes")
+            with Image.open(io.BytesIO(data)) as probe:  # reads the header only
+                width, height = probe.size
+        else:
+            data = self.encode(image)
+            fmt = self.image_format
+            width, height = image.size
+
+        ref = ImageRef(digest=hashlib.sha256(data).hexdigest(), format=fmt, width=width, height=height)
+        path = self.path(ref)
+        if os.path.exists(path):
+            self._touch(path)
+            return ref
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._added(len(data))
+        return ref
+
+    def path(self, ref: ImageRef) -> str:
+        return os.path.join(self.root, ref.digest[:2], f"{ref.digest}.{ref.format}")
+
+    def exists(self, ref: ImageRef) -> bool:
+        return os.path.exists(self.path(ref))
+
+    def get_bytes(self, ref: ImageRef) -> bytes:
+        with open(self.path(ref), "rb") as f:
+            data = f.read()
+        self._touch(self.path(ref))
+        return data
+
+    def open(self, ref: ImageRef) -> Image.Image:
+        """Decode to pixels; only for callers that need to transform the image."""
+        image = Image.open(self.path(ref))
+        self._touch(self.path(ref))
+        return image
+
+    def thumbnail(self, ref: ImageRef, max_side: int = 256) -> str:
+        """
+        Path to a JPEG preview of at most max_side pixels, created on first use.
+        JPEG sources are decoded at reduced scale via draft(); others are shrunk
+        with reduce() before the final resample, so the full-size bitmap is
+        never resampled at full resolution.
+        """
+        path = os.path.join(self.root, ref.digest[:2], f"{ref.digest}_t{max_side}.jpeg")
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+        self._touch(self.path(ref))
+        with Image.open(self.path(ref)) as img:
+            img.draft("RGB", (max_side, max_side))
+            factor = max(img.size) // (2 * max_side)
+            if factor > 1:
+                img = img.reduce(factor)
+            img = img.convert("RGB")
+            img.thumbnail((max_side, max_side))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, format="JPEG", quality=80)
+        os.replace(tmp_path, path)
+        self._added(os.path.getsize(path))
+        return path
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_image_store(root: str = None, image_format: str = "png") -> ImageStore:
+    """Process-wide store per directory (IMAGE_STORE_DIR env var overrides the default)."""
+    root = root or os.getenv("IMAGE_STORE_DIR", DEFAULT_IMAGE_STORE_DIR)
+    with _stores_lock:
+        store = _stores.get((root, image_format))
+        if store is None:
+            store = ImageStore(root, image_format=image_format)
+            _stores[(root, image_format)] = store
+        return store
@@ -0,0 +1,72 @@
+# services/inference.py
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Tuple
+
+from modules.utils.log_config import get_logger
+from modules.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Model calls run at most this many at a time across every session. TensorFlow and
+# torch each use several intra-op threads, so more workers only oversubscribe the CPU.
+DEFAULT_INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor(max_workers: int = DEFAULT_INFERENCE_WORKERS) -> ThreadPoolExecutor:
+    """One bounded pool for the whole process; several kiosks share it."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        return _executor
+
+
+def _timed(name: str, fn: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        metrics.observe("inference_seconds", time.perf_counter() - start, model=name)
+
+
+def run_concurrently(
+    tasks: Dict[str, Tuple[Callable, tuple]],
+    timeouts: Dict[str, float],
+    defaults: Dict[str, Any],
+    executor: ThreadPoolExecutor = None,
+) -> Dict[str, Any]:
+    """
+    Run independent model calls side by side and collect their results by name.
+    A call that exceeds its timeout (measured from submission, so queueing counts)
+    or raises yields its default instead, so callers get partial results rather
+    than waiting on the slowest model. A timed-out call keeps its worker until it
+    finishes, as Python threads cannot be interrupted.
+    """
+    executor = executor or get_inference_executor()
+    start = time.monotonic()
+    futures: Dict[str, Future] = {
+        name: executor.submit(_timed, name, fn, *args) for name, (fn, args) in tasks.items()
+    }
+    results = {}
+    for name, future in futures.items():
+        remaining = timeouts.get(name)
+        if remaining is not None:
+            remaining = max(0.0, remaining - (time.monotonic() - start))
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeout:
+            future.cancel()
+            metrics.inc("inference_timeouts", model=name)
+            logger.warning({"event": "INFERENCE_TIMEOUT", "model": name, "timeout": timeouts.get(name)})
+            results[name] = defaults.get(name)
+        except Exception as e:
+            logger.error({"event": "INFERENCE_FAILED", "model": name, "error": str(e)})
+            results[name] = defaults.get(name)
+    return results
@@ -1,7 +1,12 @@
 # services/llm_client.py
 
+import asyncio
+from typing import Iterator, List
 from services.base_client import BaseClient
 from modules.clients.llm_client import LLMClient as APIClient
+from modules.clients.async_llm_client import AsyncLLMClient as AsyncAPIClient
+from modules.clients.resilience import CircuitOpenError
+from services.story_context import SYSTEM_PROMPT, get_context_builder
 
 class MockLLMClient(BaseClient):
     """
@@ -13,20 +18,59 @@ class MockLLMClient(BaseClient):
         seed = f"{prompt}. Genre: {genre}. Elements: {', '.join(elements)}."
         return f"{seed} And so, this story begins…"
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        # Emit word by word so the UI streaming path can be exercised offline
+        for i, word in enumerate(self.generate(prompt, **kwargs).split(" ")):
+            yield word if i == 0 else f" {word}"
+
 class APIBaseClient(BaseClient):
     """
-    Adapter for the real LLM API client defined in modules/clients/llm_client.py
+    Adapter for the real LLM API client defined in modules/clients/llm_client.py.
+    While the endpoint's circuit breaker is open, calls fail fast with
+    CircuitOpenError, or are served by MockLLMClient when resilience.fallback_to_mock is set.
     """
     def __init__(self, config_path: str = None):
         # Initialize the thin API wrapper
         self.client = APIClient(config_path=config_path)
+        self.config_path = config_path
+        self._async_client = None
 
-    def generate(self, prompt: str, **kwargs) -> str:
+    @property
+    def async_client(self) -> AsyncAPIClient:
+        # Created on first async use so sync-only pages never build it
+        if self._async_client is None:
+            self._async_client = AsyncAPIClient(config_path=self.config_path)
+        return self._async_client
+
+    def _build_messages(self, prompt: str, **kwargs) -> list:
         # Build messages for chat-based LLM API
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ]
+        story_history = kwargs.get("story_history")
+        if not story_history:
+            return [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+        # Continuations: recent paragraphs verbatim plus a rolling summary, within the token budget
+        return get_context_builder(self.client.context_cfg).build_messages(
+            prompt,
+            genre=kwargs.get("genre", ""),
+            elements=kwargs.get("elements"),
+            story_history=story_history,
+        )
+
+    def _fallback(self, error: CircuitOpenError) -> BaseClient:
+        if not self.client.resilience.fallback_to_mock:
+            raise error
+        return MockLLMClient()
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        try:
+            return self._generate(prompt, **kwargs)
+        except CircuitOpenError as e:
+            return self._fallback(e).generate(prompt, **kwargs)
+
+    def _generate(self, prompt: str, **kwargs) -> str:
+        messages = self._build_messages(prompt, **kwargs)
         # Pass through generation overrides
         return self.client.send(
             messages=messages,
@@ -39,6 +83,95 @@ class APIBaseClient(BaseClient):
             agent_name=kwargs.get("agent_name", "streamlit_app")
         )
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield content deltas as the LLM API streams them."""
+        messages = self._build_messages(prompt, **kwargs)
+        deltas = self.client.iter_send(
+            messages=messages,
+            max_tokens=kwargs.get("max_tokens"),
+            temperature=kwargs.get("temperature"),
+            top_p=kwargs.get("top_p"),
+            frequency_penalty=kwargs.get("frequency_penalty"),
+            presence_penalty=kwargs.get("presence_penalty"),
+            agent_name=kwargs.get("agent_name", "streamlit_app")
+        )
+        try:
+            # The breaker is checked before anything is sent, so an open circuit
+            # surfaces on the first delta and no partial output has been yielded
+            first = next(deltas, None)
+        except CircuitOpenError as e:
+            yield from self._fallback(e).generate_stream(prompt, **kwargs)
+            return
+        if first is not None:
+            yield first
+            yield from deltas
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        try:
+            return await self._agenerate(prompt, **kwargs)
+        except CircuitOpenError as e:
+            return self._fallback(e).generate(prompt, **kwargs)
+
+    async def _agenerate(self, prompt: str, **kwargs) -> str:
+        messages = self._build_messages(prompt, **kwargs)
+        return await self.async_client.send(
+            messages=messages,
+            stream=kwargs.get("stream"),
+            max_tokens=kwargs.get("max_tokens"),
+            temperature=kwargs.get("temperature"),
+            top_p=kwargs.get("top_p"),
+            frequency_penalty=kwargs.get("frequency_penalty"),
+            presence_penalty=kwargs.get("presence_penalty"),
+            agent_name=kwargs.get("agent_name", "streamlit_app"),
+            coalesce=kwargs.get("coalesce", True)
+        )
+
+
+async def agenerate_many(
+    client: BaseClient,
+    prompts: List[str],
+    max_concurrency: int = 3,
+    **kwargs
+) -> List[str]:
+    """
+    Run client.agenerate for every prompt with at most `max_concurrency` in flight.
+    Results are returned in prompt order.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _one(prompt):
+        async with semaphore:
+            return await client.agenerate(prompt, **kwargs)
+
+    return await asyncio.gather(*(_one(prompt) for prompt in prompts))
+
+def generate_alternatives(
+    client: BaseClient,
+    prompt: str,
+    n: int = 3,
+    max_concurrency: int = 3,
+    **kwargs
+) -> List[str]:
+    """
+    Blocking helper for Streamlit pages: generate `n` candidate outputs for the same
+    prompt concurrently, so the wall time is about one round trip instead of n.
+    The candidates are identical requests on purpose, so they opt out of coalescing.
+    The client's async connections are closed before the event loop ends.
+    """
+    async def _run():
+        try:
+            return await agenerate_many(
+                client, [prompt] * n, max_concurrency=max_concurrency, coalesce=False, **kwargs
+            )
+        finally:
+            await client.aclose()
+
+    return asyncio.run(_run())
+
 
 def create_llm_client(backend: str = "mock", **kwargs) -> BaseClient:
     """
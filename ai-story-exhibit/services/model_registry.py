@@ -0,0 +1,118 @@
+# services/model_registry.py
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from modules.utils.log_config import get_logger
+from modules.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class ModelRegistry:
+    """
+    Process-wide, lazily loaded models. Each model is registered with a loader that
+    does its own heavy imports (torch, TensorFlow, transformers), so importing a
+    service module costs nothing until a model is first used. Concurrent first uses
+    of the same model wait for a single load; different models load independently.
+    """
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._loading_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        with self._lock:
+            self._loaders[name] = loader
+            self._loading_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            if name in self._models:
+                return self._models[name]
+            if name not in self._loaders:
+                raise KeyError(f"Unknown model: {name}")
+            loader = self._loaders[name]
+            loading_lock = self._loading_locks[name]
+        with loading_lock:
+            with self._lock:
+                if name in self._models:
+                    return self._models[name]
+            start = time.perf_counter()
+            try:
+                model = loader()
+            except Exception as e:
+                metrics.inc("model_load_failures", model=name)
+                logger.error({"event": "MODEL_LOAD_FAILED", "model": name, "error": str(e)})
+                raise
+            elapsed = time.perf_counter() - start
+            metrics.observe("model_load_seconds", elapsed, model=name)
+            logger.info({"event": "MODEL_LOADED", "model": name, "load_seconds": elapsed})
+            with self._lock:
+                self._models[name] = model
+                self._load_seconds[name] = elapsed
+            return model
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._loaders)
+
+    def load_times(self) -> Dict[str, float]:
+        """Seconds each loaded model took to load."""
+        with self._lock:
+            return dict(self._load_seconds)
+
+    def unload(self, name: str = None):
+        """Drop one loaded model (or all); the next get() loads it again."""
+        with self._lock:
+            if name is None:
+                self._models.clear()
+                self._load_seconds.clear()
+            else:
+                self._models.pop(name, None)
+                self._load_seconds.pop(name, None)
+
+
+# The registry every service registers its models with
+registry = ModelRegistry()
+
+
+def get_model(name: str) -> Any:
+    return registry.get(name)
+
+
+def warmup(names: Optional[Iterable[str]] = None, background: bool = False) -> Optional[threading.Thread]:
+    """
+    Pre-load models so the first visitor does not pay for them. `names` defaults to
+    the comma-separated PRELOAD_MODELS env var ("all" loads every registered model);
+    nothing happens when it is unset. Failures are logged, not raised.
+    """
+    if names is None:
+        names = [n.strip() for n in os.getenv("PRELOAD_MODELS", "").split(",") if n.strip()]
+        if names == ["all"]:
+            names = registry.names()
+    names = list(names)
+    if not names:
+        return None
+
+    def _load():
+        for name in names:
+            try:
+                registry.get(name)
+            except Exception:
+                pass  # already logged and counted by the registry
+
+    if not background:
+        _load()
+        return None
+    thread = threading.Thread(target=_load, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
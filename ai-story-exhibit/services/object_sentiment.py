@@ -1,19 +1,38 @@
 # services/object_sentiment.py
 
-from ultralytics import YOLO
-from transformers import pipeline
+import threading
 
-# Load models once at import time
-_yolo_model = YOLO("yolov8n.pt")  # requires ultralytics + torch
-_sentiment_pipe = pipeline("sentiment-analysis")  # requires transformers + torch
+from services.camera_preprocess import letterbox
+from services.model_registry import get_model, registry
 
-def detect_objects(image_np: "np.ndarray") -> list:
+
+# Models are loaded on first use (or by model_registry.warmup()), not at import time
+def _load_yolo():
+    from ultralytics import YOLO  # requires ultralytics + torch
+    return YOLO("yolov8n.pt")
+
+def _load_sentiment():
+    from transformers import pipeline  # requires transformers + torch
+    return pipeline("sentiment-analysis")
+
+registry.register("yolo", _load_yolo)
+registry.register("sentiment", _load_sentiment)
+
+# An ultralytics model's predictor is not thread-safe; sessions take turns on it
+_yolo_lock = threading.Lock()
+
+def detect_objects(image_np: "np.ndarray", size: int = 640, conf: float = 0.25) -> list:
     """
-    Run YOLO object detection on an image (numpy array).
+    Run YOLO object detection on an image (BGR numpy array), letterboxed to
+    size x size so ultralytics has no resizing left to do.
     Returns a deduplicated list of object class names.
     """
-    results = _yolo_model(image_np)
-    labels = [box.name for box in results[0].boxes]
+    model = get_model("yolo")
+    image, _, _ = letterbox(image_np, size)
+    with _yolo_lock:
+        results = model(image, imgsz=size, conf=conf, verbose=False)
+    names = results[0].names
+    labels = [names[int(cls)] for cls in results[0].boxes.cls]
     # dedupe and return
     return list(set(labels))
 
@@ -24,7 +43,7 @@ def analyze_sentiment(text: str) -> dict:
       - label: 'POSITIVE' or 'NEGATIVE' (or labels from the model)
       - score: confidence float
     """
-    res = _sentiment_pipe(text, truncation=True)[0]
+    res = get_model("sentiment")(text, truncation=True)[0]
     return {
         "label": res["label"],
         "score": float(res["score"])
@@ -0,0 +1,262 @@
+# services/onnx_backend.py
+#
+# Optional CPU inference backend for the onboarding models. The models are exported
+# once (torch / TensorFlow are only needed for that step):
+#
+#   python -m services.onnx_backend export --quantize
+#
+# and then run through ONNX Runtime, so the onboarding hot path imports neither.
+
+import argparse
+import ast
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from modules.utils.log_config import get_logger
+from services.camera_preprocess import crop_face, downscale, letterbox
+from services.model_registry import get_model, registry
+
+# onnxruntime is optional; without it (or without exported models) callers fall back
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = get_logger(__name__)
+
+DEFAULT_ONNX_CONFIG = {
+    "model_dir": os.getenv("ONNX_MODEL_DIR", os.path.join(".cache", "onnx")),
+    "pool_size": 2,              # sessions per model; one per concurrent inference worker
+    "intra_op_threads": None,    # None: CPU cores split across the pool
+    "inter_op_threads": 1,       # the exported graphs are sequential
+}
+
+# File names inside model_dir; export writes "<name>.int8.onnx" when quantizing
+ONNX_MODELS = ("yolo", "age", "gender", "emotion")
+
+EMOTIONS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+GENDERS = ["Woman", "Man"]
+
+
+def model_path(name: str, model_dir: str = None) -> Optional[str]:
+    """The exported model file, preferring the int8-quantized one; None if not exported."""
+    model_dir = model_dir or DEFAULT_ONNX_CONFIG["model_dir"]
+    for file_name in (f"{name}.int8.onnx", f"{name}.onnx"):
+        path = os.path.join(model_dir, file_name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def is_available(names=ONNX_MODELS) -> bool:
+    return ort is not None and all(model_path(name) for name in names)
+
+
+class SessionPool:
+    """
+    A few ONNX Runtime sessions for one model. Each concurrent caller borrows its own
+    session, and the intra-op threads are split across the pool, so concurrent
+    snapshots do not oversubscribe the CPU.
+    """
+    def __init__(self, path: str, size: int = 2, intra_op_threads: int = None, inter_op_threads: int = 1):
+        if ort is None:
+            raise ImportError("onnxruntime is not installed: pip install onnxruntime")
+        self.path = path
+        self.size = size
+        self.intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // size)
+        self.inter_op_threads = inter_op_threads
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        # One session up front: validates the file and provides the metadata
+        self._idle.put(self._new_session())
+
+    def _new_session(self):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(self.path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._created += 1
+        return session
+
+    @contextmanager
+    def session(self):
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                session = self._new_session() if self._created < self.size else None
+            if session is None:
+                session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def run(self, inputs: np.ndarray) -> List[np.ndarray]:
+        with self.session() as session:
+            return session.run(None, {session.get_inputs()[0].name: inputs})
+
+    def metadata(self) -> Dict[str, str]:
+        with self.session() as session:
+            return dict(session.get_modelmeta().custom_metadata_map)
+
+
+def _pool_loader(name: str):
+    def load():
+        path = model_path(name)
+        if path is None:
+            raise FileNotFoundError(f"No exported ONNX model for {name} in {DEFAULT_ONNX_CONFIG['model_dir']}")
+        return SessionPool(
+            path,
+            size=DEFAULT_ONNX_CONFIG["pool_size"],
+            intra_op_threads=DEFAULT_ONNX_CONFIG["intra_op_threads"],
+            inter_op_threads=DEFAULT_ONNX_CONFIG["inter_op_threads"],
+        )
+    return load
+
+
+for _name in ONNX_MODELS:
+    registry.register(f"onnx_{_name}", _pool_loader(_name))
+
+
+def _load_face_detector():
+    # OpenCV's Haar cascade, the same detector as DeepFace's "opencv" backend
+    import cv2
+    return cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml"))
+
+registry.register("haar_face", _load_face_detector)
+_face_detector_lock = threading.Lock()
+
+
+# --- Objects ---
+
+def detect_objects(image_bgr: np.ndarray, size: int = 640, conf: float = 0.25) -> list:
+    """YOLOv8 (ONNX export) on a letterboxed input; deduplicated class names."""
+    pool = get_model("onnx_yolo")
+    canvas, _, _ = letterbox(image_bgr, size)
+    # HWC BGR uint8 -> NCHW RGB float in [0, 1]
+    tensor = np.ascontiguousarray(canvas[:, :, ::-1].transpose(2, 0, 1), dtype=np.float32)[None] / 255.0
+    output = pool.run(tensor)[0][0]          # (4 + classes, anchors)
+    scores = output[4:]
+    best = scores.max(axis=1)                # best score of each class over all anchors
+    names = _yolo_names(pool)
+    return [names[i] for i in np.flatnonzero(best >= conf)]
+
+
+_names_cache = {}
+
+def _yolo_names(pool: SessionPool) -> Dict[int, str]:
+    names = _names_cache.get(pool.path)
+    if names is None:
+        # Ultralytics stores the class names in the export's metadata
+        names = ast.literal_eval(pool.metadata()["names"])
+        _names_cache[pool.path] = names
+    return names
+
+
+# --- Face ---
+
+def find_face(image_bgr: np.ndarray, preset: dict) -> np.ndarray:
+    small, scale = downscale(image_bgr, preset["max_side"])
+    gray = np.asarray(Image.fromarray(small[:, :, ::-1]).convert("L"))
+    detector = get_model("haar_face")
+    with _face_detector_lock:
+        faces = detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=10)
+    if len(faces) == 0:
+        return small
+    x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+    return crop_face(image_bgr, {"x": x, "y": y, "w": w, "h": h}, scale, preset["face_margin"])
+
+
+def _pad_resize(face_bgr: np.ndarray, size: int) -> np.ndarray:
+    """Fit into size x size with black padding, as DeepFace's resize_image does."""
+    height, width = face_bgr.shape[:2]
+    scale = min(size / height, size / width)
+    resized = np.asarray(Image.fromarray(face_bgr).resize(
+        (max(1, round(width * scale)), max(1, round(height * scale))), Image.BILINEAR))
+    canvas = np.zeros((size, size, 3), dtype=np.uint8)
+    pad_y, pad_x = (size - resized.shape[0]) // 2, (size - resized.shape[1]) // 2
+    canvas[pad_y:pad_y + resized.shape[0], pad_x:pad_x + resized.shape[1]] = resized
+    return canvas
+
+
+def analyze_face(image_bgr: np.ndarray, preset: dict) -> dict:
+    """Age, gender and emotion from the exported DeepFace attribute models."""
+    face = find_face(image_bgr, preset)
+    # Age and gender: 224x224 BGR in [0, 1]; emotion: 48x48 greyscale in [0, 1]
+    face_224 = (_pad_resize(face, 224).astype(np.float32) / 255.0)[None]
+    gray = Image.fromarray(face[:, :, ::-1]).convert("L").resize((48, 48), Image.BILINEAR)
+    face_48 = (np.asarray(gray, dtype=np.float32) / 255.0)[None, :, :, None]
+
+    age_probs = get_model("onnx_age").run(face_224)[0][0]
+    gender_probs = get_model("onnx_gender").run(face_224)[0][0]
+    emotion_probs = get_model("onnx_emotion").run(face_48)[0][0]
+    return {
+        "age": int(np.sum(age_probs * np.arange(len(age_probs)))),
+        "gender": GENDERS[int(np.argmax(gender_probs))],
+        "emotion": EMOTIONS[int(np.argmax(emotion_probs))],
+    }
+
+
+# --- Export (offline; needs ultralytics / deepface + tf2onnx) ---
+
+def _quantize(path: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized = path.replace(".onnx", ".int8.onnx")
+    quantize_dynamic(path, quantized, weight_type=QuantType.QInt8)
+    return quantized
+
+
+def export_yolo(model_dir: str, quantize: bool = False) -> str:
+    from ultralytics import YOLO
+
+    # Dynamic input size, so one export serves every preset's yolo_size
+    exported = YOLO("yolov8n.pt").export(format="onnx", dynamic=True, simplify=True)
+    path = os.path.join(model_dir, "yolo.onnx")
+    os.replace(exported, path)
+    return _quantize(path) if quantize else path
+
+
+def export_deepface(model_dir: str, quantize: bool = False) -> List[str]:
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    paths = []
+    for name, model_name in (("age", "Age"), ("gender", "Gender"), ("emotion", "Emotion")):
+        keras_model = DeepFace.build_model(model_name=model_name, task="facial_attribute").model
+        spec = [tf.TensorSpec((None, *keras_model.input_shape[1:]), tf.float32, name="input")]
+        path = os.path.join(model_dir, f"{name}.onnx")
+        tf2onnx.convert.from_keras(keras_model, input_signature=spec, output_path=path)
+        paths.append(_quantize(path) if quantize else path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the onboarding models to ONNX")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--model-dir", default=DEFAULT_ONNX_CONFIG["model_dir"])
+    parser.add_argument("--quantize", action="store_true", help="also write int8 weight-quantized models")
+    parser.add_argument("--only", choices=["yolo", "deepface"])
+    args = parser.parse_args()
+
+    os.makedirs(args.model_dir, exist_ok=True)
+    if args.only in (None, "yolo"):
+        print(export_yolo(args.model_dir, args.quantize))
+    if args.only in (None, "deepface"):
+        for path in export_deepface(args.model_dir, args.quantize):
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# services/story_context.py
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+# Defaults for the `story_context` section of api_config.yml
+DEFAULT_CONTEXT_CONFIG = {
+    "token_budget": 1500,           # whole prompt: system + summary + recent scenes + instruction
+    "recent_paragraphs": 3,         # newest scenes kept verbatim (if they fit)
+    "summary_token_budget": 250,    # cap for the rolling summary of older scenes
+}
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+CONTINUE_INSTRUCTION = (
+    "Continue the story with the next paragraph. Keep characters, tone and "
+    "facts consistent with what came before."
+)
+
+SUMMARY_PREFIX = "Summary of earlier scenes: "
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English BPE vocabularies)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "end") -> str:
+    """Trim `text` to roughly `max_tokens`, keeping its start or end."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    if keep == "end":
+        return "…" + text[-(max_chars - 1):]
+    return text[:max_chars - 1] + "…"
+
+
+def extractive_summarizer(summary: str, paragraph: str, max_tokens: int) -> str:
+    """
+    Default rolling summarizer: append the paragraph's first sentence and drop the
+    oldest sentences once the summary exceeds its budget. No model call needed.
+    """
+    first_sentence = _SENTENCE_END.split(paragraph.strip(), maxsplit=1)[0]
+    sentences = _SENTENCE_END.split(summary) if summary else []
+    sentences.append(first_sentence)
+    while len(sentences) > 1 and estimate_tokens(" ".join(sentences)) > max_tokens:
+        sentences.pop(0)
+    return truncate_to_tokens(" ".join(sentences), max_tokens, keep="end")
+
+
+class StoryContextBuilder:
+    """
+    Builds the chat messages for a story continuation under a token budget.
+    The newest paragraphs are kept verbatim; everything older is folded into a
+    rolling summary. Summaries are cached by a chained hash of the paragraphs they
+    cover, so each turn only folds in the paragraphs that newly left the window.
+    """
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_CONTEXT_CONFIG["token_budget"],
+        recent_paragraphs: int = DEFAULT_CONTEXT_CONFIG["recent_paragraphs"],
+        summary_token_budget: int = DEFAULT_CONTEXT_CONFIG["summary_token_budget"],
+        summarizer: Callable[[str, str, int], str] = extractive_summarizer,
+        cache_size: int = 512,
+    ):
+        self.token_budget = token_budget
+        self.recent_paragraphs = recent_paragraphs
+        self.summary_token_budget = summary_token_budget
+        self.summarizer = summarizer
+        self.cache_size = cache_size
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self.summary_steps = 0  # paragraphs folded into a summary (cache misses)
+
+    @classmethod
+    def from_config(cls, context_cfg: dict = None, **kwargs) -> "StoryContextBuilder":
+        cfg = {**DEFAULT_CONTEXT_CONFIG, **(context_cfg or {})}
+        return cls(
+            token_budget=int(cfg["token_budget"]),
+            recent_paragraphs=int(cfg["recent_paragraphs"]),
+            summary_token_budget=int(cfg["summary_token_budget"]),
+            **kwargs,
+        )
+
+    def _prefix_hashes(self, paragraphs: List[str]) -> List[str]:
+        """hashes[i] identifies paragraphs[:i]; chained so each costs one paragraph of hashing."""
+        hashes = [hashlib.sha256(b"story").hexdigest()]
+        for paragraph in paragraphs:
+            hashes.append(hashlib.sha256((hashes[-1] + paragraph).encode("utf-8")).hexdigest())
+        return hashes
+
+    def summarize(self, paragraphs: List[str]) -> str:
+        """Rolling summary of `paragraphs`, extending the longest cached prefix."""
+        if not paragraphs:
+            return ""
+        hashes = self._prefix_hashes(paragraphs)
+        start, summary = 0, ""
+        with self._lock:
+            for k in range(len(paragraphs), 0, -1):
+                if hashes[k] in self._summaries:
+                    start, summary = k, self._summaries[hashes[k]]
+                    self._summaries.move_to_end(hashes[k])
+                    break
+
+        for k in range(start, len(paragraphs)):
+            summary = self.summarizer(summary, paragraphs[k], self.summary_token_budget)
+            with self._lock:
+                self.summary_steps += 1
+                self._summaries[hashes[k + 1]] = summary
+                while len(self._summaries) > self.cache_size:
+                    self._summaries.popitem(last=False)
+        return summary
+
+    def build_messages(
+        self,
+        prompt: str,
+        genre: str = "",
+        elements: Optional[List[str]] = None,
+        story_history: Optional[List[str]] = None,
+    ) -> List[dict]:
+        history = [p for p in (story_history or []) if p and p.strip()]
+        seed = f"Story idea: {prompt}"
+        if genre:
+            seed += f"\nGenre: {genre}"
+        if elements:
+            seed += f"\nElements to include: {', '.join(elements)}"
+        # The seed may take at most a quarter of the budget
+        seed = truncate_to_tokens(seed, self.token_budget // 4, keep="start")
+
+        system = f"{SYSTEM_PROMPT}\n{seed}"
+        remaining = self.token_budget - estimate_tokens(system) - estimate_tokens(CONTINUE_INSTRUCTION)
+
+        # Newest paragraphs verbatim, walking backwards while they fit. Room for the
+        # summary is held back whenever older paragraphs may not make it in verbatim.
+        reserve = 0
+        if len(history) > 1:
+            reserve = self.summary_token_budget + estimate_tokens(SUMMARY_PREFIX)
+        recent: List[str] = []
+        for paragraph in reversed(history[-self.recent_paragraphs:] if self.recent_paragraphs else []):
+            cost = estimate_tokens(paragraph)
+            if cost > remaining - reserve:
+                if not recent:
+                    # Always keep the latest scene, trimmed to its ending
+                    recent.append(truncate_to_tokens(paragraph, max(remaining - reserve, 1), keep="end"))
+                break
+            recent.append(paragraph)
+            remaining -= cost
+        recent.reverse()
+
+        older = history[:len(history) - len(recent)]
+        messages = [{"role": "system", "content": system}]
+        if older:
+            summary = self.summarize(older)
+            messages.append({"role": "system", "content": SUMMARY_PREFIX + summary})
+        for paragraph in recent:
+            messages.append({"role": "assistant", "content": paragraph})
+        messages.append({"role": "user", "content": CONTINUE_INSTRUCTION})
+        return messages
+
+
+_builders = {}
+_builders_lock = threading.Lock()
+
+
+def get_context_builder(context_cfg: dict = None) -> StoryContextBuilder:
+    """
+    Process-wide builder per config. Streamlit re-creates clients on every rerun, so
+    the summary cache has to outlive any single client for the incremental path to hit.
+    """
+    cfg = {**DEFAULT_CONTEXT_CONFIG, **(context_cfg or {})}
+    key = tuple(sorted(cfg.items()))
+    with _builders_lock:
+        builder = _builders.get(key)
+        if builder is None:
+            builder = StoryContextBuilder.from_config(cfg)
+            _builders[key] = builder
+        return builder
@@ -1,87 +1,610 @@
 # services/tts_client.py
 
+import hashlib
 import io
-import torch
+import os
+import queue
+import struct
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
-from TTS.api import TTS as CoquiTTS
-from typing import Any
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 from services.base_client import BaseClient
+from modules.utils.cache import LRUCache, SQLiteCache, TieredCache
+from modules.utils.log_config import get_logger
 import numpy as np
 import soundfile as sf
 
+# Coqui (and torch) are only needed for the "coqui" backend; they are imported on the
+# first model load, so importing this module (the landing page does) stays cheap
+torch = None
+CoquiTTS = None
+
+logger = get_logger(__name__)
+
+DEFAULT_COQUI_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+# Sentences are merged into model calls of up to this many characters; XTTS warns
+# above ~250 characters for English, and every call re-computes speaker conditioning
+DEFAULT_BATCH_CHARS = 240
+
+DEFAULT_TTS_CACHE_CONFIG = {
+    "memory_entries": 512,
+    "memory_max_bytes": 64 * 1024 * 1024,     # hot tier; one sentence is ~20-500 KB
+    "path": os.path.join(".cache", "tts_cache.sqlite"),
+    "max_bytes": 512 * 1024 * 1024,           # least recently used evicted first
+    "ttl_seconds": None,
+}
+
 try:
     from nltk.tokenize import sent_tokenize
 except ImportError:
     print("NLTK not found. Please install it for sentence tokenization: pip install nltk")
     print("Also, download the 'punkt' tokenizer: python -m nltk.downloader punkt")
 
+class AudioChunk(NamedTuple):
+    """One independently playable piece of narration from generate_stream()."""
+    data: bytes
+    mime_type: str
+    duration: Optional[float]  # seconds, when known
+
+# gTTS returns 24 kHz mono MP3 at a constant 32 kbit/s
+_GTTS_BYTES_PER_SECOND = 32000 / 8
+# Google's TTS endpoint takes at most this many characters per request
+GTTS_MAX_CHARS = 100
+DEFAULT_GTTS_WORKERS = 4
+
+# One bounded pool for the whole process, so concurrent visitors cannot open an
+# unbounded number of connections to Google between them
+_gtts_executor = None
+_gtts_executor_lock = threading.Lock()
+
+def get_gtts_executor(max_workers: int = DEFAULT_GTTS_WORKERS) -> ThreadPoolExecutor:
+    global _gtts_executor
+    with _gtts_executor_lock:
+        if _gtts_executor is None:
+            _gtts_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gtts")
+        return _gtts_executor
+
+def split_sentences(prompt: str) -> List[str]:
+    try:
+        return sent_tokenize(prompt)
+    except NameError: # nltk or sent_tokenize not available
+        # Fallback: treat the whole prompt as one sentence if nltk fails
+        print("Warning: NLTK sentence tokenizer not available. Processing text as a single chunk.")
+        return [prompt]
+    except Exception as e:
+        print(f"Error during sentence tokenization: {e}. Processing text as a single chunk.")
+        return [prompt]
+
+def bucket_sentences(sentences: Sequence[str], max_chars: int = DEFAULT_BATCH_CHARS) -> List[str]:
+    """
+    Group consecutive sentences into batches of at most `max_chars` characters
+    (a longer sentence forms its own batch), so short sentences share one model call.
+    """
+    batches, current, length = [], [], 0
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and length + 1 + len(sentence) > max_chars:
+            batches.append(" ".join(current))
+            current, length = [], 0
+        length += len(sentence) + (1 if current else 0)
+        current.append(sentence)
+    if current:
+        batches.append(" ".join(current))
+    return batches
+
+_WAV_HEADER_SIZE = 44
+_WAVE_FORMAT_PCM = 1
+# Float samples are clipped to -1.0..1.0 and scaled by this, so +1.0 and -1.0 are symmetric
+_PCM16_SCALE = 32767
+
+def stream_batches(sentences: Sequence[str], max_chars: int = DEFAULT_BATCH_CHARS) -> List[str]:
+    """Like bucket_sentences(), but the first sentence is always its own batch so playback can start early."""
+    sentences = [sentence for sentence in sentences if sentence.strip()]
+    if not sentences:
+        return []
+    return [sentences[0].strip()] + bucket_sentences(sentences[1:], max_chars)
+
+def allocate_wav(num_samples: int, samplerate: int) -> Tuple[bytearray, np.ndarray]:
+    """
+    Allocate a complete mono 16-bit PCM WAV file and return it together with an
+    int16 view of its sample data; whatever is written into the view is already
+    encoded, so the audio is never copied into a separate encoder buffer.
+    """
+    data_size = num_samples * 2
+    wav = bytearray(_WAV_HEADER_SIZE + data_size)
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", wav, 0,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, _WAVE_FORMAT_PCM, 1, samplerate, samplerate * 2, 2, 16,
+        b"data", data_size,
+    )
+    samples = np.frombuffer(wav, dtype="<i2", offset=_WAV_HEADER_SIZE, count=num_samples)
+    return wav, samples
+
+def assemble_wav(segments: Sequence[Any], samplerate: int, silence_samples: int = 0) -> bytes:
+    """
+    Write synthesized segments, separated by `silence_samples` of silence, into one WAV file.
+    Float segments (model output, -1.0..1.0) are clipped and scaled to 16-bit; int16
+    segments (from wav_samples()) are copied as they are.
+    """
+    arrays = [np.asarray(segment).reshape(-1) for segment in segments]
+    total = sum(len(a) for a in arrays) + silence_samples * max(len(arrays) - 1, 0)
+    wav, samples = allocate_wav(total, samplerate)  # bytearray is zero-filled: gaps are silence
+    offset = 0
+    for a in arrays:
+        if a.dtype != np.int16:
+            a = np.multiply(a, _PCM16_SCALE, dtype=np.float32)
+            np.clip(a, -_PCM16_SCALE, _PCM16_SCALE, out=a)
+            np.rint(a, out=a)
+        samples[offset:offset + len(a)] = a
+        offset += len(a) + silence_samples
+    return bytes(wav)
+
+# Output codecs for TTS results: codec -> (soundfile format, subtype, MIME type).
+# "wav" keeps the synthesized 16-bit WAV as-is.
+AUDIO_CODECS = {
+    "ogg_opus": ("OGG", "OPUS", "audio/ogg"),
+    "ogg_vorbis": ("OGG", "VORBIS", "audio/ogg"),
+    "mp3": ("MP3", "MPEG_LAYER_III", "audio/mpeg"),
+    "flac": ("FLAC", "PCM_16", "audio/flac"),
+    "wav": None,
+}
+# Opus only encodes these rates (XTTS outputs 24 kHz; VITS models 22.05 kHz do not qualify)
+_OPUS_SAMPLERATES = (8000, 12000, 16000, 24000, 48000)
+# libsndfile rejects 1.0 for some encoders (MP3 at 24 kHz)
+_MAX_COMPRESSION_LEVEL = 0.99
+# ~32 kbit/s Opus or ~24 kbit/s MP3 for 24 kHz mono: transparent enough for speech
+DEFAULT_COMPRESSION_LEVEL = 0.9
+
+def encode_audio(
+    chunk: AudioChunk,
+    codec: str = "ogg_opus",
+    compression_level: float = DEFAULT_COMPRESSION_LEVEL
+) -> AudioChunk:
+    """
+    Encode WAV output into a compact codec. compression_level (0.0-1.0) is libsndfile's
+    size/quality knob: for Opus and MP3 it selects the bitrate (0.0 is ~160-260 kbit/s,
+    0.9 ~25-35 kbit/s at 24 kHz), for Vorbis the VBR quality, for FLAC the effort.
+    Audio that is already compressed (gTTS MP3) is passed through untouched rather
+    than transcoded.
+    """
+    if codec not in AUDIO_CODECS:
+        raise ValueError(f"Unknown audio codec: {codec}")
+    if AUDIO_CODECS[codec] is None or chunk.mime_type != "audio/wav":
+        return chunk
+    samplerate = struct.unpack_from("<I", chunk.data, 24)[0]
+    if codec == "ogg_opus" and samplerate not in _OPUS_SAMPLERATES:
+        codec = "ogg_vorbis"
+    container, subtype, mime_type = AUDIO_CODECS[codec]
+    with sf.SoundFile(io.BytesIO(chunk.data)) as source:
+        samples = source.read(dtype="float32")
+    buf = io.BytesIO()
+    sf.write(buf, samples, samplerate, format=container, subtype=subtype,
+             compression_level=min(float(compression_level), _MAX_COMPRESSION_LEVEL))
+    return AudioChunk(buf.getvalue(), mime_type, chunk.duration)
+
+def wav_samples(data: bytes) -> np.ndarray:
+    """Samples of a WAV file written by allocate_wav()."""
+    return np.frombuffer(data, dtype="<i2", offset=_WAV_HEADER_SIZE)
+
+def join_audio_chunks(chunks: Sequence[AudioChunk], silence_ms: int = 0) -> bytes:
+    """Combine streamed chunks into one file of the same format, e.g. to keep in the story."""
+    if not chunks:
+        return b""
+    if chunks[0].mime_type == "audio/wav":
+        samplerate = struct.unpack_from("<I", chunks[0].data, 24)[0]
+        return assemble_wav([wav_samples(chunk.data) for chunk in chunks], samplerate,
+                            int(samplerate * silence_ms / 1000))
+    # MP3 streams are sequences of self-contained frames and can be concatenated
+    return b"".join(chunk.data for chunk in chunks)
+
+def prefetch(chunks: Iterable[Any], max_ahead: int = 2) -> Iterator[Any]:
+    """
+    Run a (slow) iterator on a background thread, keeping up to `max_ahead` items
+    ready, so synthesis of later chunks overlaps with playback of earlier ones.
+    Closing the returned generator stops the producer at its next item and closes
+    the source iterator, so a generator source can release what it holds (e.g.
+    the futures of GTTSTTSClient.generate_parts()).
+    """
+    items = queue.Queue(maxsize=max_ahead)
+    stop = threading.Event()
+    end = object()
+
+    def put(entry) -> bool:
+        # Never block forever: the consumer may have gone away (e.g. a Streamlit rerun)
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        chunks_iter = iter(chunks)
+        try:
+            for item in chunks_iter:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((end, e))
+        else:
+            put((end, None))
+        finally:
+            # Closed from this thread, the one iterating it
+            close = getattr(chunks_iter, "close", None)
+            if stop.is_set() and close is not None:
+                close()
+
+    threading.Thread(target=produce, name="tts-prefetch", daemon=True).start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        stop.set()
+
+def gtts_parts(prompt: str, max_chars: int = GTTS_MAX_CHARS) -> List[str]:
+    """Sentences of `prompt`, with sentences over the request limit wrapped at word boundaries."""
+    parts = []
+    for sentence in split_sentences(prompt):
+        sentence = sentence.strip()
+        if len(sentence) <= max_chars:
+            if sentence:
+                parts.append(sentence)
+        else:
+            parts.extend(textwrap.wrap(sentence, max_chars, break_long_words=False))
+    return parts
+
 class GTTSTTSClient(BaseClient):
-    """Adapter for gTTS (Google)."""
-    def generate(self, prompt: str, **kwargs: Any) -> bytes:
-        tts = gTTS(text=prompt, lang=kwargs.get("lang", "en"))
+    """
+    Adapter for gTTS (Google). gTTS sends the requests for one text one after the
+    other, so the paragraph is split into request-sized parts which are fetched
+    concurrently on a shared pool and reassembled in order.
+    """
+    def __init__(self, executor: ThreadPoolExecutor = None):
+        self.executor = executor
+
+    def _fetch(self, text: str, lang: str) -> bytes:
+        tts = gTTS(text=text, lang=lang)
         buf = io.BytesIO()
         tts.write_to_fp(buf)
         buf.seek(0)
         return buf.read()  # raw MP3 bytes
 
+    def generate(self, prompt: str, **kwargs: Any) -> bytes:
+        # MP3 frames are self-contained, so the parts concatenate into one stream
+        return b"".join(chunk.data for chunk in self.generate_stream(prompt, **kwargs))
+
+    def voice(self, **kwargs: Any) -> dict:
+        """What, besides the text, determines the audio (used for cache keys)."""
+        return {"language": kwargs.get("lang", kwargs.get("language", "en"))}
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[AudioChunk]:
+        """Yield one MP3 chunk per part, in order, while later parts are still being fetched."""
+        return self.generate_parts(gtts_parts(prompt), **kwargs)
+
+    def stream_parts(self, prompt: str, **kwargs: Any) -> List[str]:
+        """The pieces generate_stream() requests, one chunk each (used as cache units)."""
+        return gtts_parts(prompt)
+
+    def generate_parts(self, parts: Sequence[str], **kwargs: Any) -> Iterator[AudioChunk]:
+        """One chunk per given part, in order; all parts are requested up front."""
+        lang = kwargs.get("lang", kwargs.get("language", "en"))
+        executor = self.executor or get_gtts_executor()
+        futures = [executor.submit(self._fetch, part, lang) for part in parts]
+        try:
+            for future in futures:
+                data = future.result()
+                yield AudioChunk(data, "audio/mpeg", len(data) / _GTTS_BYTES_PER_SECOND)
+        finally:
+            for future in futures:
+                future.cancel()
+
+def _import_coqui():
+    global torch, CoquiTTS
+    if CoquiTTS is None:
+        try:
+            import torch as torch_module
+            from TTS.api import TTS
+        except ImportError as e:
+            raise ImportError("Coqui TTS is not installed: pip install TTS torch") from e
+        torch, CoquiTTS = torch_module, TTS
+    return CoquiTTS
+
+def default_device() -> str:
+    global torch
+    if torch is None:
+        try:
+            import torch as torch_module
+        except ImportError:
+            return "cpu"
+        torch = torch_module
+    # move to GPU if available
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+class SharedCoquiModel:
+    """One loaded Coqui model plus the lock that serializes inference on it."""
+    def __init__(self, model_name: str, device: str):
+        coqui_tts = _import_coqui()
+        start = time.time()
+        self.model_name = model_name
+        self.device = device
+        self.tts = coqui_tts(model_name).to(device)
+        self.lock = threading.Lock()
+        self.load_seconds = time.time() - start
+        self.warmed_up = False
+        logger.info({"event": "TTS_MODEL_LOADED", "model": model_name, "device": device,
+                     "load_seconds": self.load_seconds})
+
+    def warm_up(self, speaker: str = None, speaker_wav: str = None, language: str = "en"):
+        """
+        Run one dummy synthesis so kernels and caches are initialised before the first visitor.
+        Multi-speaker models (XTTS v2) need a voice: without speaker or speaker_wav this uses
+        the TTS_PRELOAD_SPEAKER env var, else the model's first built-in speaker.
+        """
+        with self.lock:
+            if self.warmed_up:
+                return
+            start = time.time()
+            if speaker is None and speaker_wav is None:
+                speaker = os.getenv("TTS_PRELOAD_SPEAKER") or None
+                if speaker is None and getattr(self.tts, "is_multi_speaker", False):
+                    speakers = getattr(self.tts, "speakers", None) or []
+                    speaker = speakers[0] if speakers else None
+            kwargs = {"text": "Hello.", "speaker": speaker, "speaker_wav": speaker_wav}
+            if getattr(self.tts, "is_multi_lingual", True):
+                kwargs["language"] = language
+            self.tts.tts(**kwargs)
+            self.warmed_up = True
+        logger.info({"event": "TTS_MODEL_WARMED_UP", "model": self.model_name,
+                     "device": self.device, "seconds": time.time() - start})
+
+# Process-wide models keyed by (model_name, device). Streamlit re-runs pages and
+# creates clients per visitor, but the multi-GB model must be loaded once.
+_models = {}
+_models_lock = threading.Lock()
+_loading_locks = {}
+
+def get_coqui_model(model_name: str = DEFAULT_COQUI_MODEL, device: str = None) -> SharedCoquiModel:
+    device = device or default_device()
+    key = (model_name, device)
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+        loading_lock = _loading_locks.setdefault(key, threading.Lock())
+    # Load outside the registry lock so other models stay available; concurrent
+    # requests for the same model wait for the first load instead of repeating it
+    with loading_lock:
+        with _models_lock:
+            model = _models.get(key)
+        if model is None:
+            model = SharedCoquiModel(model_name, device)
+            with _models_lock:
+                _models[key] = model
+        return model
+
+def clear_coqui_models():
+    with _models_lock:
+        _models.clear()
+        _loading_locks.clear()
+
+def preload_coqui_models(model_names=None, background: bool = True, **warmup_kwargs):
+    """
+    Load and warm up models at server start. model_names defaults to the
+    comma-separated TTS_PRELOAD_MODELS env var; nothing happens when it is unset.
+    """
+    if model_names is None:
+        model_names = [m.strip() for m in os.getenv("TTS_PRELOAD_MODELS", "").split(",") if m.strip()]
+    if not model_names:
+        return None
+
+    def _load():
+        for name in model_names:
+            try:
+                get_coqui_model(name).warm_up(**warmup_kwargs)
+            except Exception as e:
+                logger.error({"event": "TTS_PRELOAD_FAILED", "model": name, "error": str(e)})
+
+    if not background:
+        _load()
+        return None
+    thread = threading.Thread(target=_load, name="tts-preload", daemon=True)
+    thread.start()
+    return thread
+
 class CoquiTTSClient(BaseClient):
-    """Adapter for Coqui TTS."""
-    def __init__(self, model_name: str, speaker: str = None, speaker_wav: str = None):
-        # move to GPU if available
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.tts = CoquiTTS(model_name).to(device)
+    """Adapter for Coqui TTS. The model itself is shared process-wide via get_coqui_model()."""
+    def __init__(
+        self,
+        model_name: str,
+        speaker: str = None,
+        speaker_wav: str = None,
+        device: str = None,
+        batch_chars: int = DEFAULT_BATCH_CHARS,
+        sentence_silence_ms: int = 0
+    ):
+        self.model = get_coqui_model(model_name, device)
+        self.tts = self.model.tts
         self.speaker = speaker
         self.speaker_wav = speaker_wav
+        self.batch_chars = batch_chars
+        self.sentence_silence_ms = sentence_silence_ms
 
     def generate(self, prompt: str, **kwargs: Any) -> bytes:
         """
-        Generates audio from text. If the text is long, it splits it into sentences
-        and synthesizes each sentence, then concatenates the audio.
+        Generates audio from text as a 16-bit PCM WAV. The text is split into
+        sentences, which are synthesized in batches of up to `batch_chars` characters
+        and written into one preallocated WAV buffer.
         """
-        try:
-            sentences = sent_tokenize(prompt)
-        except NameError: # nltk or sent_tokenize not available
-            # Fallback: treat the whole prompt as one sentence if nltk fails
-            print("Warning: NLTK sentence tokenizer not available. Processing text as a single chunk.")
-            sentences = [prompt]
-        except Exception as e:
-            print(f"Error during sentence tokenization: {e}. Processing text as a single chunk.")
-            sentences = [prompt]
+        sentences = split_sentences(prompt)
+        batches = bucket_sentences(sentences, kwargs.get("batch_chars", self.batch_chars))
+        segments = []
+        # The model is shared by every session; one synthesis at a time per model
+        with self.model.lock:
+            for batch in batches:
+                segments.append(self._synthesize(batch, **kwargs))
 
-        all_audio_segments = []
-        for sentence in sentences:
-            if not sentence.strip():
-                continue
-            # Generate audio for each sentence
-            wav_segment_np = self.tts.tts(
-                text=sentence,
-                speaker_wav=kwargs.get("speaker_wav", self.speaker_wav),
-                speaker=kwargs.get("speaker", self.speaker),
-                language=kwargs.get("language", "en") # Coqui TTS uses 'language'
-            )
-            all_audio_segments.append(np.array(wav_segment_np))
-
-        if not all_audio_segments:
+        if not segments:
             return b'' # Return empty bytes if no audio was generated
 
-        concatenated_audio_np = np.concatenate(all_audio_segments)
-        buf = io.BytesIO()
-        sf.write(buf, concatenated_audio_np, samplerate=self.tts.sampling_rate, format="WAV")
-        buf.seek(0)
-        return buf.read()
+        samplerate = self.tts.sampling_rate
+        silence_ms = kwargs.get("sentence_silence_ms", self.sentence_silence_ms)
+        return assemble_wav(segments, samplerate, int(samplerate * silence_ms / 1000))
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[AudioChunk]:
+        """
+        Yield a WAV chunk per batch as soon as it is synthesized. The first sentence
+        is synthesized alone, so time to first audio is about one sentence. The model
+        lock is held per batch only, letting other sessions interleave.
+        """
+        batches = self.stream_parts(prompt, **kwargs)
+        samplerate = self.tts.sampling_rate
+        silence_ms = kwargs.get("sentence_silence_ms", self.sentence_silence_ms)
+        silence = np.zeros(int(samplerate * silence_ms / 1000), dtype=np.float32)
+        for index, batch in enumerate(batches):
+            with self.model.lock:
+                segment = self._synthesize(batch, **kwargs)
+            # Trailing silence keeps the gaps of generate() when chunks are played back to back
+            segments = [segment, silence] if len(silence) and index < len(batches) - 1 else [segment]
+            data = assemble_wav(segments, samplerate)
+            yield AudioChunk(data, "audio/wav", len(wav_samples(data)) / samplerate)
+
+    def stream_parts(self, prompt: str, **kwargs: Any) -> List[str]:
+        """
+        The batches generate_stream() synthesizes, one chunk each (used as cache units).
+        Boundaries only depend on the sentences before them, so an edit leaves the
+        earlier batches, and usually the later ones, unchanged.
+        """
+        return stream_batches(split_sentences(prompt), kwargs.get("batch_chars", self.batch_chars))
+
+    def generate_parts(self, parts: Sequence[str], **kwargs: Any) -> Iterator[AudioChunk]:
+        """One WAV chunk per given part (a batch from stream_parts()), one model call each."""
+        samplerate = self.tts.sampling_rate
+        for part in parts:
+            with self.model.lock:
+                segment = self._synthesize(part, **kwargs)
+            data = assemble_wav([segment], samplerate)
+            yield AudioChunk(data, "audio/wav", len(wav_samples(data)) / samplerate)
+
+    def voice(self, **kwargs: Any) -> dict:
+        """What, besides the text, determines the audio (used for cache keys)."""
+        return {
+            "model": self.model.model_name,
+            "speaker": kwargs.get("speaker", self.speaker),
+            "speaker_wav": kwargs.get("speaker_wav", self.speaker_wav),
+            "language": kwargs.get("language", "en"),
+            "encoding": "pcm_16",  # cached float WAVs from older versions must not be mixed in
+        }
+
+    def _synthesize(self, text: str, **kwargs: Any):
+        return self.tts.tts(
+            text=text,
+            speaker_wav=kwargs.get("speaker_wav", self.speaker_wav),
+            speaker=kwargs.get("speaker", self.speaker),
+            language=kwargs.get("language", "en") # Coqui TTS uses 'language'
+        )
+
+# --- Caching decorator ---
+_tts_caches = {}
+_tts_caches_lock = threading.Lock()
+
+def get_tts_cache(cache_cfg: dict = None) -> TieredCache:
+    """Process-wide narration cache per disk path, shared by every CachedTTSClient."""
+    cfg = {**DEFAULT_TTS_CACHE_CONFIG, **(cache_cfg or {})}
+    key = cfg["path"] or ":memory-only:"
+    with _tts_caches_lock:
+        cache = _tts_caches.get(key)
+        if cache is None:
+            disk = None
+            if cfg["path"]:
+                disk = SQLiteCache(cfg["path"], max_bytes=int(cfg["max_bytes"]), ttl_seconds=cfg["ttl_seconds"])
+            memory = LRUCache(max_entries=int(cfg["memory_entries"]), max_bytes=int(cfg["memory_max_bytes"]))
+            cache = TieredCache(memory, disk)
+            _tts_caches[key] = cache
+        return cache
+
+def normalize_text(text: str) -> str:
+    """Whitespace differences do not change the narration; case can (e.g. "US" vs "us")."""
+    return " ".join(text.split())
+
+def _pack_chunk(chunk: AudioChunk) -> bytes:
+    header = f"{chunk.mime_type}\x1f{chunk.duration if chunk.duration is not None else ''}\x1e"
+    return header.encode("ascii") + chunk.data
+
+def _unpack_chunk(value: bytes) -> AudioChunk:
+    end = value.index(b"\x1e")
+    mime_type, duration = value[:end].decode("ascii").split("\x1f")
+    return AudioChunk(value[end + 1:], mime_type, float(duration) if duration else None)
+
+class CachedTTSClient(BaseClient):
+    """
+    Wraps a TTS backend and caches audio per streamed part (a gTTS request, or a
+    Coqui sentence batch), keyed by the normalized part text, backend and voice
+    (model, speaker / speaker_wav, language). Misses are still synthesized in the
+    backend's batches; replayed demo stories come straight from the cache, and an
+    edited paragraph only re-synthesizes the parts that changed.
+    """
+    def __init__(self, client: BaseClient, backend: str, cache_cfg: dict = None):
+        self.client = client
+        self.backend = backend
+        self.cache = get_tts_cache(cache_cfg)
+
+    def cache_key(self, part: str, **kwargs: Any) -> str:
+        voice = self.client.voice(**kwargs)
+        parts = [self.backend] + [f"{name}={voice[name]}" for name in sorted(voice)] + [normalize_text(part)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[AudioChunk]:
+        parts = self.client.stream_parts(prompt, **kwargs)
+        keys = [self.cache_key(part, **kwargs) for part in parts]
+        cached = [self.cache.get(key) for key in keys]
+        # Only the missing parts go to the backend, in one call so it can overlap them
+        fresh = self.client.generate_parts([part for part, value in zip(parts, cached) if value is None], **kwargs)
+        for key, value in zip(keys, cached):
+            if value is not None:
+                yield _unpack_chunk(value)
+            else:
+                chunk = next(fresh)
+                self.cache.put(key, _pack_chunk(chunk))
+                yield chunk
+
+    def generate(self, prompt: str, **kwargs: Any) -> bytes:
+        silence_ms = kwargs.get("sentence_silence_ms", getattr(self.client, "sentence_silence_ms", 0))
+        return join_audio_chunks(list(self.generate_stream(prompt, **kwargs)), silence_ms)
+
+    def cache_stats(self) -> dict:
+        return {"backend": self.backend, **self.cache.stats()}
 
-def create_tts_client(backend: str, **kwargs) -> BaseClient:
+def create_tts_client(backend: str, cache: bool = False, **kwargs) -> BaseClient:
     """
     Factory for TTS clients.
     backend: "gtts" or "coqui"
+    cache: wrap the backend in CachedTTSClient (optional cache_cfg overrides the defaults)
     """
     if backend == "gtts":
-        return GTTSTTSClient()
+        client = GTTSTTSClient()
     elif backend == "coqui":
-        return CoquiTTSClient(
-            model_name=kwargs.get("model_name", "tts_models/multilingual/multi-dataset/xtts_v2"),
+        client = CoquiTTSClient(
+            model_name=kwargs.get("model_name", DEFAULT_COQUI_MODEL),
             speaker=kwargs.get("speaker"),
-            speaker_wav=kwargs.get("speaker_wav")
+            speaker_wav=kwargs.get("speaker_wav"),
+            device=kwargs.get("device"),
+            batch_chars=kwargs.get("batch_chars", DEFAULT_BATCH_CHARS),
+            sentence_silence_ms=kwargs.get("sentence_silence_ms", 0)
         )
     else:
         raise ValueError(f"Unknown TTS backend: {backend}")
+    if cache:
+        return CachedTTSClient(client, backend, cache_cfg=kwargs.get("cache_cfg"))
+    return client
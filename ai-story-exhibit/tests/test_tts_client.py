@@ -3,11 +3,15 @@
 import pytest
 from unittest.mock import patch, MagicMock, call
 import io
+import threading
 import numpy as np
 import soundfile as sf # For verifying WAV content if needed
 
 from services.tts_client import (
     create_tts_client,
+    clear_coqui_models,
+    join_audio_chunks,
+    prefetch,
     GTTSTTSClient,
     CoquiTTSClient
 )
@@ -16,7 +20,13 @@ from services.tts_client import (
 GTTS_CLASS_PATH = "services.tts_client.gTTS"
 COQUI_TTS_CLASS_PATH = "services.tts_client.CoquiTTS"
 SENT_TOKENIZE_PATH = "services.tts_client.sent_tokenize"
-SOUNDFILE_WRITE_PATH = "services.tts_client.sf.write"
+
+@pytest.fixture(autouse=True)
+def fresh_coqui_registry():
+    # Models are shared process-wide; each test must load through its own mock
+    clear_coqui_models()
+    yield
+    clear_coqui_models()
 
 @pytest.fixture
 def mock_gtts_instance(mocker):
@@ -65,6 +75,7 @@ def test_create_tts_client_coqui(mock_coqui_tts_instance):
     # Let's refine the fixture or test to be more explicit about constructor call.
 
     # Re-patching here for clarity on constructor args
+    clear_coqui_models()
     with patch(COQUI_TTS_CLASS_PATH) as mock_coqui_constructor:
         mock_coqui_constructor.return_value.to.return_value = mock_coqui_constructor.return_value # for chaining
         client = create_tts_client(
@@ -126,10 +137,8 @@ def test_gtts_client_generate(mock_gtts_instance):
     assert audio_bytes == b"mock_mp3_data"
 
 def test_coqui_tts_client_generate(mock_coqui_tts_instance, mock_sent_tokenize, mocker):
-    """Test CoquiTTSClient's generate method with sentence tokenization."""
-    mocker.patch(SOUNDFILE_WRITE_PATH) # Mock soundfile.write
-
-    client = CoquiTTSClient(model_name="any_model") # Instance created with mock
+    """Test CoquiTTSClient's generate method with sentence tokenization and batching."""
+    client = CoquiTTSClient(model_name="any_model", batch_chars=20) # Instance created with mock
     client.tts = mock_coqui_tts_instance # Ensure the client uses our mock
 
     prompt = "This is a sentence. This is another."
@@ -142,6 +151,7 @@ def test_coqui_tts_client_generate(mock_coqui_tts_instance, mock_sent_tokenize,
     audio_bytes = client.generate(prompt, language="en", speaker_wav="dummy.wav")
     
     mock_sent_tokenize.assert_called_once_with(prompt)
+    # batch_chars=20 keeps the two sentences in separate model calls
     assert mock_coqui_tts_instance.tts.call_count == len(expected_sentences)
     calls = [
         call(text=expected_sentences[0], speaker_wav="dummy.wav", speaker=None, language="en"),
@@ -149,25 +159,29 @@ def test_coqui_tts_client_generate(mock_coqui_tts_instance, mock_sent_tokenize,
     ]
     mock_coqui_tts_instance.tts.assert_has_calls(calls, any_order=False)
     
-    # Check that soundfile.write was called
-    # The first argument to sf.write will be a BytesIO buffer.
-    # The second will be the concatenated numpy array.
-    # The third will be the samplerate.
-    sf.write.assert_called_once()
-    args, kwargs = sf.write.call_args
-    assert isinstance(args[0], io.BytesIO) # Buffer
-    assert isinstance(args[1], np.ndarray) # Concatenated audio
-    assert args[1].shape == (len(expected_sentences) * 2,) # 2 samples per sentence * 2 sentences
-    assert args[2] == mock_coqui_tts_instance.sampling_rate # Samplerate
-    assert kwargs['format'] == "WAV"
-    
-    # The actual returned bytes depend on the mocked sf.write,
-    # but we can check it's bytes
-    assert isinstance(audio_bytes, bytes)
+    # The result is a complete WAV file holding both segments back to back
+    data, samplerate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+    assert samplerate == mock_coqui_tts_instance.sampling_rate
+    np.testing.assert_allclose(data, [0.1, 0.2, 0.1, 0.2], atol=1 / 32767)  # 16-bit PCM
+
+def test_coqui_tts_client_batches_short_sentences(mock_coqui_tts_instance, mock_sent_tokenize):
+    """Short sentences share one model call; silence is inserted between calls."""
+    mock_sent_tokenize.return_value = ["One.", "Two.", "Three is longer."]
+    mock_coqui_tts_instance.tts.return_value = np.ones(3, dtype=np.float32)
+    client = CoquiTTSClient(model_name="any_model", batch_chars=10)
+    client.tts = mock_coqui_tts_instance
+
+    audio_bytes = client.generate("One. Two. Three is longer.", sentence_silence_ms=1000)
+
+    assert [c.kwargs["text"] for c in mock_coqui_tts_instance.tts.call_args_list] == [
+        "One. Two.", "Three is longer."
+    ]
+    data, _ = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+    assert len(data) == 3 + mock_coqui_tts_instance.sampling_rate + 3
+    assert not data[3:-3].any()
 
 def test_coqui_tts_client_generate_nltk_unavailable(mock_coqui_tts_instance, mocker):
     """Test CoquiTTSClient's generate method when NLTK/sent_tokenize is unavailable."""
-    mocker.patch(SOUNDFILE_WRITE_PATH)
     mocker.patch(SENT_TOKENIZE_PATH, side_effect=NameError("sent_tokenize not found"))
     
     client = CoquiTTSClient(model_name="any_model")
@@ -179,7 +193,58 @@ def test_coqui_tts_client_generate_nltk_unavailable(mock_coqui_tts_instance, moc
     mock_coqui_tts_instance.tts.assert_called_once_with(
         text=prompt, speaker_wav=None, speaker=None, language="en"
     )
-    sf.write.assert_called_once()
-    assert isinstance(audio_bytes, bytes)
+    assert audio_bytes.startswith(b"RIFF")
 
+def test_coqui_tts_client_generate_stream(mock_coqui_tts_instance, mock_sent_tokenize):
+    """The first sentence is streamed alone; joined chunks equal generate()."""
+    mock_sent_tokenize.return_value = ["One.", "Two.", "Three."]
+    mock_coqui_tts_instance.tts.side_effect = lambda text, **kwargs: np.full(len(text), 0.5, dtype=np.float32)
+    client = CoquiTTSClient(model_name="any_model")
+    client.tts = mock_coqui_tts_instance
+
+    chunks = list(client.generate_stream("One. Two. Three.", language="en"))
+
+    assert [c.kwargs["text"] for c in mock_coqui_tts_instance.tts.call_args_list] == ["One.", "Two. Three."]
+    assert [chunk.mime_type for chunk in chunks] == ["audio/wav", "audio/wav"]
+    assert chunks[0].duration == pytest.approx(4 / mock_coqui_tts_instance.sampling_rate)
+    data, _ = sf.read(io.BytesIO(join_audio_chunks(chunks)), dtype="float32")
+    assert len(data) == len("One.") + len("Two. Three.")
+
+def test_gtts_client_generate_stream(mock_gtts_instance, mock_sent_tokenize):
+    """gTTS streams one MP3 chunk per sentence."""
+    mock_gtts_instance.write_to_fp.side_effect = lambda buf: buf.write(b"\xff" * 4000)
+    client = GTTSTTSClient()
 
+    chunks = list(client.generate_stream("This is a sentence. This is another.", language="de"))
+
+    assert len(chunks) == 2
+    assert chunks[0] == (b"\xff" * 4000, "audio/mpeg", 1.0)
+    assert join_audio_chunks(chunks) == b"\xff" * 8000
+
+def test_prefetch_preserves_order_and_errors():
+    def produce():
+        yield 1
+        yield 2
+        raise RuntimeError("model failed")
+
+    stream = prefetch(produce())
+    assert next(stream) == 1
+    assert next(stream) == 2
+    with pytest.raises(RuntimeError, match="model failed"):
+        next(stream)
+
+def test_closing_prefetch_closes_the_source():
+    closed = threading.Event()
+
+    def produce():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.set()
+
+    source = produce()  # kept alive here, so only an explicit close() ends it
+    stream = prefetch(source, max_ahead=1)
+    assert next(stream) == 0
+    stream.close()
+    assert closed.wait(timeout=2)
@@ -0,0 +1,176 @@
+# tests/unit/test_async_llm_client.py
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from modules.clients.async_llm_client import AsyncLLMClient, gather_send
+from services.base_client import BaseClient
+from services.llm_client import agenerate_many, generate_alternatives
+
+CONFIG = """
+llm_api:
+  url: http://llm.test/api/chat
+  model: test-model
+  stream: false
+generation:
+  temperature: 0.5
+  max_tokens: 64
+"""
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "api_config.yml"
+    path.write_text(CONFIG)
+    return str(path)
+
+def _attach_transport(client, handler):
+    """Route the client's requests to an in-process handler instead of the network."""
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client._client_loop = asyncio.get_running_loop()
+
+def test_send_applies_defaults_and_overrides(config_path):
+    seen = []
+
+    async def handler(request):
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json={"message": {"content": " The end. "}})
+
+    async def main():
+        async with AsyncLLMClient(config_path=config_path) as client:
+            _attach_transport(client, handler)
+            return await client.send([{"role": "user", "content": "Hi"}], temperature=0.0)
+
+    assert asyncio.run(main()) == "The end."
+    assert seen[0]["model"] == "test-model"
+    assert seen[0]["temperature"] == 0.0   # per-call override
+    assert seen[0]["max_tokens"] == 64     # config default
+
+def test_iter_send_streams_ndjson(config_path):
+    body = "\n".join([
+        '{"message": {"content": "Once"}}',
+        '{"message": {"content": " upon"}, "done": true}',
+    ])
+
+    async def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body)
+
+    async def main():
+        client = AsyncLLMClient(config_path=config_path)
+        _attach_transport(client, handler)
+        return [delta async for delta in client.iter_send([{"role": "user", "content": "Hi"}])]
+
+    assert asyncio.run(main()) == ["Once", " upon"]
+
+@pytest.mark.parametrize("max_concurrency, min_s, max_s", [(3, 0.0, 0.25), (1, 0.3, 10.0)])
+def test_gather_send_respects_concurrency_cap(config_path, max_concurrency, min_s, max_s):
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        return httpx.Response(200, json={"message": {"content": prompt.upper()}})
+
+    async def main():
+        client = AsyncLLMClient(config_path=config_path)
+        _attach_transport(client, handler)
+        prompts = [[{"role": "user", "content": p}] for p in ("a", "b", "c")]
+        return await gather_send(client, prompts, max_concurrency=max_concurrency)
+
+    start = time.perf_counter()
+    assert asyncio.run(main()) == ["A", "B", "C"]
+    assert min_s <= time.perf_counter() - start < max_s
+
+class SlowEchoClient(BaseClient):
+    """Blocking client; agenerate falls back to BaseClient's worker-thread default."""
+    def generate(self, prompt, **kwargs):
+        time.sleep(0.1)
+        return f"{prompt}!"
+
+def test_generate_alternatives_runs_concurrently():
+    start = time.perf_counter()
+    results = generate_alternatives(SlowEchoClient(), "Go on", n=3, max_concurrency=3)
+    assert results == ["Go on!"] * 3
+    assert time.perf_counter() - start < 0.25
+
+def test_agenerate_many_preserves_order():
+    results = asyncio.run(agenerate_many(SlowEchoClient(), ["x", "y"], max_concurrency=2))
+    assert results == ["x!", "y!"]
+
+def test_client_from_a_finished_loop_is_closed(config_path):
+    client = AsyncLLMClient(config_path=config_path)
+
+    async def open_pool():
+        return await client._get_client()
+
+    first = asyncio.run(open_pool())
+    second = asyncio.run(open_pool())
+    assert second is not first
+    assert first.is_closed and not second.is_closed
+    asyncio.run(client.aclose())
+
+def test_generate_alternatives_closes_the_async_pool(config_path):
+    from services.llm_client import APIBaseClient
+
+    async def handler(request):
+        return httpx.Response(200, json={"message": {"content": "More"}})
+
+    client = APIBaseClient(config_path=config_path)
+    pools = []
+
+    async def agenerate(prompt, **kwargs):
+        if client.async_client._client is None:
+            _attach_transport(client.async_client, handler)
+            pools.append(client.async_client._client)
+        return await client._agenerate(prompt, **kwargs)
+
+    client.agenerate = agenerate
+    assert generate_alternatives(client, "Go on", n=3) == ["More"] * 3
+    assert len(pools) == 1 and pools[0].is_closed
+    assert client.async_client._client is None
+
+def test_send_deadline_covers_reading_the_body(tmp_path):
+    from modules.clients.resilience import DeadlineExceeded
+
+    path = tmp_path / "api_config_drip.yml"
+    path.write_text(CONFIG.replace("llm.test", "llm-drip.test") + "resilience:\n  total_deadline: 0.1\n")
+
+    async def drip():
+        for byte in b'{"message": {"content": "Too slow"}}':
+            await asyncio.sleep(0.02)
+            yield bytes([byte])
+
+    async def handler(request):
+        return httpx.Response(200, content=drip())
+
+    async def main():
+        async with AsyncLLMClient(config_path=str(path)) as client:
+            _attach_transport(client, handler)
+            await client.send([{"role": "user", "content": "Hi"}], coalesce=False)
+
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert time.perf_counter() - start < 0.3
+
+def test_failed_send_is_logged_and_counted_once(config_path):
+    from modules.utils.metrics import metrics
+
+    def errors():
+        counters = metrics.snapshot()["counters"].get("llm_errors_total", [])
+        return sum(c["value"] for c in counters if c["labels"]["agent"] == "async-errors")
+
+    async def handler(request):
+        return httpx.Response(400, json={"error": "bad request"})
+
+    async def main():
+        async with AsyncLLMClient(config_path=config_path) as client:
+            _attach_transport(client, handler)
+            await client.send([{"role": "user", "content": "Hi"}], agent_name="async-errors", coalesce=False)
+
+    before = errors()
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(main())
+    assert errors() == before + 1
@@ -0,0 +1,86 @@
+# tests/unit/test_audio_codec.py
+
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from models.story import NarrationAudio, Story
+from services.tts_client import AudioChunk, assemble_wav, encode_audio
+
+
+def narration_wav(seconds: float = 5.0, samplerate: int = 24000) -> AudioChunk:
+    t = np.arange(int(seconds * samplerate)) / samplerate
+    samples = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    return AudioChunk(assemble_wav([samples], samplerate), "audio/wav", seconds)
+
+
+@pytest.mark.parametrize("codec, mime_type", [
+    ("ogg_opus", "audio/ogg"),
+    ("ogg_vorbis", "audio/ogg"),
+    ("mp3", "audio/mpeg"),
+    ("flac", "audio/flac"),
+])
+def test_codecs_shrink_and_record_format(codec, mime_type):
+    wav = narration_wav()
+    encoded = encode_audio(wav, codec)
+
+    assert encoded.mime_type == mime_type
+    assert encoded.duration == wav.duration
+    assert len(encoded.data) < len(wav.data) / 2
+    data, samplerate = sf.read(io.BytesIO(encoded.data))
+    assert samplerate == 24000
+    assert abs(len(data) - 24000 * 5) < 24000 * 0.1
+
+
+@pytest.mark.parametrize("codec", ["ogg_opus", "mp3"])
+def test_default_level_is_an_order_of_magnitude_smaller(codec):
+    wav = narration_wav()
+    assert len(encode_audio(wav, codec).data) < len(wav.data) / 10
+
+
+def test_compression_level_selects_bitrate():
+    wav = narration_wav()
+    high = encode_audio(wav, "mp3", compression_level=0.0)
+    low = encode_audio(wav, "mp3", compression_level=1.0)
+    assert len(low.data) < len(high.data)
+
+
+def test_opus_falls_back_to_vorbis_for_unsupported_rates():
+    encoded = encode_audio(narration_wav(samplerate=22050), "ogg_opus")
+    assert encoded.mime_type == "audio/ogg"
+    assert sf.info(io.BytesIO(encoded.data)).subtype == "VORBIS"
+
+
+def test_assembled_wav_is_clipped_pcm16():
+    samples = np.array([0.0, 0.5, -0.5, 1.0, -1.0, 1.7, -2.0], dtype=np.float32)
+    data = assemble_wav([samples[:3], samples[3:]], 24000, silence_samples=2)
+
+    info = sf.info(io.BytesIO(data))
+    assert (info.format, info.subtype, info.samplerate) == ("WAV", "PCM_16", 24000)
+    read, _ = sf.read(io.BytesIO(data), dtype="int16")
+    # out-of-range samples are clipped, not wrapped
+    np.testing.assert_array_equal(read, [0, 16384, -16384, 0, 0, 32767, -32767, 32767, -32767])
+    reference = io.BytesIO()
+    sf.write(reference, read, 24000, format="WAV", subtype="PCM_16")
+    assert data == reference.getvalue()
+
+
+def test_compressed_input_and_wav_codec_pass_through():
+    mp3 = AudioChunk(b"\xff\xfb" + b"\x00" * 100, "audio/mpeg", 1.0)
+    assert encode_audio(mp3, "ogg_opus") is mp3
+    wav = narration_wav(0.1)
+    assert encode_audio(wav, "wav") is wav
+    with pytest.raises(ValueError):
+        encode_audio(wav, "aac")
+
+
+def test_story_keeps_format_and_upgrades_raw_bytes():
+    wav = narration_wav(0.1).data
+    story = Story.model_validate({"audio": [wav, {"data": b"OggS...", "mime_type": "audio/ogg"}, b"ID3..."]})
+
+    assert [a.mime_type for a in story.audio] == ["audio/wav", "audio/ogg", "audio/mpeg"]
+    assert story.audio[0].data == wav
+    assert Story.model_validate(story.model_dump()).audio == story.audio
+    assert isinstance(story.audio[1], NarrationAudio)
@@ -0,0 +1,73 @@
+# tests/unit/test_cache.py
+
+import time
+
+from modules.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"   # "b" is now the oldest
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+
+def test_lru_respects_byte_budget():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.put("a", b"x" * 6)
+    cache.put("b", b"y" * 6)
+    assert cache.get("a") is None
+    assert cache.size_bytes == 6
+    cache.put("huge", b"z" * 11)    # larger than the whole budget: ignored
+    assert cache.get("huge") is None and cache.get("b") is not None
+
+def test_sqlite_cache_size_cap_evicts_oldest_access(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "c.sqlite"), max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"y" * 4)
+    cache.get("a")                   # refresh "a"
+    cache.put("c", b"z" * 4)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"x" * 4
+    assert cache.size_bytes <= 10
+
+def test_sqlite_cache_ttl(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "c.sqlite"), ttl_seconds=0.05)
+    cache.put("a", b"1")
+    assert cache.get("a") == b"1"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+def test_tiered_cache_promotes_disk_hits_and_counts(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "c.sqlite"))
+    disk.put("k", b"v")
+    cache = TieredCache(LRUCache(), disk)
+
+    assert cache.get("missing") is None
+    assert cache.get("k") == b"v"   # disk hit, promoted
+    assert cache.get("k") == b"v"   # memory hit
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["disk_hits"], stats["memory_hits"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+def test_tiered_cache_memory_tier_honours_ttl(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "c.sqlite"), ttl_seconds=0.05)
+    disk.put("promoted", b"1")
+    cache = TieredCache(LRUCache(), disk)
+    cache.put("written", b"2")
+    assert cache.get("promoted") == b"1"    # now also in memory
+    assert cache.get("written") == b"2"
+
+    time.sleep(0.1)
+    assert cache.get("promoted") is None
+    assert cache.get("written") is None
+    assert len(cache.memory) == 0
+
+def test_memory_only_tiered_cache_ttl():
+    cache = TieredCache(LRUCache(), ttl_seconds=0.05)
+    cache.put("k", b"v")
+    assert cache.get("k") == b"v"
+    time.sleep(0.1)
+    assert cache.get("k") is None
@@ -0,0 +1,50 @@
+# tests/unit/test_camera_preprocess.py
+
+import numpy as np
+import pytest
+
+from services.camera_preprocess import LETTERBOX_COLOR, crop_face, downscale, get_preset, letterbox
+
+
+def frame(height=720, width=1280):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[..., 0] = 200  # blue channel, to check channel order is kept
+    return image
+
+
+def test_downscale_keeps_aspect_and_channels():
+    small, scale = downscale(frame(), 640)
+    assert small.shape == (360, 640, 3)
+    assert scale == 0.5
+    assert small[0, 0].tolist() == [200, 0, 0]
+
+
+def test_downscale_leaves_small_frames_alone():
+    image = frame(240, 320)
+    assert downscale(image, 640) == (image, 1.0)
+    assert downscale(image, None)[0] is image
+
+
+def test_letterbox_pads_to_square():
+    canvas, scale, (pad_x, pad_y) = letterbox(frame(), 320)
+    assert canvas.shape == (320, 320, 3)
+    assert scale == 0.25
+    assert (pad_x, pad_y) == (0, 70)
+    assert canvas[0, 0].tolist() == list(LETTERBOX_COLOR)
+    assert canvas[160, 160].tolist() == [200, 0, 0]
+
+
+def test_crop_face_maps_back_and_clamps():
+    image = frame()
+    crop = crop_face(image, {"x": 10, "y": 10, "w": 50, "h": 50}, scale=0.5, margin=0.2)
+    # 100x100 at full resolution, margin clamped at the top-left edge
+    assert crop.shape == (20 + 100 + 20, 20 + 100 + 20, 3)
+    crop = crop_face(image, {"x": 0, "y": 0, "w": 10, "h": 10}, scale=1.0, margin=0.0)
+    assert crop.shape == (10, 10, 3)
+
+
+def test_presets():
+    assert get_preset("fast")["yolo_size"] < get_preset("quality")["yolo_size"]
+    assert get_preset({"yolo_size": 256})["max_side"] == get_preset("balanced")["max_side"]
+    with pytest.raises(ValueError):
+        get_preset("turbo")
@@ -0,0 +1,177 @@
+# tests/unit/test_camera_processor.py
+
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+from unittest.mock import MagicMock
+
+from services import camera_processor, model_registry
+from services.camera_processor import analyze_camera_input, decode_snapshot
+from services.model_registry import ModelRegistry
+
+
+def snapshot(color=(255, 0, 0), size=(64, 48)) -> io.BytesIO:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="JPEG", quality=95)
+    buf.seek(0)
+    return buf
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(mocker):
+    # Nothing registered: load_models() must not load the real DeepFace / YOLO here
+    reg = ModelRegistry()
+    mocker.patch.object(model_registry, "registry", reg)
+    return reg
+
+
+@pytest.fixture
+def deepface(mocker):
+    model = MagicMock()
+    model.analyze.return_value = [{"age": 31.6, "gender": "Woman", "dominant_emotion": "happy"}]
+    mocker.patch.object(camera_processor, "get_model", return_value=model)
+    return model
+
+
+def test_decode_snapshot_returns_contiguous_bgr():
+    image = decode_snapshot(snapshot(color=(255, 0, 0)))
+    assert image.shape == (48, 64, 3)
+    assert image.dtype == np.uint8
+    assert image.flags["C_CONTIGUOUS"]
+    blue, green, red = image[24, 32]
+    assert red > 200 and blue < 50
+
+
+def test_models_share_one_in_memory_array(deepface, mocker, tmp_path, monkeypatch):
+    detect = mocker.patch.object(camera_processor, "detect_objects", return_value=["cup"])
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+
+    result = analyze_camera_input(snapshot())
+
+    assert result == {"age": 31, "gender": "Woman", "emotion": "happy", "objects": ["cup"]}
+    face_input = deepface.analyze.call_args.kwargs["img_path"]
+    assert isinstance(face_input, np.ndarray)
+    assert detect.call_args.args[0] is face_input
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failures_fall_back_to_defaults(mocker):
+    mocker.patch.object(camera_processor, "get_model", side_effect=RuntimeError("no tensorflow"))
+    mocker.patch.object(camera_processor, "detect_objects", side_effect=RuntimeError("no torch"))
+    assert analyze_camera_input(snapshot()) == {"age": None, "gender": None, "emotion": None, "objects": []}
+
+
+def test_face_and_objects_run_concurrently(mocker):
+    def slow_face(image, *args):
+        time.sleep(0.2)
+        return {"age": 40, "gender": "Man", "emotion": "neutral"}
+
+    def slow_objects(image, *args):
+        time.sleep(0.2)
+        return ["book"]
+
+    mocker.patch.object(camera_processor, "analyze_face", side_effect=slow_face)
+    mocker.patch.object(camera_processor, "analyze_objects", side_effect=slow_objects)
+    mocker.patch("services.inference.get_inference_executor", return_value=ThreadPoolExecutor(max_workers=2))
+
+    start = time.perf_counter()
+    result = analyze_camera_input(snapshot())
+
+    assert time.perf_counter() - start < 0.35
+    assert result == {"age": 40, "gender": "Man", "emotion": "neutral", "objects": ["book"]}
+
+
+def test_slow_detector_returns_partial_results(deepface, mocker):
+    release = threading.Event()
+    mocker.patch.object(camera_processor, "detect_objects", side_effect=lambda image, **kwargs: release.wait(5) and ["cup"])
+    mocker.patch("services.inference.get_inference_executor", return_value=ThreadPoolExecutor(max_workers=2))
+
+    start = time.perf_counter()
+    result = analyze_camera_input(snapshot(), timeouts={"objects": 0.1})
+    release.set()
+
+    assert time.perf_counter() - start < 1.0
+    assert result == {"age": 31, "gender": "Woman", "emotion": "happy", "objects": []}
+
+
+def test_first_model_load_does_not_count_against_timeouts(fresh_registry, mocker):
+    deepface = MagicMock()
+    deepface.extract_faces.return_value = []
+    deepface.analyze.return_value = [{"age": 52, "gender": "Man", "dominant_emotion": "calm"}]
+    yolo = MagicMock()
+    yolo.return_value[0].names = {0: "person"}
+    yolo.return_value[0].boxes.cls = [0.0]
+
+    def slow_loader(model):
+        return lambda: time.sleep(0.3) or model
+
+    fresh_registry.register("deepface", slow_loader(deepface))
+    fresh_registry.register("yolo", slow_loader(yolo))
+    executor = ThreadPoolExecutor(max_workers=2)
+    mocker.patch("services.inference.get_inference_executor", return_value=executor)
+
+    result = analyze_camera_input(snapshot(), timeouts={"face": 0.2, "objects": 0.2})
+
+    assert result == {"age": 52, "gender": "Man", "emotion": "calm", "objects": ["person"]}
+    assert fresh_registry.is_loaded("deepface") and fresh_registry.is_loaded("yolo")
+
+
+def test_face_detected_once_and_crop_reused(deepface):
+    image = np.zeros((720, 1280, 3), dtype=np.uint8)
+    deepface.extract_faces.return_value = [
+        {"facial_area": {"x": 100, "y": 50, "w": 40, "h": 40}, "confidence": 0.9},
+        {"facial_area": {"x": 300, "y": 100, "w": 100, "h": 120}, "confidence": 0.8},
+    ]
+
+    camera_processor.analyze_face(image, preset="balanced")
+
+    deepface.extract_faces.assert_called_once()
+    assert deepface.extract_faces.call_args.kwargs["img_path"].shape == (360, 640, 3)
+    kwargs = deepface.analyze.call_args.kwargs
+    assert kwargs["detector_backend"] == "skip"
+    # Largest face, mapped back to full resolution (x2) with a 20% margin
+    assert kwargs["img_path"].shape == (int(2 * 120 * 1.4), int(2 * 100 * 1.4), 3)
+
+
+def test_objects_get_letterboxed_input_and_class_names(mocker):
+    yolo = MagicMock()
+    result = MagicMock()
+    result.names = {0: "person", 41: "cup"}
+    result.boxes.cls = [41.0, 0.0, 41.0]
+    yolo.return_value = [result]
+    mocker.patch("services.object_sentiment.get_model", return_value=yolo)
+
+    labels = camera_processor.analyze_objects(np.zeros((720, 1280, 3), dtype=np.uint8), preset="fast")
+
+    assert sorted(labels) == ["cup", "person"]
+    assert yolo.call_args.args[0].shape == (320, 320, 3)
+    assert yolo.call_args.kwargs["imgsz"] == 320
+
+
+def test_onnx_backend_falls_back_when_unavailable(deepface, mocker):
+    mocker.patch("services.onnx_backend.is_available", return_value=False)
+    detect = mocker.patch.object(camera_processor, "detect_objects", return_value=["cup"])
+
+    result = analyze_camera_input(snapshot(), backend="onnx")
+
+    assert result == {"age": 31, "gender": "Woman", "emotion": "happy", "objects": ["cup"]}
+    detect.assert_called_once()
+
+
+def test_onnx_backend_used_when_available(deepface, mocker):
+    mocker.patch("services.onnx_backend.is_available", return_value=True)
+    mocker.patch("services.onnx_backend.analyze_face",
+                 return_value={"age": 25, "gender": "Man", "emotion": "sad"})
+    mocker.patch("services.onnx_backend.detect_objects", return_value=["dog"])
+    detect = mocker.patch.object(camera_processor, "detect_objects")
+
+    result = analyze_camera_input(snapshot(), backend="onnx")
+
+    assert result == {"age": 25, "gender": "Man", "emotion": "sad", "objects": ["dog"]}
+    deepface.analyze.assert_not_called()
+    detect.assert_not_called()
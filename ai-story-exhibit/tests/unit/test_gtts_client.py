@@ -0,0 +1,122 @@
+# tests/unit/test_gtts_client.py
+
+import base64
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from services.tts_client import GTTSTTSClient, gtts_parts
+
+REQUEST_DELAY = 0.3
+
+
+class StandInTranslateServer:
+    """
+    Local stand-in for Google's batchexecute TTS endpoint. Each request sleeps for
+    REQUEST_DELAY and answers with fake "MP3" bytes naming the text it was sent,
+    in the response framing gTTS parses.
+    """
+    def __init__(self, delay: float = REQUEST_DELAY):
+        self.delay = delay
+        self.texts = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+                rpc = json.loads(parse_qs(body)["f.req"][0])
+                text = json.loads(rpc[0][0][1])[0]
+                with server._lock:
+                    server.texts.append(text)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                time.sleep(server.delay)
+                with server._lock:
+                    server.active -= 1
+                audio = base64.b64encode(f"<{text}>".encode("utf-8")).decode("ascii")
+                payload = (')]}\'\n\n[["wrb.fr","jQ1olc","[\\"' + audio + '\\"]",null,null,null,"generic"]]\n')
+                data = payload.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def simple_sentence_split(mocker):
+    # Independent of whether NLTK's punkt data is installed
+    mocker.patch("services.tts_client.sent_tokenize", create=True,
+                 side_effect=lambda text: re.split(r"(?<=[.!?])\s+", text.strip()))
+
+
+@pytest.fixture
+def stand_in_server(mocker, monkeypatch):
+    server = StandInTranslateServer()
+    mocker.patch("gtts.tts._translate_url", return_value=server.url)
+    for var in ("HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy", "ALL_PROXY", "all_proxy"):
+        monkeypatch.delenv(var, raising=False)
+    yield server
+    server.close()
+
+
+PARAGRAPH = (
+    "The lighthouse keeper counted the waves. Nobody came. "
+    "At midnight the lamp flickered twice and went dark. She climbed the stairs anyway. "
+    "Below, the sea held its breath. Then, far out, a second light answered."
+)
+
+
+def test_gtts_parts_respect_request_limit():
+    long_sentence = " ".join(["word"] * 60) + "."
+    parts = gtts_parts(f"Short one. {long_sentence}")
+    assert parts[0] == "Short one."
+    assert all(len(part) <= 100 for part in parts)
+    assert " ".join(parts[1:]) == long_sentence
+
+
+def test_parts_fetched_concurrently_and_reassembled_in_order(stand_in_server):
+    client = GTTSTTSClient(executor=ThreadPoolExecutor(max_workers=8))
+    parts = gtts_parts(PARAGRAPH)
+
+    start = time.perf_counter()
+    audio = client.generate(PARAGRAPH, lang="en")
+    elapsed = time.perf_counter() - start
+
+    assert audio == "".join(f"<{part}>" for part in parts).encode("utf-8")
+    assert sorted(stand_in_server.texts) == sorted(parts)
+    assert stand_in_server.max_active > 1
+    # Serial requests would take len(parts) * REQUEST_DELAY
+    assert elapsed < REQUEST_DELAY * len(parts) / 2
+
+
+def test_pool_bounds_concurrent_requests(stand_in_server):
+    client = GTTSTTSClient(executor=ThreadPoolExecutor(max_workers=2))
+    client.generate(PARAGRAPH)
+    assert stand_in_server.max_active <= 2
+
+
+def test_stream_yields_parts_in_order(stand_in_server):
+    client = GTTSTTSClient(executor=ThreadPoolExecutor(max_workers=8))
+    chunks = list(client.generate_stream(PARAGRAPH, language="en"))
+    assert [chunk.data for chunk in chunks] == [f"<{part}>".encode("utf-8") for part in gtts_parts(PARAGRAPH)]
+    assert all(chunk.mime_type == "audio/mpeg" for chunk in chunks)
@@ -0,0 +1,134 @@
+# tests/unit/test_image_batch.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.base_client import BaseClient
+from services.image_batch import CANCELLED, DONE, FAILED, ImageBatchJob, get_image_executor
+
+
+class SlowImageClient(BaseClient):
+    def __init__(self, delay=0.2, fail_on=()):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+
+    def generate(self, prompt: str, **kwargs):
+        self.calls.append((prompt, kwargs))
+        time.sleep(self.delay)
+        if prompt in self.fail_on:
+            raise RuntimeError("backend down")
+        return f"image:{prompt}"
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.finished
+
+
+def test_batch_takes_about_one_image_time():
+    client = SlowImageClient(delay=0.2)
+    executor = ThreadPoolExecutor(max_workers=5)
+    start = time.time()
+    job = ImageBatchJob(client, {i: f"scene {i}" for i in range(5)}, executor=executor, style="Noir")
+    _wait(job)
+
+    assert time.time() - start < 0.6          # serial would be ~1.0s
+    assert sorted(job.take_completed()) == [(i, f"image:scene {i}") for i in range(5)]
+    assert job.take_completed() == []         # each image is handed out once
+    assert all(kwargs == {"style": "Noir"} for _, kwargs in client.calls)
+
+
+
+def test_shared_pool_runs_a_five_scene_story_in_one_round():
+    assert get_image_executor()._max_workers >= 5
+    start = time.time()
+    job = ImageBatchJob(SlowImageClient(delay=0.2), {i: f"scene {i}" for i in range(5)})
+    _wait(job)
+    assert time.time() - start < 0.35         # two rounds would be ~0.4s
+
+def test_failures_are_reported_per_scene():
+    job = ImageBatchJob(
+        SlowImageClient(delay=0, fail_on=("bad",)), {0: "good", 1: "bad"},
+        executor=ThreadPoolExecutor(max_workers=2),
+    )
+    _wait(job)
+    assert job.status() == {0: DONE, 1: FAILED}
+    assert job.errors() == {1: "backend down"}
+    assert job.take_completed() == [(0, "image:good")]
+
+
+def test_cancel_skips_queued_scenes():
+    release = threading.Event()
+
+    class BlockingClient(BaseClient):
+        def generate(self, prompt, **kwargs):
+            release.wait(5)
+            return prompt
+
+    job = ImageBatchJob(BlockingClient(), {i: str(i) for i in range(4)}, executor=ThreadPoolExecutor(max_workers=1))
+    time.sleep(0.05)
+    job.cancel()
+    release.set()
+    _wait(job)
+
+    assert set(job.status().values()) == {CANCELLED}
+    assert job.take_completed() == []
+
+
+def test_batch_saves_to_store_and_returns_refs(tmp_path):
+    from PIL import Image
+    from services.image_store import ImageStore
+
+    class PilClient(BaseClient):
+        def generate(self, prompt, **kwargs):
+            return Image.new("RGB", (16, 16), color="blue")
+
+    store = ImageStore(str(tmp_path))
+    job = ImageBatchJob(PilClient(), {0: "a", 1: "b"}, executor=ThreadPoolExecutor(max_workers=2), store=store)
+    _wait(job)
+
+    refs = dict(job.take_completed())
+    assert refs[0] == refs[1]                 # same pixels, one file
+    assert store.exists(refs[0])
+
+
+def test_batch_prefers_encoded_bytes_when_storing(tmp_path):
+    import io
+    from PIL import Image
+    from services.image_store import ImageStore
+
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 16)).save(buf, format="PNG")
+
+    class EncodedClient(BaseClient):
+        def generate(self, prompt, **kwargs):
+            raise AssertionError("pixels should not be decoded")
+
+        def generate_encoded(self, prompt, **kwargs):
+            return buf.getvalue()
+
+    store = ImageStore(str(tmp_path))
+    job = ImageBatchJob(EncodedClient(), {0: "a"}, executor=ThreadPoolExecutor(max_workers=1), store=store)
+    _wait(job)
+    [(_, ref)] = job.take_completed()
+    assert store.get_bytes(ref) == buf.getvalue()
+
+
+def test_batch_exposes_progressive_previews(tmp_path):
+    from services.image_gen_client import MockImageClient
+    from services.image_store import ImageStore
+
+    client = MockImageClient(step_delay=0.1)
+    job = ImageBatchJob(client, {0: "castle"}, executor=ThreadPoolExecutor(max_workers=1),
+                        store=ImageStore(str(tmp_path)))
+    time.sleep(0.05)
+    preview = job.preview(0)
+    assert preview is not None and not preview.final
+    _wait(job)
+    assert job.preview(0) is None
+    [(_, ref)] = job.take_completed()
+    assert (ref.width, ref.height) == (512, 512)
@@ -11,6 +11,7 @@ from services.image_gen_client import (
     MockImageClient,
     WebisImageClient
 )
+from services.image_store import ImageStore
 # Assuming stable_diffusion.WebisAPI is the actual API client class
 WEBIS_API_PATH = "services.image_gen_client.WebisAPI" # Path relative to where it's imported
 
@@ -67,4 +68,115 @@ def test_webis_image_client_generate(mocker):
 
     # Verify content by checking a pixel (optional, but good for simple mock images)
     pixel_data = result_image.getpixel((0,0))
-    assert pixel_data == (0,0,0) # Black pixel
\ No newline at end of file
+    assert pixel_data == (0,0,0) # Black pixel
+def test_cached_image_client_replays_identical_requests(tmp_path):
+    from services.image_gen_client import CachedImageClient
+
+    inner = MagicMock(spec=["generate"])  # a pixels-only backend
+    inner.generate.side_effect = lambda prompt, **kwargs: Image.new("RGB", (8, 8), color="red")
+    client = CachedImageClient(
+        inner, "mock", cache_cfg={"path": str(tmp_path / "img.sqlite")}, store=ImageStore(str(tmp_path / "images"))
+    )
+
+    first = client.generate("A  Dragon over the castle", style="Noir")
+    second = client.generate("a dragon over the castle ", style="Noir")   # normalized to the same key
+    client.generate("a dragon over the castle", style="Watercolor")       # different style
+
+    assert inner.generate.call_count == 2
+    assert first.size == second.size == (8, 8)
+    assert second.getpixel((0, 0)) == (255, 0, 0)
+    stats = client.cache_stats()
+    assert stats["backend"] == "mock"
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["disk_bytes"] > 0
+
+def test_cached_image_client_survives_restart_via_disk(tmp_path):
+    from services.image_gen_client import CachedImageClient, _image_caches
+
+    inner = MagicMock(spec=["generate"])  # a pixels-only backend
+    inner.generate.return_value = Image.new("RGB", (4, 4))
+    cfg = {"path": str(tmp_path / "img.sqlite")}
+    CachedImageClient(inner, "webis", cache_cfg=cfg, store=ImageStore(str(tmp_path / "images"))).generate("castle")
+
+    _image_caches.clear()  # fresh process: empty memory tier, same disk file
+    client = CachedImageClient(inner, "webis", cache_cfg=cfg, store=ImageStore(str(tmp_path / "images")))
+    client.generate("castle")
+    assert inner.generate.call_count == 1
+    assert client.cache_stats()["disk_hits"] == 1
+
+def test_create_image_client_with_cache():
+    from services.image_gen_client import CachedImageClient
+
+    client = create_image_client(backend="mock", cache=True, cache_cfg={"path": None})
+    assert isinstance(client, CachedImageClient)
+    assert isinstance(client.client, MockImageClient)
+
+def test_webis_generate_encoded_returns_file_bytes(mocker):
+    buffered = io.BytesIO()
+    Image.new("RGB", (2, 2), color="white").save(buffered, format="PNG")
+    api = MagicMock()
+    api.generate.return_value = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    mocker.patch(WEBIS_API_PATH, return_value=api)
+
+    data = WebisImageClient().generate_encoded("A futuristic city")
+    assert data == buffered.getvalue()
+
+def test_mock_generate_encoded_is_png():
+    assert MockImageClient().generate_encoded("A sunset").startswith(b"\x89PNG")
+
+def test_mock_generate_progressive_yields_previews_then_final():
+    steps = list(MockImageClient().generate_progressive("A sunset", preview_steps=2))
+
+    assert [(p.step, p.total_steps, p.final) for p in steps] == [(1, 3, False), (2, 3, False), (3, 3, True)]
+    sizes = [Image.open(io.BytesIO(p.data)).size for p in steps]
+    assert sizes == [(32, 32), (64, 64), (512, 512)]
+
+def test_progressive_falls_back_to_single_final_image():
+    from services.image_gen_client import generate_progressive
+
+    inner = MagicMock(spec=["generate"])
+    inner.generate.return_value = Image.new("RGB", (4, 4))
+    [only] = list(generate_progressive(inner, "castle"))
+    assert only.final and only.data.startswith(b"\x89PNG")
+
+def test_cached_progressive_skips_previews_on_hit(tmp_path):
+    from services.image_gen_client import CachedImageClient
+
+    client = CachedImageClient(
+        MockImageClient(), "mock", cache_cfg={"path": str(tmp_path / "img.sqlite")},
+        store=ImageStore(str(tmp_path / "images")),
+    )
+    first = list(client.generate_progressive("castle"))
+    second = list(client.generate_progressive("castle"))
+
+    assert len(first) == 3
+    assert len(second) == 1 and second[0].final
+    assert second[0].data == first[-1].data
+
+def test_image_cache_holds_refs_and_the_store_holds_bytes(tmp_path):
+    from services.image_gen_client import CachedImageClient
+
+    store = ImageStore(str(tmp_path / "images"))
+    client = CachedImageClient(MockImageClient(), "mock", cache_cfg={"path": str(tmp_path / "img.sqlite")}, store=store)
+    data = client.generate_encoded("castle")
+
+    assert client.cache_stats()["disk_bytes"] < 1024     # a digest, not a PNG
+    assert store.size_bytes == len(data)
+    assert client.generate_encoded("castle") == data
+    assert store.size_bytes == len(data)                  # the hit did not store a second copy
+
+def test_image_cache_entry_pruned_from_store_is_a_miss(tmp_path):
+    import os
+    from services.image_gen_client import CachedImageClient
+
+    inner = MagicMock(spec=["generate"])
+    inner.generate.return_value = Image.new("RGB", (4, 4))
+    store = ImageStore(str(tmp_path / "images"))
+    client = CachedImageClient(inner, "mock", cache_cfg={"path": str(tmp_path / "img.sqlite")}, store=store)
+    data = client.generate_encoded("castle")
+
+    for dirpath, _, names in os.walk(store.root):
+        for name in names:
+            os.remove(os.path.join(dirpath, name))
+    assert client.generate_encoded("castle") == data
+    assert inner.generate.call_count == 2
@@ -0,0 +1,109 @@
+# tests/unit/test_image_store.py
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from models.story import ImageRef, Story
+from services.image_store import ImageStore, get_image_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ImageStore(str(tmp_path / "images"))
+
+
+def test_put_pil_image_returns_compact_ref(store):
+    img = Image.new("RGB", (512, 512), color=(10, 20, 30))
+    ref = store.put(img)
+
+    assert ref.format == "png"
+    assert (ref.width, ref.height) == (512, 512)
+    assert len(ref.model_dump_json()) < 200
+    assert store.get_bytes(ref).startswith(b"\x89PNG")
+    assert store.open(ref).size == (512, 512)
+
+
+def test_identical_content_is_stored_once(store):
+    img = Image.new("RGB", (64, 64), color="white")
+    first, second = store.put(img), store.put(img.copy())
+    assert first == second
+    assert store.path(first).endswith(f"{first.digest}.png")
+
+
+def test_encoded_bytes_are_stored_as_is(store):
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 16)).save(buf, format="JPEG")
+    ref = store.put(buf.getvalue())
+
+    assert ref.format == "jpeg" and ref.mime_type == "image/jpeg"
+    assert (ref.width, ref.height) == (32, 16)
+    assert store.get_bytes(ref) == buf.getvalue()
+
+
+def test_unknown_bytes_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.put(b"definitely not an image")
+
+
+def test_webp_store(tmp_path):
+    store = ImageStore(str(tmp_path), image_format="webp")
+    ref = store.put(Image.new("RGB", (64, 64), color="red"))
+    assert ref.format == "webp"
+    assert store.get_bytes(ref)[8:12] == b"WEBP"
+
+
+def test_story_round_trips_refs(store):
+    ref = store.put(Image.new("RGB", (8, 8)))
+    story = Story(paragraphs=["a", "b"], images=[ref, None])
+    restored = Story.model_validate(story.model_dump())
+    assert restored.images == [ref, None]
+    assert isinstance(restored.images[0], ImageRef)
+
+
+def test_get_image_store_is_shared(tmp_path):
+    assert get_image_store(str(tmp_path)) is get_image_store(str(tmp_path))
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_thumbnail_is_small_and_cached(store, fmt):
+    buf = io.BytesIO()
+    Image.new("RGB", (1024, 768), color="green").save(buf, format=fmt)
+    ref = store.put(buf.getvalue())
+
+    path = store.thumbnail(ref, max_side=128)
+    with Image.open(path) as thumb:
+        assert max(thumb.size) <= 128
+        assert thumb.size[0] > thumb.size[1]
+    assert store.thumbnail(ref, max_side=128) == path
+
+
+def _png(color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 64), color=color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_store_prunes_least_recently_used_beyond_budget(tmp_path):
+    images = [_png(color) for color in ("red", "green", "blue")]
+    # Room for two and a half: the third put() evicts exactly one file
+    store = ImageStore(str(tmp_path / "images"), max_bytes=int(2.5 * max(map(len, images))))
+    old, recent = store.put(images[0]), store.put(images[1])
+    past = os.path.getmtime(store.path(old)) - 60
+    os.utime(store.path(old), (past, past))
+    os.utime(store.path(recent), (past - 60, past - 60))
+    store.get_bytes(recent)               # reading refreshes it
+
+    newest = store.put(images[2])
+
+    assert not store.exists(old)
+    assert store.exists(recent) and store.exists(newest)
+    assert store.size_bytes <= store.max_bytes
+
+
+def test_store_counts_existing_files_on_start(tmp_path):
+    root = str(tmp_path / "images")
+    ref = ImageStore(root).put(_png("red"))
+    assert ImageStore(root).size_bytes == os.path.getsize(ImageStore(root).path(ref))
@@ -0,0 +1,59 @@
+# tests/unit/test_inference.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.utils.metrics import metrics
+from services.inference import run_concurrently
+
+
+def test_results_are_collected_by_name():
+    results = run_concurrently(
+        {"a": (lambda x: x + 1, (1,)), "b": (lambda: "b", ())},
+        timeouts={}, defaults={}, executor=ThreadPoolExecutor(max_workers=2),
+    )
+    assert results == {"a": 2, "b": "b"}
+
+
+def test_timeouts_and_failures_use_defaults():
+    metrics.reset()
+    release = threading.Event()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    results = run_concurrently(
+        {"slow": (release.wait, (5,)), "broken": (fail, ())},
+        timeouts={"slow": 0.05}, defaults={"slow": [], "broken": "none"},
+        executor=ThreadPoolExecutor(max_workers=2),
+    )
+    release.set()
+
+    assert results == {"slow": [], "broken": "none"}
+    assert metrics.snapshot()["counters"]["inference_timeouts"][0]["labels"] == {"model": "slow"}
+
+
+def test_executor_bounds_concurrency_and_queueing_counts_toward_timeout():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.1)
+        with lock:
+            active[0] -= 1
+        return "done"
+
+    start = time.perf_counter()
+    results = run_concurrently(
+        {name: (work, ()) for name in "abc"},
+        timeouts={"c": 0.15}, defaults={"c": "late"},
+        executor=ThreadPoolExecutor(max_workers=2),
+    )
+
+    assert peak[0] == 2
+    assert results == {"a": "done", "b": "done", "c": "late"}
+    assert time.perf_counter() - start < 0.19
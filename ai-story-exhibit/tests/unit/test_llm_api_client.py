@@ -0,0 +1,253 @@
+# tests/unit/test_llm_api_client.py
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import MagicMock
+
+from modules.clients import llm_client
+from modules.clients.llm_client import LLMClient, get_http_session
+
+CONFIG_TEMPLATE = """
+llm_api:
+  url: http://llm.test/api/chat
+  model: test-model
+  timeout: 5
+  stream: false
+generation:
+  temperature: 0.0
+http_pool:
+  pool_connections: 2
+  pool_maxsize: {maxsize}
+  keep_alive: {keep_alive}
+"""
+
+@pytest.fixture
+def config_path(tmp_path):
+    def _write(maxsize=3, keep_alive="true"):
+        path = tmp_path / f"api_config_{maxsize}_{keep_alive}.yml"
+        path.write_text(CONFIG_TEMPLATE.format(maxsize=maxsize, keep_alive=keep_alive))
+        return str(path)
+    return _write
+
+def test_clients_share_pooled_session(config_path):
+    """Clients with the same pool settings reuse one process-wide session."""
+    first = LLMClient(config_path=config_path())
+    second = LLMClient(config_path=config_path())
+    assert first.session is second.session
+
+    adapter = first.session.get_adapter("http://llm.test")
+    assert adapter._pool_maxsize == 3
+    assert adapter._pool_block is True
+
+def test_different_pool_settings_get_separate_sessions():
+    assert get_http_session(pool_maxsize=5) is get_http_session(pool_maxsize=5)
+    assert get_http_session(pool_maxsize=5) is not get_http_session(pool_maxsize=6)
+
+@pytest.mark.parametrize("keep_alive, header", [("true", "keep-alive"), ("false", "close")])
+def test_send_posts_through_session(config_path, keep_alive, header, mocker):
+    client = LLMClient(config_path=config_path(maxsize=7, keep_alive=keep_alive))
+    response = _json_response(" Hi there ")
+    post = mocker.patch.object(client.session, "post", return_value=response)
+    module_post = mocker.patch.object(llm_client.requests, "post")
+
+    result = client.send([{"role": "user", "content": "Hello"}])
+
+    assert result == "Hi there"
+    module_post.assert_not_called()
+    post.assert_called_once()
+    assert post.call_args.kwargs["headers"]["Connection"] == header
+
+def _streaming_response(lines, chunk_size=7):
+    # Small chunks so lines straddle read boundaries, like a real socket
+    body = "\n".join(lines).encode("utf-8")
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter(
+        [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    )
+    return response
+
+@pytest.mark.parametrize("lines", [
+    # Ollama NDJSON
+    [
+        '{"message": {"content": "Once"}, "done": false}',
+        '{"message": {"content": " upon"}, "done": false}',
+        '{"message": {"content": ""}, "done": true}',
+        '{"message": {"content": "ignored after done"}}',
+    ],
+    # OpenAI-compatible SSE
+    [
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+        '',
+        'data: {"choices": [{"delta": {"content": "Once"}}]}',
+        'data: {"choices": [{"delta": {"content": " upon"}}]}',
+        'data: [DONE]',
+    ],
+])
+def test_iter_send_yields_deltas(config_path, lines, mocker):
+    client = LLMClient(config_path=config_path())
+    post = mocker.patch.object(client.session, "post", return_value=_streaming_response(lines))
+
+    deltas = client.iter_send([{"role": "user", "content": "Hello"}], temperature=0.3)
+
+    post.assert_not_called()  # nothing is sent until the generator is consumed
+    assert list(deltas) == ["Once", " upon"]
+    assert post.call_args.kwargs["stream"] is True
+    sent = json.loads(post.call_args.kwargs["data"])
+    assert sent["stream"] is True
+    assert sent["temperature"] == 0.3
+
+def test_send_with_stream_assembles_deltas(config_path, mocker):
+    client = LLMClient(config_path=config_path())
+    lines = ['{"message": {"content": " Hi"}}', '{"message": {"content": " there "}, "done": true}']
+    mocker.patch.object(client.session, "post", return_value=_streaming_response(lines))
+
+    assert client.send([{"role": "user", "content": "Hello"}], stream=True) == "Hi there"
+
+@pytest.fixture
+def cached_client(tmp_path):
+    path = tmp_path / "api_config_cached.yml"
+    path.write_text(
+        CONFIG_TEMPLATE.format(maxsize=3, keep_alive="true")
+        + f"response_cache:\n  enabled: true\n  path: {tmp_path / 'llm.sqlite'}\n"
+    )
+    return LLMClient(config_path=str(path))
+
+def _json_response(content):
+    body = json.dumps({"message": {"content": content}, "done": True}).encode("utf-8")
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.side_effect = lambda chunk_size=1: iter([body])
+    return response
+
+def test_deterministic_requests_hit_network_once(cached_client, mocker):
+    post = mocker.patch.object(cached_client.session, "post", return_value=_json_response("Same story"))
+    messages = [{"role": "user", "content": "Hello"}]
+
+    assert cached_client.send(messages) == "Same story"          # config temperature is 0.0
+    assert cached_client.send(messages) == "Same story"
+    assert post.call_count == 1
+    assert cached_client.response_cache.stats()["hits"] == 1
+
+def test_sampled_requests_bypass_cache_unless_forced(cached_client, mocker):
+    post = mocker.patch.object(cached_client.session, "post", return_value=_json_response("Varied"))
+    messages = [{"role": "user", "content": "Hello again"}]
+
+    cached_client.send(messages, temperature=0.8)
+    cached_client.send(messages, temperature=0.8)
+    assert post.call_count == 2
+
+    cached_client.send(messages, temperature=0.8, force_cache=True)
+    cached_client.send(messages, temperature=0.8, force_cache=True)
+    assert post.call_count == 3
+    assert "force_cache" not in json.loads(post.call_args.kwargs["data"])
+
+def test_streamed_response_is_cached_after_full_read(cached_client, mocker):
+    lines = ['{"message": {"content": "Once"}}', '{"message": {"content": " more"}, "done": true}']
+    post = mocker.patch.object(cached_client.session, "post", return_value=_streaming_response(lines))
+    messages = [{"role": "user", "content": "Stream me"}]
+
+    assert list(cached_client.iter_send(messages)) == ["Once", " more"]
+    assert list(cached_client.iter_send(messages)) == ["Once more"]
+    assert post.call_count == 1
+
+def test_streamed_and_blocking_calls_cache_the_same_text(cached_client, mocker):
+    lines = ['{"message": {"content": "  Padded"}}', '{"message": {"content": " story\\n"}, "done": true}']
+    post = mocker.patch.object(cached_client.session, "post", return_value=_streaming_response(lines))
+    messages = [{"role": "user", "content": "Shared key"}]
+
+    assert "".join(cached_client.iter_send(messages)) == "  Padded story\n"
+    assert cached_client.send(messages, stream=False) == "Padded story"   # served from the stream's entry
+    assert list(cached_client.iter_send(messages)) == ["Padded story"]
+    assert post.call_count == 1
+
+def test_concurrent_identical_sends_are_coalesced(config_path, mocker):
+    client = LLMClient(config_path=config_path())
+
+    def slow_post(*args, **kwargs):
+        time.sleep(0.1)
+        return _json_response("Shared")
+
+    post = mocker.patch.object(client.session, "post", side_effect=slow_post)
+    messages = [{"role": "user", "content": "Double click"}]
+    before = llm_client.single_flight.stats()["coalesced"]
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: client.send(messages, temperature=0.9), range(3)))
+
+    assert results == ["Shared"] * 3
+    assert post.call_count == 1
+    assert llm_client.single_flight.stats()["coalesced"] - before == 2
+
+def test_coalescing_can_be_disabled_per_call(config_path, mocker):
+    client = LLMClient(config_path=config_path())
+    post = mocker.patch.object(
+        client.session, "post", side_effect=lambda *a, **k: (time.sleep(0.05), _json_response("x"))[1]
+    )
+    messages = [{"role": "user", "content": "Alternatives"}]
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(lambda _: client.send(messages, coalesce=False), range(3)))
+
+    assert post.call_count == 3
+
+def test_send_retries_transient_server_errors(tmp_path, mocker):
+    path = tmp_path / "api_config_retry.yml"
+    path.write_text(
+        CONFIG_TEMPLATE.replace("http://llm.test", "http://llm-retry.test").format(maxsize=3, keep_alive="true")
+        + "resilience:\n  backoff_initial: 0.001\n  backoff_max: 0.002\n  max_attempts: 3\n"
+    )
+    client = LLMClient(config_path=str(path))
+    unavailable = MagicMock()
+    unavailable.raise_for_status.side_effect = llm_client.requests.exceptions.HTTPError(
+        "503", response=MagicMock(status_code=503)
+    )
+    post = mocker.patch.object(client.session, "post", side_effect=[unavailable, _json_response("Recovered")])
+
+    assert client.send([{"role": "user", "content": "Hello"}]) == "Recovered"
+    assert post.call_count == 2
+    connect, read = post.call_args.kwargs["timeout"]
+    assert connect <= 3.05 and read <= 5
+
+def test_send_deadline_covers_reading_the_body(tmp_path, mocker):
+    from modules.clients.resilience import DeadlineExceeded
+
+    path = tmp_path / "api_config_drip.yml"
+    path.write_text(
+        CONFIG_TEMPLATE.replace("http://llm.test", "http://llm-drip.test").format(maxsize=3, keep_alive="true")
+        + "resilience:\n  total_deadline: 0.1\n"
+    )
+    client = LLMClient(config_path=str(path))
+
+    def drip():
+        # Every byte arrives well within the read timeout, the whole body does not
+        for byte in b'{"message": {"content": "Too slow"}}':
+            time.sleep(0.02)
+            yield bytes([byte])
+
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = drip()
+    mocker.patch.object(client.session, "post", return_value=response)
+
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        client.send([{"role": "user", "content": "Hello"}], coalesce=False)
+    assert time.perf_counter() - start < 0.3
+
+def test_send_records_request_metrics_from_bytes_sent(config_path, mocker):
+    from modules.utils.metrics import metrics
+
+    client = LLMClient(config_path=config_path())
+    post = mocker.patch.object(client.session, "post", return_value=_json_response("Hi"))
+    client.send([{"role": "user", "content": "Hello"}], agent_name="metrics_test", coalesce=False)
+
+    snapshot = metrics.snapshot()
+    [sent] = [h for h in snapshot["histograms"]["llm_request_bytes"] if h["labels"]["agent"] == "metrics_test"]
+    assert sent["count"] == 1
+    assert sent["max"] == len(post.call_args.kwargs["data"])
+    [latency] = [h for h in snapshot["histograms"]["llm_latency_seconds"] if h["labels"]["agent"] == "metrics_test"]
+    assert latency["labels"]["model"] == "test-model"
@@ -75,4 +75,25 @@ def test_api_base_client_generate(mocker):
     mock_llm_api_instance.send.assert_called_once_with(
         messages=expected_messages,
         **kwargs # The client.send method expects these kwargs directly
-    )
\ No newline at end of file
+    )
+
+def test_mock_llm_client_generate_stream_matches_generate():
+    """Streaming the mock yields word deltas that join back into the full text."""
+    client = MockLLMClient()
+    chunks = list(client.generate_stream(prompt="A fox", genre="Fable", elements=["moon"]))
+    assert len(chunks) > 1
+    assert "".join(chunks) == client.generate(prompt="A fox", genre="Fable", elements=["moon"])
+
+def test_api_base_client_generate_stream(mocker):
+    """APIBaseClient.generate_stream yields deltas straight from LLMClient.iter_send."""
+    mock_llm_api_instance = MagicMock()
+    mock_llm_api_instance.iter_send.return_value = iter(["Once", " upon", " a time"])
+    mocker.patch("services.llm_client.APIClient", return_value=mock_llm_api_instance)
+
+    client = APIBaseClient(config_path="dummy/config.yaml")
+    stream = client.generate_stream("Tell me a story.", temperature=0.2)
+
+    assert list(stream) == ["Once", " upon", " a time"]
+    kwargs = mock_llm_api_instance.iter_send.call_args.kwargs
+    assert kwargs["messages"][-1] == {"role": "user", "content": "Tell me a story."}
+    assert kwargs["temperature"] == 0.2
@@ -0,0 +1,84 @@
+# tests/unit/test_metrics.py
+
+import threading
+
+import pytest
+
+from modules.utils.metrics import MetricsRegistry, ResourceSampler
+
+
+def test_histogram_quantiles_are_close():
+    registry = MetricsRegistry()
+    for value in range(1, 1001):
+        registry.observe("latency", value / 1000, agent="a")
+
+    [hist] = registry.snapshot()["histograms"]["latency"]
+    assert hist["count"] == 1000
+    assert hist["min"] == pytest.approx(0.001)
+    assert hist["max"] == pytest.approx(1.0)
+    assert hist["p50"] == pytest.approx(0.5, rel=0.16)
+    assert hist["p95"] == pytest.approx(0.95, rel=0.16)
+    assert hist["p99"] <= 1.0
+
+
+def test_labels_are_kept_apart():
+    registry = MetricsRegistry()
+    registry.observe("bytes", 10, agent="a", model="m")
+    registry.observe("bytes", 20, model="m", agent="b")
+    registry.inc("errors", agent="a")
+    registry.inc("errors", 2, agent="a")
+
+    snapshot = registry.snapshot()
+    assert {h["labels"]["agent"]: h["count"] for h in snapshot["histograms"]["bytes"]} == {"a": 1, "b": 1}
+    assert snapshot["counters"]["errors"] == [{"labels": {"agent": "a"}, "value": 3}]
+
+
+def test_shards_from_many_threads_are_merged_and_retired():
+    registry = MetricsRegistry()
+
+    def work():
+        for _ in range(500):
+            registry.observe("latency", 0.01)
+            registry.inc("requests")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = registry.snapshot()
+    assert snapshot["histograms"]["latency"][0]["count"] == 4000
+    assert snapshot["counters"]["requests"][0]["value"] == 4000
+    # Exited threads were folded into the retired shard, and nothing is counted twice
+    assert registry._shards == []
+    assert registry.snapshot()["counters"]["requests"][0]["value"] == 4000
+
+
+def test_finished_threads_are_retired_without_a_snapshot():
+    registry = MetricsRegistry()
+
+    # One short-lived thread per "rerun", and nobody looks at the metrics
+    for _ in range(50):
+        thread = threading.Thread(target=registry.inc, args=("reruns",))
+        thread.start()
+        thread.join()
+
+    assert len(registry._shards) <= 1
+    assert registry.snapshot()["counters"]["reruns"][0]["value"] == 50
+
+
+def test_resource_sampler_collects_in_background():
+    sampler = ResourceSampler(interval=0.01, history=3)
+    sampler.start()
+    try:
+        for _ in range(200):
+            if len(sampler.history) == 3:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        sampler.stop()
+    latest = sampler.latest()
+    assert len(sampler.history) == 3
+    assert latest["process_rss_bytes"] > 0
+    assert 0 <= latest["host_memory_percent"] <= 100
@@ -0,0 +1,139 @@
+# tests/unit/test_model_registry.py
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from modules.utils.metrics import metrics
+from services.model_registry import ModelRegistry, warmup
+from services import model_registry
+
+
+@pytest.fixture
+def fresh_registry(mocker):
+    reg = ModelRegistry()
+    mocker.patch.object(model_registry, "registry", reg)
+    return reg
+
+
+def test_models_load_lazily_and_once():
+    reg = ModelRegistry()
+    loader = MagicMock(return_value="model")
+    reg.register("yolo", loader)
+
+    assert not reg.is_loaded("yolo")
+    loader.assert_not_called()
+    assert reg.get("yolo") == "model"
+    assert reg.get("yolo") == "model"
+    assert loader.call_count == 1
+    assert "yolo" in reg.load_times()
+
+
+def test_concurrent_first_use_waits_for_one_load():
+    reg = ModelRegistry()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    reg.register("deepface", slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("deepface"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_failed_load_is_counted_and_retried():
+    reg = ModelRegistry()
+    loader = MagicMock(side_effect=[RuntimeError("no weights"), "model"])
+    reg.register("sentiment", loader)
+    metrics.reset()
+
+    with pytest.raises(RuntimeError):
+        reg.get("sentiment")
+    assert reg.get("sentiment") == "model"
+
+    counters = metrics.snapshot()["counters"]["model_load_failures"]
+    assert counters == [{"labels": {"model": "sentiment"}, "value": 1}]
+    assert metrics.snapshot()["histograms"]["model_load_seconds"][0]["count"] == 1
+
+
+def test_unknown_model_raises_key_error():
+    with pytest.raises(KeyError):
+        ModelRegistry().get("missing")
+
+
+def test_warmup_reads_env(fresh_registry, monkeypatch):
+    a, b = MagicMock(), MagicMock()
+    fresh_registry.register("a", a)
+    fresh_registry.register("b", b)
+
+    monkeypatch.delenv("PRELOAD_MODELS", raising=False)
+    assert warmup() is None
+    a.assert_not_called()
+
+    monkeypatch.setenv("PRELOAD_MODELS", "all")
+    warmup()
+    assert fresh_registry.is_loaded("a") and fresh_registry.is_loaded("b")
+
+
+def test_warmup_in_background_swallows_failures(fresh_registry):
+    fresh_registry.register("broken", MagicMock(side_effect=RuntimeError("boom")))
+    thread = warmup(["broken"], background=True)
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not fresh_registry.is_loaded("broken")
+
+
+def test_importing_services_does_not_load_models():
+    import services.camera_processor  # noqa: F401
+    import services.object_sentiment  # noqa: F401
+
+    assert {"yolo", "sentiment", "deepface"} <= set(model_registry.registry.names())
+    assert not any(model_registry.registry.is_loaded(n) for n in ("yolo", "sentiment", "deepface"))
+    assert "ultralytics" not in sys.modules and "deepface" not in sys.modules
+
+
+# The modules main.py imports before the landing page renders
+LANDING_PAGE_IMPORTS = (
+    "state.session",
+    "models.user",
+    "services.camera_processor",
+    "services.tts_client",
+    "services.model_registry",
+)
+ML_FRAMEWORKS = ("torch", "TTS", "tensorflow", "ultralytics", "deepface", "transformers")
+
+
+def test_landing_page_imports_load_no_ml_framework(tmp_path):
+    # Importable stand-ins, so an eager import shows up even where the real ones are not installed
+    for name in ML_FRAMEWORKS:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "__init__.py").write_text("")
+    (tmp_path / "TTS" / "api.py").write_text("class TTS:\n    pass\n")
+
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = {**os.environ, "PRELOAD_MODELS": "", "TTS_PRELOAD_MODELS": "",
+           "PYTHONPATH": os.pathsep.join(filter(None, [project_root, os.environ.get("PYTHONPATH"), str(tmp_path)]))}
+    script = (
+        "import sys\n"
+        f"for module in {LANDING_PAGE_IMPORTS!r}:\n"
+        "    __import__(module)\n"
+        f"print('loaded:' + ','.join(m for m in {ML_FRAMEWORKS!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=project_root, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "loaded:"
@@ -0,0 +1,92 @@
+# tests/unit/test_onnx_backend.py
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from services import onnx_backend
+from services.camera_preprocess import get_preset
+
+
+class FakePool:
+    def __init__(self, output, metadata=None):
+        self.output = output
+        self.path = f"fake-{id(self)}.onnx"
+        self.inputs = []
+        self._metadata = metadata or {}
+
+    def run(self, inputs):
+        self.inputs.append(inputs)
+        return [self.output]
+
+    def metadata(self):
+        return self._metadata
+
+
+@pytest.fixture
+def models(mocker):
+    pools = {}
+    mocker.patch.object(onnx_backend, "get_model", side_effect=lambda name: pools[name])
+    return pools
+
+
+def test_model_path_prefers_quantized(tmp_path):
+    (tmp_path / "yolo.onnx").write_bytes(b"")
+    assert onnx_backend.model_path("yolo", str(tmp_path)).endswith("yolo.onnx")
+    (tmp_path / "yolo.int8.onnx").write_bytes(b"")
+    assert onnx_backend.model_path("yolo", str(tmp_path)).endswith("yolo.int8.onnx")
+    assert onnx_backend.model_path("age", str(tmp_path)) is None
+
+
+def test_detect_objects_reads_class_scores(models):
+    output = np.zeros((1, 4 + 3, 10), dtype=np.float32)
+    output[0, 4 + 2, 5] = 0.9   # class 2 on anchor 5
+    output[0, 4 + 0, 1] = 0.1   # class 0 below threshold
+    models["onnx_yolo"] = FakePool(output, {"names": "{0: 'person', 1: 'bicycle', 2: 'car'}"})
+
+    labels = onnx_backend.detect_objects(np.zeros((720, 1280, 3), dtype=np.uint8), size=320, conf=0.25)
+
+    assert labels == ["car"]
+    tensor = models["onnx_yolo"].inputs[0]
+    assert tensor.shape == (1, 3, 320, 320) and tensor.dtype == np.float32
+    assert tensor.max() <= 1.0
+
+
+def test_analyze_face_decodes_attribute_outputs(models, mocker):
+    age = np.zeros((1, 101), dtype=np.float32)
+    age[0, 30] = 1.0
+    models["onnx_age"] = FakePool(age)
+    models["onnx_gender"] = FakePool(np.array([[0.2, 0.8]], dtype=np.float32))
+    emotions = np.zeros((1, 7), dtype=np.float32)
+    emotions[0, 3] = 1.0
+    models["onnx_emotion"] = FakePool(emotions)
+    mocker.patch.object(onnx_backend, "find_face", return_value=np.zeros((120, 100, 3), dtype=np.uint8))
+
+    result = onnx_backend.analyze_face(np.zeros((720, 1280, 3), dtype=np.uint8), get_preset("fast"))
+
+    assert result == {"age": 30, "gender": "Man", "emotion": "happy"}
+    assert models["onnx_age"].inputs[0].shape == (1, 224, 224, 3)
+    assert models["onnx_emotion"].inputs[0].shape == (1, 48, 48, 1)
+
+
+def test_unavailable_without_onnxruntime(mocker):
+    mocker.patch.object(onnx_backend, "ort", None)
+    assert not onnx_backend.is_available()
+    with pytest.raises(ImportError):
+        onnx_backend.SessionPool("model.onnx")
+
+
+def test_session_pool_bounds_sessions(mocker):
+    ort = MagicMock()
+    ort.InferenceSession.side_effect = lambda *args, **kwargs: MagicMock()
+    mocker.patch.object(onnx_backend, "ort", ort)
+
+    pool = onnx_backend.SessionPool("model.onnx", size=2, intra_op_threads=3)
+    with pool.session() as first, pool.session() as second:
+        assert first is not second
+    with pool.session():
+        pass
+
+    assert ort.InferenceSession.call_count == 2
+    options = ort.InferenceSession.call_args.kwargs["sess_options"]
+    assert options.intra_op_num_threads == 3 and options.inter_op_num_threads == 1
@@ -0,0 +1,128 @@
+# tests/unit/test_resilience.py
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from modules.clients.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ResiliencePolicy,
+)
+from services.llm_client import APIBaseClient
+
+FAST = {"backoff_initial": 0.001, "backoff_max": 0.002}
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+def test_breaker_opens_after_threshold_and_half_opens_after_cooldown():
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()             # the single half-open probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()         # everyone else still fails fast
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+def test_policy_retries_retryable_status_then_succeeds():
+    policy = ResiliencePolicy("retry-ok", {**FAST, "max_attempts": 3})
+    fn = MagicMock(side_effect=[http_error(503), requests.exceptions.ConnectionError(), "ok"])
+    assert policy.call(fn) == "ok"
+    assert fn.call_count == 3
+    assert policy.breaker.state == "closed"
+
+def test_policy_does_not_retry_client_errors_or_trip_breaker():
+    policy = ResiliencePolicy("no-retry", {**FAST, "breaker_failure_threshold": 1})
+    fn = MagicMock(side_effect=http_error(400))
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(fn)
+    assert fn.call_count == 1
+    assert policy.breaker.state == "closed"
+
+def test_exhausted_retries_trip_the_breaker_and_fail_fast():
+    policy = ResiliencePolicy("trip", {**FAST, "max_attempts": 2, "breaker_failure_threshold": 1})
+    fn = MagicMock(side_effect=http_error(502))
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(fn)
+    assert fn.call_count == 2
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(fn)
+    assert fn.call_count == 2          # nothing sent while open
+
+def test_probe_failing_with_non_retryable_error_is_released():
+    policy = ResiliencePolicy("probe-release", {**FAST, "max_attempts": 1,
+                                                "breaker_failure_threshold": 1,
+                                                "breaker_cooldown_seconds": 0.01})
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.call(MagicMock(side_effect=requests.exceptions.ConnectionError()))
+    assert policy.breaker.state == "open"
+
+    time.sleep(0.02)
+    with pytest.raises(ValueError):
+        policy.call(MagicMock(side_effect=ValueError("bad body")))
+    assert policy.call(MagicMock(return_value="ok")) == "ok"
+    assert policy.breaker.state == "closed"
+
+def test_probe_answered_with_client_error_closes_the_circuit():
+    policy = ResiliencePolicy("probe-4xx", {**FAST, "max_attempts": 1,
+                                            "breaker_failure_threshold": 1,
+                                            "breaker_cooldown_seconds": 0.01})
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(MagicMock(side_effect=http_error(503)))
+    time.sleep(0.02)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(MagicMock(side_effect=http_error(401)))
+    assert policy.breaker.state == "closed"
+
+def test_attempt_timeout_is_capped_by_deadline():
+    policy = ResiliencePolicy("deadline", {"connect_timeout": 5, "first_byte_timeout": 20, "total_deadline": 0.05})
+    deadline = policy.new_deadline()
+    connect, read = policy.attempt_timeout(deadline)
+    assert connect <= 0.05 and read <= 0.05
+    time.sleep(0.06)
+    with pytest.raises(DeadlineExceeded):
+        policy.attempt_timeout(deadline)
+
+def open_circuit_stream(**kwargs):
+    raise CircuitOpenError("open")
+    yield  # makes this a generator, like LLMClient.iter_send
+
+@pytest.mark.parametrize("fallback", [True, False])
+def test_api_client_falls_back_to_mock_while_circuit_open(mocker, fallback):
+    api = MagicMock()
+    api.resilience.fallback_to_mock = fallback
+    api.send.side_effect = CircuitOpenError("open")
+    api.iter_send.side_effect = open_circuit_stream
+    mocker.patch("services.llm_client.APIClient", return_value=api)
+    client = APIBaseClient(config_path="dummy.yml")
+
+    if fallback:
+        assert client.generate("A fox", genre="Fable", elements=[]).endswith("this story begins…")
+        assert "".join(client.generate_stream("A fox")).startswith("A fox")
+    else:
+        with pytest.raises(CircuitOpenError):
+            client.generate("A fox")
+        with pytest.raises(CircuitOpenError):
+            list(client.generate_stream("A fox"))
@@ -0,0 +1,84 @@
+# tests/unit/test_response_parser.py
+
+import asyncio
+import json
+
+import pytest
+
+from modules.clients.response_parser import ResponseParser, acollect, collect, iter_deltas
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+NDJSON = (
+    '{"message": {"content": "Once"}, "done": false}\n'
+    '{"message": {"content": " upon a tíme"}, "done": false}\n'
+    '{"message": {"content": ""}, "done": true}\n'
+    '{"message": {"content": "ignored after done"}}\n'
+).encode("utf-8")
+
+SSE = (
+    ': keep-alive\n'
+    'event: message\n'
+    'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+    'data: {"choices": [{"delta": {"content": "Once"}}]}\r\n\r\n'
+    'data:{"choices": [{"delta": {"content": " upon a tíme"}}]}\n\n'
+    'data: [DONE]\n\n'
+    'data: {"choices": [{"delta": {"content": "ignored"}}]}\n\n'
+).encode("utf-8")
+
+
+@pytest.mark.parametrize("body", [NDJSON, SSE], ids=["ndjson", "sse"])
+@pytest.mark.parametrize("size", [1, 3, 64, 4096])
+def test_deltas_survive_any_chunk_boundary(body, size):
+    # size=1 also splits the multi-byte "í" across reads
+    assert list(iter_deltas(_chunks(body, size))) == ["Once", " upon a tíme"]
+
+
+def test_pretty_printed_json_body_is_decoded_once():
+    body = json.dumps({"choices": [{"message": {"content": "The end."}}]}, indent=2).encode()
+    parser = ResponseParser()
+    assert collect(_chunks(body, 5), parser) == "The end."
+    assert parser.whole_document
+    assert parser.bytes_received == len(body)
+
+
+def test_compact_json_without_trailing_newline():
+    body = b'{"message": {"role": "assistant", "content": "Hi there"}, "done": true}'
+    assert collect([body]) == "Hi there"
+
+
+def test_bytes_received_counts_every_read():
+    parser = ResponseParser()
+    reads = _chunks(NDJSON[:60], 7)
+    for data in reads:
+        parser.feed(data)
+    assert parser.bytes_received == 60
+    assert not parser.done
+
+
+def test_stops_reading_after_done():
+    consumed = []
+
+    def reads():
+        for data in _chunks(NDJSON, 16):
+            consumed.append(data)
+            yield data
+
+    list(iter_deltas(reads()))
+    assert sum(len(data) for data in consumed) < len(NDJSON)
+
+
+def test_garbage_lines_are_skipped():
+    body = b'not json\n{"message": {"content": "ok"}}\n'
+    assert collect([body]) == "ok"
+
+
+def test_async_collect():
+    async def reads():
+        for data in _chunks(SSE, 10):
+            yield data
+
+    assert asyncio.run(acollect(reads())) == "Once upon a tíme"
@@ -0,0 +1,110 @@
+# tests/unit/test_single_flight.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from modules.clients.single_flight import SingleFlight
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: flight.do("key", slow), range(5)))
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert (stats["calls"], stats["upstream_calls"], stats["coalesced"]) == (5, 1, 4)
+    assert stats["in_flight"] == 0
+
+def test_errors_reach_every_waiter_and_key_is_released():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("backend down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "key", failing)
+        started.wait()
+        follower = pool.submit(flight.do, "key", failing)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+def test_stream_is_shared_and_survives_an_abandoned_reader():
+    flight = SingleFlight()
+    release = threading.Event()
+    upstream_calls = []
+
+    def upstream():
+        upstream_calls.append(1)
+        yield "Once"
+        release.wait()
+        yield " upon"
+        yield " a time"
+
+    first = flight.do_stream("key", upstream)
+    assert next(first) == "Once"
+    second = flight.do_stream("key", upstream)
+    first.close()                   # e.g. the Streamlit run that started it was interrupted
+    release.set()
+
+    assert list(second) == ["Once", " upon", " a time"]
+    assert len(upstream_calls) == 1
+
+def test_stream_abandoned_by_every_reader_closes_the_upstream():
+    flight = SingleFlight()
+    closed = threading.Event()
+    produced = []
+
+    def upstream():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield str(i)
+                time.sleep(0.005)
+        finally:
+            closed.set()            # where _stream_upstream closes its response
+
+    reader = flight.do_stream("key", upstream)
+    assert next(reader) == "0"
+    reader.close()                  # e.g. a rerun or Regenerate mid-stream
+
+    assert closed.wait(2)
+    assert len(produced) < 1000
+    assert flight.stats()["in_flight"] == 0
+    # The next identical request starts a fresh upstream call
+    fresh = flight.do_stream("key", upstream)
+    assert next(fresh) == "0"
+    fresh.close()
+
+def test_async_tasks_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", slow) for _ in range(4)))
+
+    assert asyncio.run(main()) == ["result"] * 4
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 3
@@ -0,0 +1,101 @@
+# tests/unit/test_story_context.py
+
+import json
+
+from services.story_context import (
+    StoryContextBuilder,
+    estimate_tokens,
+    get_context_builder,
+)
+from services.llm_client import APIBaseClient
+
+
+def _paragraph(i: int) -> str:
+    return f"Scene {i} opens at dawn. " + ("The hero walks on through the mist. " * 12)
+
+
+def test_short_history_is_kept_verbatim():
+    builder = StoryContextBuilder(token_budget=1500, recent_paragraphs=3)
+    history = ["The dragon woke.", "It flew to the village."]
+    messages = builder.build_messages("A dragon tale", genre="Fantasy", elements=["dragon"], story_history=history)
+
+    assert messages[0]["role"] == "system"
+    assert "Genre: Fantasy" in messages[0]["content"]
+    assert "dragon" in messages[0]["content"]
+    assert [m["content"] for m in messages if m["role"] == "assistant"] == history
+    assert messages[-1]["role"] == "user"
+    assert not any("Summary of earlier scenes" in m["content"] for m in messages)
+
+
+def test_long_history_stays_within_budget():
+    builder = StoryContextBuilder(token_budget=600, recent_paragraphs=3, summary_token_budget=120)
+    sizes = []
+    for n in (50, 500, 5000):
+        history = [_paragraph(i) for i in range(n)]
+        messages = builder.build_messages("A long journey", story_history=history)
+        sizes.append(sum(estimate_tokens(m["content"]) for m in messages))
+        # The newest paragraph is always present verbatim
+        assert messages[-2]["content"] == history[-1]
+        assert messages[1]["content"].startswith("Summary of earlier scenes: ")
+
+    assert all(size <= 600 for size in sizes)
+    # Payload size does not grow with story length
+    assert sizes[-1] - sizes[0] < 20
+
+
+def test_summary_is_updated_incrementally():
+    builder = StoryContextBuilder(token_budget=600, recent_paragraphs=2, summary_token_budget=120)
+    history = [_paragraph(i) for i in range(20)]
+    builder.build_messages("A long journey", story_history=history)
+    steps = builder.summary_steps
+
+    # One more paragraph pushes exactly one more into the summary
+    history.append(_paragraph(20))
+    builder.build_messages("A long journey", story_history=history)
+    assert builder.summary_steps == steps + 1
+
+    # Re-building the same turn (e.g. Regenerate) folds nothing new
+    builder.build_messages("A long journey", story_history=history)
+    assert builder.summary_steps == steps + 1
+
+
+def test_oversized_latest_paragraph_is_trimmed():
+    builder = StoryContextBuilder(token_budget=300, recent_paragraphs=3, summary_token_budget=50)
+    huge = "word " * 2000
+    messages = builder.build_messages("Seed", story_history=["Intro.", huge])
+
+    assert sum(estimate_tokens(m["content"]) for m in messages) <= 300
+    assert messages[-2]["content"].startswith("…")
+
+
+def test_get_context_builder_is_shared_per_config():
+    assert get_context_builder({"token_budget": 800}) is get_context_builder({"token_budget": 800})
+    assert get_context_builder({"token_budget": 800}) is not get_context_builder({"token_budget": 900})
+
+
+def test_api_base_client_forwards_bounded_history(tmp_path, mocker):
+    config_path = tmp_path / "api_config.yml"
+    config_path.write_text(
+        "llm_api:\n  url: http://llm.local/api/chat\n  model: test-model\n"
+        "story_context:\n  token_budget: 500\n  recent_paragraphs: 2\n  summary_token_budget: 100\n"
+    )
+    client = APIBaseClient(config_path=str(config_path))
+    send = mocker.patch.object(client.client, "send", return_value="Next scene.")
+
+    history = [_paragraph(i) for i in range(100)]
+    assert client.generate("A long journey", genre="Adventure", story_history=history) == "Next scene."
+
+    messages = send.call_args.kwargs["messages"]
+    assert len(json.dumps(messages)) < 500 * 4 + 500
+    assert messages[-2]["content"] == history[-1]
+    assert "Genre: Adventure" in messages[0]["content"]
+
+
+def test_api_base_client_without_history_keeps_plain_prompt(tmp_path, mocker):
+    config_path = tmp_path / "api_config.yml"
+    config_path.write_text("llm_api:\n  url: http://llm.local/api/chat\n")
+    client = APIBaseClient(config_path=str(config_path))
+    send = mocker.patch.object(client.client, "send", return_value="Once upon a time.")
+
+    client.generate("A dragon tale")
+    assert send.call_args.kwargs["messages"][-1] == {"role": "user", "content": "A dragon tale"}
@@ -0,0 +1,137 @@
+# tests/unit/test_tts_cache.py
+
+import io
+import re
+
+import numpy as np
+import pytest
+import soundfile as sf
+from unittest.mock import MagicMock
+
+from services import tts_client
+from services.tts_client import (
+    AudioChunk,
+    CachedTTSClient,
+    CoquiTTSClient,
+    clear_coqui_models,
+    create_tts_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def simple_sentence_split(mocker):
+    mocker.patch("services.tts_client.sent_tokenize", create=True,
+                 side_effect=lambda text: re.split(r"(?<=[.!?])\s+", text.strip()))
+
+
+@pytest.fixture
+def memory_cache_cfg():
+    return {"path": None, "memory_entries": 64}
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    tts_client._tts_caches.clear()
+    clear_coqui_models()
+    yield
+    tts_client._tts_caches.clear()
+    clear_coqui_models()
+
+
+@pytest.fixture
+def coqui_model(mocker):
+    model = MagicMock()
+    model.to.return_value = model
+    model.sampling_rate = 1000
+    model.tts.side_effect = lambda text, **kwargs: np.full(len(text), 0.25, dtype=np.float32)
+    mocker.patch.object(tts_client, "CoquiTTS", return_value=model)
+    return model
+
+
+def synthesized(model):
+    return [c.kwargs["text"] for c in model.tts.call_args_list]
+
+
+def test_repeated_paragraph_is_served_from_cache(coqui_model, memory_cache_cfg):
+    client = create_tts_client("coqui", cache=True, model_name="m", speaker="A", cache_cfg=memory_cache_cfg)
+    assert isinstance(client, CachedTTSClient)
+
+    first = client.generate("One. Two.", language="en")
+    second = client.generate("One.   Two.", language="en")
+
+    assert first == second
+    assert synthesized(coqui_model) == ["One.", "Two."]
+    assert client.cache_stats()["hits"] == 2
+
+
+def test_cached_client_still_batches_model_calls(coqui_model, memory_cache_cfg):
+    client = create_tts_client("coqui", cache=True, model_name="m", cache_cfg=memory_cache_cfg)
+    first = client.generate("One. Two. Three. Four.")
+    second = client.generate("One. Two.  Three. Four.")
+
+    # The first sentence alone for a quick start, the rest in one call; then all from the cache
+    assert synthesized(coqui_model) == ["One.", "Two. Three. Four."]
+    assert first == second
+    assert client.cache_stats()["hits"] == 2
+
+
+def test_edited_paragraph_only_resynthesizes_changed_batches(coqui_model, memory_cache_cfg):
+    client = create_tts_client("coqui", cache=True, model_name="m", batch_chars=10, cache_cfg=memory_cache_cfg)
+    client.generate("One. Two. Three.")
+    coqui_model.tts.reset_mock()
+
+    audio = client.generate("One. Two changed. Three.")
+
+    assert synthesized(coqui_model) == ["Two changed."]
+    data, _ = sf.read(io.BytesIO(audio), dtype="float32")
+    assert len(data) == len("One.") + len("Two changed.") + len("Three.")
+
+
+@pytest.mark.parametrize("change", [
+    {"language": "de"},
+    {"speaker": "B"},
+    {"speaker_wav": "visitor.wav"},
+])
+def test_voice_is_part_of_the_key(coqui_model, memory_cache_cfg, change):
+    client = create_tts_client("coqui", cache=True, model_name="m", speaker="A", cache_cfg=memory_cache_cfg)
+    client.generate("One.")
+    client.generate("One.", **change)
+    assert synthesized(coqui_model) == ["One.", "One."]
+
+
+def test_backends_and_models_do_not_share_entries(coqui_model, memory_cache_cfg):
+    a = CachedTTSClient(CoquiTTSClient("model-a", device="cpu"), "coqui", cache_cfg=memory_cache_cfg)
+    b = CachedTTSClient(CoquiTTSClient("model-b", device="cpu"), "coqui", cache_cfg=memory_cache_cfg)
+    gtts = CachedTTSClient(tts_client.GTTSTTSClient(), "gtts", cache_cfg=memory_cache_cfg)
+    keys = {a.cache_key("One."), b.cache_key("One."), gtts.cache_key("One.")}
+    assert len(keys) == 3
+
+
+def test_stream_mixes_hits_and_misses_in_order(memory_cache_cfg):
+    inner = MagicMock(spec=["stream_parts", "generate_parts", "voice"])
+    inner.voice.return_value = {"language": "en"}
+    inner.stream_parts.side_effect = lambda text, **kwargs: text.split("|")
+    inner.generate_parts.side_effect = lambda parts, **kwargs: iter(
+        AudioChunk(part.encode(), "audio/mpeg", 1.0) for part in parts
+    )
+    client = CachedTTSClient(inner, "gtts", cache_cfg=memory_cache_cfg)
+    client.generate("b")
+
+    chunks = list(client.generate_stream("a|b|c"))
+
+    assert [chunk.data for chunk in chunks] == [b"a", b"b", b"c"]
+    assert inner.generate_parts.call_args.args[0] == ["a", "c"]
+    assert chunks[1] == AudioChunk(b"b", "audio/mpeg", 1.0)
+
+
+def test_disk_tier_survives_a_new_process_cache(coqui_model, tmp_path):
+    cfg = {"path": str(tmp_path / "tts.sqlite")}
+    create_tts_client("coqui", cache=True, model_name="m", cache_cfg=cfg).generate("One.")
+    tts_client._tts_caches.clear()
+    coqui_model.tts.reset_mock()
+
+    client = create_tts_client("coqui", cache=True, model_name="m", cache_cfg=cfg)
+    client.generate("One.")
+
+    assert synthesized(coqui_model) == []
+    assert client.cache_stats()["disk_hits"] == 1
@@ -0,0 +1,134 @@
+# tests/unit/test_tts_model_registry.py
+
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from services import tts_client
+from services.tts_client import (
+    CoquiTTSClient,
+    clear_coqui_models,
+    get_coqui_model,
+    preload_coqui_models,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    clear_coqui_models()
+    yield
+    clear_coqui_models()
+
+
+@pytest.fixture
+def coqui_constructor(mocker):
+    def build(model_name):
+        model = MagicMock(name=model_name)
+        model.to.return_value = model
+        model.tts.return_value = np.zeros(4, dtype=np.float32)
+        model.sampling_rate = 22050
+        return model
+    return mocker.patch.object(tts_client, "CoquiTTS", side_effect=build)
+
+
+def test_model_loaded_once_per_name_and_device(coqui_constructor):
+    first = CoquiTTSClient("model-a", device="cpu")
+    second = CoquiTTSClient("model-a", device="cpu", speaker="Other")
+    other = CoquiTTSClient("model-b", device="cpu")
+
+    assert first.tts is second.tts
+    assert other.tts is not first.tts
+    assert coqui_constructor.call_count == 2
+
+
+def test_concurrent_first_use_loads_once(coqui_constructor):
+    def slow_build(model_name):
+        time.sleep(0.05)
+        model = MagicMock()
+        model.to.return_value = model
+        return model
+    coqui_constructor.side_effect = slow_build
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_coqui_model("model-a", "cpu")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert coqui_constructor.call_count == 1
+    assert all(model is results[0] for model in results)
+
+
+def test_warm_up_runs_dummy_synthesis_once(coqui_constructor):
+    model = get_coqui_model("model-a", "cpu")
+    model.warm_up(speaker="Craig Gutsy")
+    model.warm_up(speaker="Craig Gutsy")
+
+    assert model.warmed_up
+    model.tts.tts.assert_called_once()
+    assert model.tts.tts.call_args.kwargs["speaker"] == "Craig Gutsy"
+
+
+def _multi_speaker(model_name):
+    model = MagicMock(name=model_name)
+    model.to.return_value = model
+    model.is_multi_speaker = True
+    model.speakers = ["Claribel Dervla", "Craig Gutsy"]
+
+    def tts(text, speaker=None, speaker_wav=None, **kwargs):
+        if speaker is None and speaker_wav is None:
+            raise ValueError("Model is multi-speaker but no `speaker` is provided.")
+        return np.zeros(4, dtype=np.float32)
+    model.tts.side_effect = tts
+    return model
+
+
+def test_warm_up_picks_a_speaker_for_multi_speaker_models(coqui_constructor, monkeypatch):
+    monkeypatch.delenv("TTS_PRELOAD_SPEAKER", raising=False)
+    coqui_constructor.side_effect = _multi_speaker
+    model = get_coqui_model("xtts", "cpu")
+    model.warm_up()
+
+    assert model.warmed_up
+    assert model.tts.tts.call_args.kwargs["speaker"] == "Claribel Dervla"
+
+
+def test_warm_up_speaker_from_env(coqui_constructor, monkeypatch):
+    monkeypatch.setenv("TTS_PRELOAD_SPEAKER", "Craig Gutsy")
+    coqui_constructor.side_effect = _multi_speaker
+    preload_coqui_models(["xtts"], background=False)
+
+    model = get_coqui_model("xtts")
+    assert model.warmed_up
+    assert model.tts.tts.call_args.kwargs["speaker"] == "Craig Gutsy"
+
+
+def test_preload_reads_env_and_skips_when_unset(coqui_constructor, monkeypatch):
+    monkeypatch.delenv("TTS_PRELOAD_MODELS", raising=False)
+    assert preload_coqui_models() is None
+    assert coqui_constructor.call_count == 0
+
+    monkeypatch.setenv("TTS_PRELOAD_MODELS", "model-a, model-b")
+    preload_coqui_models(background=False)
+    assert [c.args[0] for c in coqui_constructor.call_args_list] == ["model-a", "model-b"]
+    assert get_coqui_model("model-a").warmed_up
+
+
+def test_preload_failure_is_logged_not_raised(coqui_constructor):
+    coqui_constructor.side_effect = RuntimeError("no weights")
+    thread = preload_coqui_models(["broken"])
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_missing_coqui_raises_import_error(mocker):
+    mocker.patch.object(tts_client, "CoquiTTS", None)
+    mocker.patch.dict(sys.modules, {"TTS": None, "TTS.api": None})
+    with pytest.raises(ImportError):
+        CoquiTTSClient("model-a", device="cpu")